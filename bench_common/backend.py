@@ -0,0 +1,234 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Backend adapter interface and plugin registry
+
+Every benchmarked library is wrapped by a :class:`Backend` subclass which
+implements the handful of library calls the benchmarks need. The generic
+driver in :mod:`bench_common.driver` runs the same benchmarks on any of
+them, an operation a backend doesn't implement is recorded as skipped.
+
+The backends are looked up by name in :data:`PLUGINS` and only imported
+when they're used, so each library's venv only needs that library
+installed. Out of tree backends can be added without editing this file by
+listing ``name=module`` pairs in the ``BENCH_PLUGINS`` environment
+variable, the module has to define a :class:`Backend` subclass decorated
+with :func:`register`.
+"""
+
+import importlib
+import os
+
+# The module defining each backend
+PLUGINS = {
+    "retworkx": "retworkx_bench.backend",
+    "networkx": "networkx_bench.backend",
+    "igraph": "igraph_bench.backend",
+    "graph-tool": "graph_tool_bench.backend",
+    "scipy": "scipy_bench.backend",
+    "alt": "speedup_bench.backend",
+    "ch": "speedup_bench.backend",
+}
+
+for _plugin in filter(None, os.getenv("BENCH_PLUGINS", "").split(",")):
+    _name, _, _module = _plugin.partition("=")
+    PLUGINS[_name.strip()] = _module.strip()
+
+_REGISTRY = {}
+
+
+class Backend:
+    """The interface a benchmarked library implements
+
+    :attr str name: The library name used in the results and memory model
+    :attr str module: The module whose ``__version__`` is recorded
+    :attr dict creation_variants: Alternative ways of building the graph
+        which are timed on request, a mapping of the result label to the
+        keyword arguments for :meth:`load_gr`
+    :attr str thread_env: The environment variable setting the size of the
+        library's thread pool, ``None`` if it doesn't run in parallel
+    :attr int preprocess_max_nodes: The largest graph :meth:`preprocess` is
+        run on, ``None`` to leave the decision to the memory model
+    """
+
+    name = None
+    module = None
+    creation_variants = {}
+    thread_env = None
+    preprocess_max_nodes = None
+
+    def version(self):
+        return importlib.import_module(self.module).__version__
+
+    def supports(self, operation):
+        """Return whether this backend implements an operation
+
+        :param str operation: The name of a method of :class:`Backend`
+        """
+        return getattr(type(self), operation) is not getattr(Backend, operation)
+
+    def load_gr(self, path, cache=False, **options):
+        """Load a DIMACS ``.gr`` file as a weighted directed graph
+
+        :param str path: The path to the ``.gr`` file
+        :param bool cache: Load the edge arrays from the binary cache, see
+            :func:`bench_common.dimacs.load_gr_arrays`
+        """
+        raise NotImplementedError
+
+    def build_graph(self, edges):
+        """Build a weighted directed graph from parsed edge arrays
+
+        :param GrEdges edges: The arrays returned by
+            :func:`bench_common.dimacs.load_gr_arrays`
+        """
+        raise NotImplementedError
+
+    def num_nodes(self, graph):
+        raise NotImplementedError
+
+    def num_edges(self, graph):
+        raise NotImplementedError
+
+    def preprocess(self, graph):
+        """Build the index a speedup technique answers queries with
+
+        The driver times this once after creating the graph, the queries
+        of backends implementing it are only run on preprocessed graphs.
+        """
+        raise NotImplementedError
+
+    def index_size(self, graph):
+        """Return the memory of the index built by :meth:`preprocess` in
+        bytes"""
+        raise NotImplementedError
+
+    def count_settled(self, graph, source, target):
+        """Return the number of nodes a :meth:`sssp` query settles
+
+        Only for backends with their own search, the counts of the
+        libraries' searches come from :mod:`bench_common.p2p`.
+        """
+        raise NotImplementedError
+
+    def sssp(self, graph, source, target):
+        """Return the weighted shortest path length from source to target"""
+        raise NotImplementedError
+
+    def bidirectional_sssp(self, graph, source, target):
+        """Return the shortest path length from source to target found by a
+        bidirectional Dijkstra search"""
+        raise NotImplementedError
+
+    def astar(self, graph, source, target, heuristic):
+        """Return the shortest path from source to target found by A*
+
+        :param callable heuristic: Takes a node index and returns a lower
+            bound of its shortest path length to ``target``, see
+            :class:`bench_common.p2p.GreatCircle`
+        """
+        raise NotImplementedError
+
+    def sssp_lengths(self, graph, source):
+        """Compute the weighted shortest path lengths from source to every
+        node
+
+        This is the unit of work the multi source benchmark fans out over
+        thread and process pools.
+        """
+        raise NotImplementedError
+
+    def apsp(self, graph):
+        """Compute the weighted shortest path lengths between all pairs"""
+        raise NotImplementedError
+
+    def apsp_sources(self, graph, sources):
+        """Compute the weighted shortest path lengths from some sources
+
+        Implementing this lets the driver run the all pairs benchmark in
+        chunks of sources when :meth:`apsp` wouldn't fit in memory, the
+        multi source benchmark times it as the library's native batched
+        call.
+        """
+        raise NotImplementedError
+
+    def distance_matrix(self, graph):
+        """Compute the unweighted distance matrix as a dense array"""
+        raise NotImplementedError
+
+    def extra_phases(self, graph):
+        """Return benchmarks specific to this backend
+
+        They're run by the shortest path driver after the common phases,
+        each is planned with the memory model like the all pairs phase.
+
+        :returns: A list of ``(label, func)`` tuples where ``func`` is
+            called without arguments
+        """
+        return []
+
+    def load_graphsdb(self, path, directed=False):
+        """Load an unlabeled graph file from the ARG database"""
+        raise NotImplementedError
+
+    def build_graphsdb(self, edges, directed=False):
+        """Build an unlabeled graph from ARG database edge arrays
+
+        :param ArgEdges edges: The arrays returned by
+            :meth:`bench_common.graphsdb.ArgCorpus.edges`
+        """
+        raise NotImplementedError
+
+    def subgraph_iso(self, graph, subgraph, induced=True):
+        """Return whether ``subgraph`` is isomorphic to a subgraph of
+        ``graph``, stopping at the first match
+
+        :param bool induced: Match induced subgraphs, every edge between the
+            matched nodes of ``graph`` has to be in ``subgraph`` too.
+            Otherwise it's a monomorphism, ``graph`` may have extra edges.
+        """
+        raise NotImplementedError
+
+    def subgraph_embeddings(self, graph, subgraph, induced=True):
+        """Return every embedding of ``subgraph`` in ``graph``
+
+        An embedding is a node mapping, so automorphisms of ``subgraph``
+        are separate embeddings.
+
+        :param bool induced: See :meth:`subgraph_iso`
+
+        :returns: A list with one mapping per embedding in the library's
+            representation
+        """
+        raise NotImplementedError
+
+    def count_subgraph_embeddings(self, graph, subgraph, induced=True):
+        """Return the number of embeddings of ``subgraph`` in ``graph``
+        without keeping them
+
+        :param bool induced: See :meth:`subgraph_iso`
+        """
+        raise NotImplementedError
+
+
+def register(cls):
+    """Class decorator registering a :class:`Backend` subclass"""
+    _REGISTRY[cls.name] = cls
+    return cls
+
+
+def get_backend(name):
+    """Return an instance of the backend registered as ``name``"""
+    if name not in _REGISTRY:
+        if name not in PLUGINS:
+            raise ValueError(
+                "Unknown backend %s, available backends are: %s"
+                % (name, ", ".join(sorted(PLUGINS)))
+            )
+        importlib.import_module(PLUGINS[name])
+    return _REGISTRY[name]()
@@ -0,0 +1,567 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Library independent parser for the 9th DIMACS challenge graph files
+
+This module contains the shared parsing stage for the graph specification
+files from the 9th DIMACS challenge which are documented here:
+
+http://users.diag.uniroma1.it/challenge9/format.shtml
+
+Instead of building a graph object line by line the arc lines are tokenized
+in large blocks into contiguous NumPy arrays. Each library's ``gr_parser``
+then builds its graph from those arrays with its bulk constructor.
+
+The coordinate files (``.co``) which go with the road graphs are parsed the
+same way by :func:`parse_co_arrays`.
+
+The files are read by a background thread which decompresses them in
+large blocks with ``isal`` (if installed) or ``zlib`` and hands the blocks
+to the tokenizer through a bounded queue (:class:`_BlockReader`), so
+decompression overlaps tokenizing instead of alternating with it. Pass a
+dict as ``phase_ns`` to :func:`parse_gr_arrays` to get the time spent in
+each stage.
+
+Parsed arrays can also be cached in a binary sidecar file next to the input
+(``<path>.edges``) which later runs memory map instead of decompressing and
+tokenizing the text again.
+"""
+
+from collections import namedtuple
+import contextlib
+import gzip
+import hashlib
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+try:
+    from isal import isal_zlib as _gzip_zlib
+
+    DECOMPRESSOR = "isal"
+except ImportError:
+    _gzip_zlib = zlib
+    DECOMPRESSOR = "zlib"
+
+# Size of the blocks uncompressed files are read and tokenized in
+CHUNK_SIZE = 64 * 1024 * 1024
+# Size of the compressed blocks gzip files are read in, they decompress to
+# roughly CHUNK_SIZE
+READ_SIZE = 16 * 1024 * 1024
+# The number of blocks the reader thread may decompress ahead of the
+# tokenizer, this bounds the memory of the pipeline
+QUEUE_DEPTH = 4
+# zlib window bits for a gzip header and trailer
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+CACHE_SUFFIX = ".edges"
+CACHE_VERSION = 1
+# magic, version, padding, num_nodes, num_arcs, source size, source mtime_ns,
+# sha256 of the source file. The header is 80 bytes so the int32 and float64
+# arrays following it stay aligned for memory mapping.
+_CACHE_HEADER = struct.Struct("<8sIIqqqq32s")
+_CACHE_MAGIC = b"DIMACSGR"
+
+GrEdges = namedtuple("GrEdges", ["num_nodes", "sources", "targets", "weights"])
+GrEdges.__doc__ = """Edge arrays parsed from a DIMACS graph file
+
+The ``sources`` and ``targets`` arrays are int32 and 0-indexed, the
+``weights`` array is float64.
+"""
+
+GrCoordinates = namedtuple("GrCoordinates", ["longitude", "latitude"])
+GrCoordinates.__doc__ = """Node coordinates parsed from a DIMACS coordinate file
+
+Both arrays are float64 in degrees and indexed by the 0-indexed node.
+"""
+
+
+def _open_gr(path):
+    if path.endswith("gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+class _BlockReader(threading.Thread):
+    """Background thread reading a file into a bounded queue of blocks
+
+    Files ending with ``gz`` are decompressed, the compressed reads and
+    zlib release the GIL so this runs concurrently with the tokenizer. The
+    queue gets the blocks in order followed by ``None``, or the exception
+    that stopped the reader.
+
+    :param str path: The path to the file
+    """
+
+    def __init__(self, path):
+        super().__init__(daemon=True)
+        self.path = path
+        self.blocks = queue.Queue(QUEUE_DEPTH)
+        self.compressed = path.endswith("gz")
+        # The time spent reading and decompressing, without waiting on the
+        # queue
+        self.read_ns = 0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop reading, the consumer doesn't want any more blocks"""
+        self._cancelled.set()
+
+    def _put(self, item):
+        while not self._cancelled.is_set():
+            try:
+                self.blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self, fd):
+        if not self.compressed:
+            while True:
+                start = time.perf_counter_ns()
+                block = fd.read(CHUNK_SIZE)
+                self.read_ns += time.perf_counter_ns() - start
+                if not block:
+                    return
+                yield block
+        decompressor = _gzip_zlib.decompressobj(_GZIP_WBITS)
+        while True:
+            start = time.perf_counter_ns()
+            compressed = fd.read(READ_SIZE)
+            if not compressed:
+                break
+            block = decompressor.decompress(compressed)
+            # A gzip file can have several members, each needs a new
+            # decompressor
+            while decompressor.eof and decompressor.unused_data:
+                unused = decompressor.unused_data
+                decompressor = _gzip_zlib.decompressobj(_GZIP_WBITS)
+                block += decompressor.decompress(unused)
+            self.read_ns += time.perf_counter_ns() - start
+            if block:
+                yield block
+        if not decompressor.eof:
+            raise Exception("Invalid gzip file %s, it ends mid stream" % self.path)
+
+    def run(self):
+        try:
+            with open(self.path, "rb") as fd:
+                for block in self._read(fd):
+                    if not self._put(block):
+                        return
+        except Exception as error:
+            self._put(error)
+            return
+        self._put(None)
+
+
+def _read_lines(path, phase_ns=None):
+    """Yield blocks of complete lines of a file read by a :class:`_BlockReader`
+
+    :param str path: The path to the file
+    :param dict phase_ns: If set, the ``decompress`` time of the reader
+        thread and the time this thread spent waiting for it (``wait``) are
+        added to it in nanoseconds once the file was read
+    """
+    reader = _BlockReader(path)
+    reader.start()
+    wait_ns = 0
+    remainder = b""
+    try:
+        while True:
+            start = time.perf_counter_ns()
+            block = reader.blocks.get()
+            wait_ns += time.perf_counter_ns() - start
+            if isinstance(block, Exception):
+                raise block
+            if block is None:
+                break
+            block = remainder + block
+            split = block.rfind(b"\n") + 1
+            remainder = block[split:]
+            if split:
+                yield block[:split]
+        if remainder.strip():
+            yield remainder
+    finally:
+        reader.cancel()
+        reader.join()
+        if phase_ns is not None:
+            phase_ns["decompress"] = phase_ns.get("decompress", 0) + reader.read_ns
+            phase_ns["wait"] = phase_ns.get("wait", 0) + wait_ns
+
+
+def _read_program_line(blocks, kind):
+    """Skip the comments before the program line
+
+    :param blocks: The iterator returned by :func:`_read_lines`
+    :param str kind: The file type for error messages
+
+    :returns: A tuple of the split program line and the rest of its block
+    """
+    for block in blocks:
+        start = 0
+        while start < len(block):
+            end = block.find(b"\n", start) + 1 or len(block)
+            line = block[start:end]
+            start = end
+            if line.startswith(b"c"):
+                continue
+            if line.startswith(b"p"):
+                return line.split(), block[start:]
+            raise Exception(
+                "Invalid %s file, program line not first non-comment line." % kind
+            )
+    raise Exception("Invalid %s file, no program line found." % kind)
+
+
+def _tokenize_values(block, file_type):
+    """Convert a block of whitespace separated numbers to a float64 array
+
+    Unlike ``np.fromstring`` with ``sep`` (deprecated, it stops at the first
+    malformed value with only a warning) a token which isn't a number raises.
+    """
+    try:
+        return np.array(block.split(), dtype=np.float64)
+    except ValueError as error:
+        raise Exception("Invalid %s file: %s" % (file_type, error))
+
+
+def _tokenize_arcs(block):
+    """Tokenize a block of complete ``a u v w`` lines into an (m, 3) array"""
+    if b"c" in block or b"p" in block:
+        # Comment lines are only expected in the header, but the format
+        # allows them anywhere so fall back to filtering line by line
+        lines = []
+        for line in block.splitlines(keepends=True):
+            if line.startswith(b"c") or not line.strip():
+                continue
+            if not line.startswith(b"a"):
+                raise Exception(
+                    "Invalid gr file line: '%s' doesn't start with a valid "
+                    "token" % line.decode().rstrip()
+                )
+            lines.append(line)
+        block = b"".join(lines)
+    num_arcs = block.count(b"a")
+    values = _tokenize_values(block.replace(b"a", b" "), "gr")
+    if values.size != 3 * num_arcs:
+        raise Exception(
+            "Invalid gr file, expected %s values for %s arc lines but found %s"
+            % (3 * num_arcs, num_arcs, values.size)
+        )
+    return values.reshape(num_arcs, 3)
+
+
+def _fill_arcs(arcs, offset, block):
+    values = _tokenize_arcs(block)
+    end = offset + len(values)
+    if end > len(arcs):
+        raise Exception(
+            "Invalid gr file, more arcs found than the %s declared in the "
+            "program line" % len(arcs)
+        )
+    arcs[offset:end] = values
+    return end
+
+
+def read_gr_header(path):
+    """Read the node and arc counts from the program line of a graph file
+
+    :param str path: A path to the graph specification file
+
+    :returns: A tuple of ``(num_nodes, num_arcs)``
+    """
+    with _open_gr(path) as fd:
+        for line in fd:
+            if line.startswith(b"c"):
+                continue
+            if line.startswith(b"p"):
+                components = line.split()
+                return int(components[2]), int(components[3])
+            break
+    raise Exception("Invalid gr file, program line not first non-comment line.")
+
+
+def parse_gr_arrays(path, phase_ns=None):
+    """Parse a graph specification file into edge arrays
+
+    :param str path: A path to the graph specification file to parse, if it
+        ends with ``gz`` it will be decompressed with gzip
+    :param dict phase_ns: If set, the time spent in each stage of the
+        pipeline is added to it in nanoseconds: ``decompress`` (reading and
+        decompressing in the reader thread), ``tokenize`` (converting the
+        text to arrays) and ``wait`` (the tokenizer waiting for the reader)
+
+    :returns: A :class:`GrEdges` tuple with the node count and the 0-indexed
+        source, target, and weight arrays for every arc in the file
+    """
+    tokenize_ns = 0
+    blocks = _read_lines(path, phase_ns)
+    with contextlib.closing(blocks):
+        program, rest = _read_program_line(blocks, "gr")
+        start = time.perf_counter_ns()
+        num_nodes = int(program[2])
+        num_arcs = int(program[3])
+        # The program line declares the arc count so the output can be
+        # preallocated instead of concatenating the per-block arrays
+        arcs = np.empty((num_arcs, 3), dtype=np.float64)
+        filled = 0
+        if rest.strip():
+            filled = _fill_arcs(arcs, filled, rest)
+        tokenize_ns += time.perf_counter_ns() - start
+        for block in blocks:
+            start = time.perf_counter_ns()
+            filled = _fill_arcs(arcs, filled, block)
+            tokenize_ns += time.perf_counter_ns() - start
+    if filled != num_arcs:
+        raise Exception(
+            "Invalid gr file, program line declares %s arcs but %s were found"
+            % (num_arcs, filled)
+        )
+    start = time.perf_counter_ns()
+    sources = arcs[:, 0].astype(np.int32) - 1
+    targets = arcs[:, 1].astype(np.int32) - 1
+    weights = np.ascontiguousarray(arcs[:, 2])
+    tokenize_ns += time.perf_counter_ns() - start
+    if phase_ns is not None:
+        phase_ns["tokenize"] = phase_ns.get("tokenize", 0) + tokenize_ns
+    return GrEdges(num_nodes, sources, targets, weights)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for block in iter(lambda: fd.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def cache_path(path):
+    """Return the path of the binary cache sidecar for a graph file"""
+    return path + CACHE_SUFFIX
+
+
+def write_gr_cache(path, edges=None):
+    """Write the binary cache sidecar for a graph specification file
+
+    The sidecar contains a fixed size header with the node count and the
+    size, mtime and sha256 digest of the source file followed by the raw
+    int32 source and target arrays and the float64 weight array.
+
+    :param str path: A path to the graph specification file
+    :param GrEdges edges: The already parsed edge arrays for ``path``, if not
+        specified the file will be parsed
+
+    :returns: The path to the written cache file
+    """
+    if edges is None:
+        edges = parse_gr_arrays(path)
+    stat = os.stat(path)
+    header = _CACHE_HEADER.pack(
+        _CACHE_MAGIC,
+        CACHE_VERSION,
+        0,
+        edges.num_nodes,
+        len(edges.sources),
+        stat.st_size,
+        stat.st_mtime_ns,
+        _file_digest(path),
+    )
+    out_path = cache_path(path)
+    # Write to a temporary file and rename it so a concurrent reader never
+    # sees a partially written cache
+    tmp_path = "%s.%s.tmp" % (out_path, os.getpid())
+    with open(tmp_path, "wb") as fd:
+        fd.write(header)
+        np.asarray(edges.sources, dtype="<i4").tofile(fd)
+        np.asarray(edges.targets, dtype="<i4").tofile(fd)
+        np.asarray(edges.weights, dtype="<f8").tofile(fd)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _read_cache_header(path):
+    try:
+        with open(cache_path(path), "rb") as fd:
+            raw_header = fd.read(_CACHE_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw_header) != _CACHE_HEADER.size:
+        return None
+    header = _CACHE_HEADER.unpack(raw_header)
+    if header[0] != _CACHE_MAGIC or header[1] != CACHE_VERSION:
+        return None
+    return header
+
+
+def read_gr_cache(path):
+    """Memory map the binary cache sidecar for a graph specification file
+
+    :param str path: A path to the graph specification file (not the cache)
+
+    :returns: A :class:`GrEdges` tuple backed by read-only memory maps or
+        ``None`` if there is no valid cache for the current contents of
+        ``path``
+    """
+    header = _read_cache_header(path)
+    if header is None:
+        return None
+    _, _, _, num_nodes, num_arcs, size, mtime_ns, digest = header
+    stat = os.stat(path)
+    if stat.st_size != size:
+        return None
+    # Only rehash the source when the cheap stat check fails, an unchanged
+    # file that was touched or downloaded again can still use the cache
+    if stat.st_mtime_ns != mtime_ns and _file_digest(path) != digest:
+        return None
+    sidecar = cache_path(path)
+    offset = _CACHE_HEADER.size
+    if num_arcs == 0:
+        return GrEdges(
+            num_nodes,
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.float64),
+        )
+    sources = np.memmap(sidecar, dtype="<i4", mode="r", offset=offset, shape=num_arcs)
+    offset += 4 * num_arcs
+    targets = np.memmap(sidecar, dtype="<i4", mode="r", offset=offset, shape=num_arcs)
+    offset += 4 * num_arcs
+    weights = np.memmap(sidecar, dtype="<f8", mode="r", offset=offset, shape=num_arcs)
+    return GrEdges(num_nodes, sources, targets, weights)
+
+
+def load_gr_arrays(path):
+    """Load the edge arrays for a graph file using the binary cache
+
+    If there is a valid cache sidecar for ``path`` it is memory mapped,
+    otherwise the file is parsed and the cache is written for later runs.
+
+    :param str path: A path to the graph specification file to load
+
+    :returns: A :class:`GrEdges` tuple
+    """
+    edges = read_gr_cache(path)
+    if edges is None:
+        edges = parse_gr_arrays(path)
+        write_gr_cache(path, edges)
+    return edges
+
+
+def induced_prefix(edges, num_nodes):
+    """Return the subgraph induced by the first ``num_nodes`` nodes
+
+    :param GrEdges edges: The edge arrays of the whole graph
+    :param int num_nodes: The number of nodes to keep
+
+    :returns: A :class:`GrEdges` tuple with only the arcs between the kept
+        nodes
+    """
+    keep = (edges.sources < num_nodes) & (edges.targets < num_nodes)
+    return GrEdges(
+        num_nodes, edges.sources[keep], edges.targets[keep], edges.weights[keep]
+    )
+
+
+def csr_arrays(edges):
+    """Return the compressed sparse row adjacency of edge arrays
+
+    :param GrEdges edges: The edge arrays
+
+    :returns: A tuple of the ``indptr``, ``targets`` and ``weights`` arrays,
+        the arcs out of node ``u`` are ``indptr[u]:indptr[u + 1]``
+    """
+    order = np.argsort(edges.sources, kind="stable")
+    indptr = np.zeros(edges.num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges.sources, minlength=edges.num_nodes), out=indptr[1:])
+    return indptr, edges.targets[order], edges.weights[order]
+
+
+def coordinates_path(path):
+    """Find the coordinate file for a graph file
+
+    The distance and time graphs of a region share one coordinate file
+    (``USA-road-d.<region>.co.gz``) which is looked for next to the graph
+    file and in a ``coordinates`` directory next to or above it.
+
+    :param str path: A path to the graph specification file
+
+    :returns: The path of the coordinate file or ``None`` if there isn't one
+    """
+    components = os.path.basename(path).split(".")
+    if len(components) < 2 or not components[0].startswith("USA-road-"):
+        return None
+    name = "USA-road-d.%s.co.gz" % components[1]
+    directory = os.path.dirname(os.path.abspath(path))
+    for candidate_dir in [
+        directory,
+        os.path.join(directory, "coordinates"),
+        os.path.join(os.path.dirname(directory), "coordinates"),
+    ]:
+        candidate = os.path.join(candidate_dir, name)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def parse_co_arrays(path):
+    """Parse a coordinate file into longitude and latitude arrays
+
+    :param str path: A path to the coordinate file to parse, if it ends
+        with ``gz`` it will be decompressed with gzip
+
+    :returns: A :class:`GrCoordinates` tuple
+    """
+    lines = _read_lines(path)
+    with contextlib.closing(lines):
+        # p aux sp co <num_nodes>
+        program, rest = _read_program_line(lines, "co")
+        num_nodes = int(program[4])
+        blocks = []
+        if rest.strip():
+            blocks.append(_tokenize_coordinates(rest))
+        for block in lines:
+            blocks.append(_tokenize_coordinates(block))
+    values = np.concatenate(blocks) if blocks else np.empty((0, 3))
+    if len(values) != num_nodes:
+        raise Exception(
+            "Invalid co file, program line declares %s nodes but %s were found"
+            % (num_nodes, len(values))
+        )
+    longitude = np.empty(num_nodes)
+    latitude = np.empty(num_nodes)
+    nodes = values[:, 0].astype(np.int64) - 1
+    # The coordinates are stored as integer millionths of a degree
+    longitude[nodes] = values[:, 1] / 10 ** 6
+    latitude[nodes] = values[:, 2] / 10 ** 6
+    return GrCoordinates(longitude, latitude)
+
+
+def _tokenize_coordinates(block):
+    """Tokenize a block of complete ``v id x y`` lines into an (n, 3) array"""
+    if b"c" in block:
+        block = b"".join(
+            line
+            for line in block.splitlines(keepends=True)
+            if not line.startswith(b"c")
+        )
+    num_nodes = block.count(b"v")
+    values = _tokenize_values(block.replace(b"v", b" "), "co")
+    if values.size != 3 * num_nodes:
+        raise Exception(
+            "Invalid co file, expected %s values for %s node lines but found %s"
+            % (3 * num_nodes, num_nodes, values.size)
+        )
+    return values.reshape(num_nodes, 3)
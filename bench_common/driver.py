@@ -0,0 +1,1002 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Generic benchmark driver which runs any registered backend
+
+For example::
+
+    python -m bench_common.driver retworkx shortest_path dimacs_9/distance/rome99.gr
+    python -m bench_common.driver igraph isomorphism arg_db/graphsdb
+
+The results are written to the current directory, see
+:mod:`bench_common.results`.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import fnmatch
+import functools
+import multiprocessing
+import os
+import random
+import time
+
+from bench_common import backend as backend_registry
+from bench_common import dimacs
+from bench_common import graphsdb
+from bench_common import memory
+from bench_common import p2p
+from bench_common import profiling
+from bench_common import queries as query_workload
+from bench_common import results
+from bench_common import scaling
+from bench_common import timing
+from bench_common import watchdog as call_watchdog
+
+ALGORITHMS = ["shortest_path", "isomorphism", "multi_source", "thread_scaling"]
+
+# Minimum length of an isomorphism timing sample in seconds, each call is
+# only ~1ms for the smaller graphs, shorter samples keep the sweep from
+# taking hours. See timing.MIN_SAMPLE_TIME
+ISO_MIN_SAMPLE_TIME = 0.02
+
+# The number of worker processes the isomorphism sweep is sharded over
+ISO_WORKERS = int(os.getenv("BENCH_ISO_WORKERS", "1"))
+
+# The subgraph isomorphism modes and the backend method each times: the
+# time to the first match, to enumerate every embedding and to count them
+ISO_MODES = {
+    "first": "subgraph_iso",
+    "all": "subgraph_embeddings",
+    "count": "count_subgraph_embeddings",
+}
+# Reduce the return value of each mode to whether a match was found or the
+# number of embeddings, enumerating keeps every mapping
+ISO_RESULTS = {"first": bool, "all": len, "count": int}
+ISO_SEMANTICS = {"induced": True, "non-induced": False}
+# The modes and semantics run by default, enumerating every embedding can
+# take much longer than finding one
+DEFAULT_ISO_MODES = os.getenv("BENCH_ISO_MODES", "first").split(",")
+DEFAULT_ISO_SEMANTICS = os.getenv("BENCH_ISO_SEMANTICS", "induced").split(",")
+# The seconds a worker may spend on the pairs of one graph family, the
+# remaining (larger) pairs of the family are skipped once it's reached. 0
+# for no limit
+ISO_FAMILY_TIMEOUT = float(os.getenv("BENCH_ISO_FAMILY_TIMEOUT", "1800"))
+# fnmatch patterns of the families to run, e.g. si2/rand/*
+DEFAULT_ISO_FAMILIES = os.getenv("BENCH_ISO_FAMILIES", "*").split(",")
+
+# The number of times every query of the workload is timed on its own for
+# the latency distribution, each pass runs the queries in a new order
+QUERY_PASSES = int(os.getenv("BENCH_QUERY_PASSES", "3"))
+
+# The number of sources the multi source benchmark computes lengths from
+MULTI_SOURCES = int(os.getenv("BENCH_MULTI_SOURCES", "16"))
+
+# The backend and graph of the process pool workers, forked workers inherit
+# it from the driver process instead of unpickling a copy of the graph
+_WORKER_STATE = {}
+
+
+def _measure_phase(
+    bench, graph, phase, num_nodes, num_arcs, model, peaks, func=None, watchdog=None
+):
+    """Run a phase as planned by the memory model
+
+    :param callable func: The benchmark of a backend specific phase, the
+        all pairs and distance matrix phases call the backend's operation
+        when this isn't set
+    :param Watchdog watchdog: Run the phase under the watchdog's limits
+
+    :returns: A tuple of the :class:`~bench_common.memory.Decision`, the
+        :class:`~bench_common.watchdog.Outcome` or ``None`` if it wasn't run
+        and the measured function
+    """
+    chunkable = False
+    if func is None:
+        if phase == "Distance Matrix":
+            operation = "distance_matrix"
+        else:
+            operation = "apsp"
+        if not bench.supports(operation):
+            return (
+                memory.Decision("skip", None, None, None, "not supported by backend"),
+                None,
+                None,
+            )
+        chunkable = operation == "apsp" and bench.supports("apsp_sources")
+        func = functools.partial(getattr(bench, operation), graph)
+    decision = model.plan(bench.name, phase, num_nodes, num_arcs, chunkable=chunkable)
+    outcome = None
+    if decision.action == "run":
+        print("running %s" % phase)
+        outcome = call_watchdog.measure(func, watchdog)
+        peaks[phase] = outcome.peak_rss
+    elif decision.action == "chunk":
+        print("running %s in chunks of %s sources" % (phase, decision.chunk_size))
+
+        def _all_pairs_chunked():
+            # Only keep chunk_size sources' lengths alive at once
+            for chunk_start in range(0, num_nodes, decision.chunk_size):
+                chunk_stop = min(chunk_start + decision.chunk_size, num_nodes)
+                bench.apsp_sources(graph, range(chunk_start, chunk_stop))
+
+        func = _all_pairs_chunked
+        outcome = call_watchdog.measure(func, watchdog)
+        peaks[phase] = outcome.peak_rss
+    return decision, outcome, func
+
+
+def _python_heap_peak(func):
+    """Return the Python heap peak of a call if allocations are traced"""
+    if memory.TRACE_ALLOCATIONS:
+        return memory.python_heap_peak(func)
+    return None
+
+
+def _measure_creation_stages(bench, path):
+    """Time the stages of creating a graph from its file separately
+
+    The file is parsed with the decompress and tokenize stages timed inside
+    the pipeline (see :func:`bench_common.dimacs.parse_gr_arrays`), then
+    the backend builds its graph from the parsed arrays. The graph is built
+    once more untimed for the memory it keeps.
+
+    :returns: A tuple of a dict mapping ``decompress`` and ``tokenize`` to
+        a list of the time in ns of every parse, the
+        :class:`~bench_common.timing.Timing` of the build and a dict mapping
+        ``tokenize`` and ``build`` to the memory columns of their records.
+        The parse's memory is recorded with the tokenize stage, the reader
+        thread only holds a few blocks at once.
+    """
+    stages = {"decompress": [], "tokenize": []}
+
+    def _parse():
+        phase_ns = {}
+        edges = dimacs.parse_gr_arrays(path, phase_ns=phase_ns)
+        for stage, samples in stages.items():
+            samples.append(phase_ns[stage])
+        return edges
+
+    # One parse per sample so the samples line up with the stage times
+    with memory.PhaseMemory() as parse_memory:
+        edges = timing.measure(_parse, warmup=0, min_sample_time=0).result
+    stage_memory = {
+        "tokenize": {
+            "peak_rss": parse_memory.peak_rss,
+            "py_heap_peak": _python_heap_peak(lambda: dimacs.parse_gr_arrays(path)),
+        }
+    }
+    with memory.PhaseMemory() as build_memory:
+        build = timing.measure(lambda: bench.build_graph(edges))
+    build.result = None
+    with memory.PhaseMemory() as graph_memory:
+        graph = bench.build_graph(edges)
+    stage_memory["build"] = {
+        "peak_rss": build_memory.peak_rss,
+        "py_heap_peak": _python_heap_peak(lambda: bench.build_graph(edges)),
+        "graph_bytes": graph_memory.retained,
+    }
+    del graph
+    return stages, build, stage_memory
+
+
+def _run_queries(queries, func):
+    for query in queries:
+        func(query)
+
+
+def _measure_queries(queries, func):
+    """Time a query workload as a batch and every query on its own
+
+    :param list queries: The :class:`~bench_common.queries.Query` tuples
+    :param callable func: Runs a single query, it's called with the
+        :class:`~bench_common.queries.Query`
+
+    :returns: A tuple of the :class:`~bench_common.timing.Timing` of the
+        whole batch and a list of ``(index, pass, ns)`` latencies where
+        ``index`` is the query's index in ``queries``
+    """
+
+    batch = timing.measure(functools.partial(_run_queries, queries, func))
+    latencies = []
+    order = list(range(len(queries)))
+    # Seeded so every library runs the queries in the same orders
+    rng = random.Random(query_workload.SEED)
+    for query_pass in range(QUERY_PASSES):
+        rng.shuffle(order)
+        for index in order:
+            query_timing = timing.measure(
+                lambda: func(queries[index]),
+                warmup=0,
+                min_repeat=1,
+                max_repeat=1,
+                min_sample_time=0,
+            )
+            latencies.append((index, query_pass, query_timing.samples_ns[0]))
+    return batch, latencies
+
+
+def _query_variants(bench, graph, path):
+    """Return the point to point query variants to time
+
+    :returns: A list of ``(label, func, note)`` tuples for plain Dijkstra
+        and every variant in :data:`bench_common.p2p.VARIANTS`, ``func``
+        runs a query or is ``None`` if the variant is skipped for the
+        reason in ``note``
+    """
+    variants = [
+        ("Dijkstra", lambda query: bench.sssp(graph, query.source, query.target), None)
+    ]
+    great_circle = None
+    for label, operation in p2p.VARIANTS:
+        if not bench.supports(operation):
+            variants.append((label, None, "not supported by backend"))
+        elif operation == "bidirectional_sssp":
+            variants.append(
+                (
+                    label,
+                    lambda query: bench.bidirectional_sssp(
+                        graph, query.source, query.target
+                    ),
+                    None,
+                )
+            )
+        elif operation == "astar":
+            great_circle = great_circle or p2p.load_great_circle(path)
+            if great_circle is None:
+                variants.append((label, None, "no coordinate file"))
+                continue
+            variants.append(
+                (
+                    label,
+                    lambda query: bench.astar(
+                        graph,
+                        query.source,
+                        query.target,
+                        great_circle.heuristic(query.target),
+                    ),
+                    None,
+                )
+            )
+    return variants
+
+
+def _worker_sssp_lengths(source):
+    bench, graph = _WORKER_STATE["bench"], _WORKER_STATE["graph"]
+    # Don't time sending the lengths back to the driver process
+    bench.sssp_lengths(graph, source)
+
+
+def _pool_map(pool, func, sources):
+    for _ in pool.map(func, sources):
+        pass
+
+
+def run_multi_source(bench, path, num_sources=MULTI_SOURCES):
+    """Run the multi source shortest path benchmarks on a DIMACS graph
+
+    The lengths from ``num_sources`` random sources are computed with the
+    library's native batched call (:meth:`Backend.apsp_sources`) and by
+    fanning :meth:`Backend.sssp_lengths` out over thread and process pools
+    of every size in :func:`bench_common.scaling.worker_counts`. The threads share the graph, so
+    they only scale if the library releases the GIL. The processes are
+    forked after the graph is built so they share its memory copy on write,
+    pool sizes whose worst case copies wouldn't fit in memory are skipped.
+
+    :param Backend bench: The backend to benchmark
+    :param str path: The path to the ``.gr`` file
+    :param int num_sources: The number of sources in a batch
+
+    :returns: The path of the written result file
+    """
+    model = memory.MemoryModel.load()
+    graph = bench.load_gr(path, cache=True)
+    num_nodes = bench.num_nodes(graph)
+    num_arcs = bench.num_edges(graph)
+    sources = query_workload.random_sources(num_nodes, min(num_sources, num_nodes))
+    dataset = ".".join(path.split("/")[-1].split(".")[0:2])
+    graph_size = {
+        "num_nodes": num_nodes,
+        "num_edges": num_arcs,
+        "batch_size": len(sources),
+    }
+    writer = results.ResultWriter(bench.name, bench.version())
+    if bench.supports("apsp_sources"):
+        print("running native multi source")
+        native = timing.measure(lambda: bench.apsp_sources(graph, sources))
+        writer.add_timing(dataset, "Multi Source (native)", native, **graph_size)
+    else:
+        writer.add_skipped(
+            dataset, "Multi Source (native)", "not supported by backend", **graph_size
+        )
+    if not bench.supports("sssp_lengths"):
+        for algorithm in ["Multi Source (threads)", "Multi Source (processes)"]:
+            writer.add_skipped(
+                dataset, algorithm, "not supported by backend", **graph_size
+            )
+        return writer.write(dataset + "_multi_source")
+
+    def _thread_sssp_lengths(source):
+        bench.sssp_lengths(graph, source)
+
+    _WORKER_STATE.update(bench=bench, graph=graph)
+    creation = None
+    if "Creation" in model.coefficients.get(bench.name, {}):
+        creation = model.estimate(bench.name, "Creation", num_nodes, num_arcs)
+    for workers in scaling.worker_counts():
+        print("running multi source with %s threads" % workers)
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            pool_timing = timing.measure(
+                lambda: _pool_map(pool, _thread_sssp_lengths, sources)
+            )
+        writer.add_timing(
+            dataset,
+            "Multi Source (threads)",
+            pool_timing,
+            workers=workers,
+            **graph_size
+        )
+        budget = memory.available_memory() * memory.HEADROOM
+        if creation is not None and workers * creation > budget:
+            writer.add_skipped(
+                dataset,
+                "Multi Source (processes)",
+                "graph copies don't fit in memory",
+                workers=workers,
+                **graph_size
+            )
+            continue
+        print("running multi source with %s processes" % workers)
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            # Start the workers before timing
+            _pool_map(pool, _worker_sssp_lengths, sources[:1] * workers)
+            pool_timing = timing.measure(
+                lambda: _pool_map(pool, _worker_sssp_lengths, sources)
+            )
+        writer.add_timing(
+            dataset,
+            "Multi Source (processes)",
+            pool_timing,
+            workers=workers,
+            **graph_size
+        )
+    _WORKER_STATE.clear()
+    scaling.add_scaling_columns(
+        [record for record in writer.records if record["workers"] is not None]
+    )
+    return writer.write(dataset + "_multi_source")
+
+
+def _profile_phases(profiler, bench, path, dataset, profiled):
+    """Profile the phases of a run after all of them are timed
+
+    Profiling last keeps the profilers out of the timings and doesn't start
+    a library's thread pool before the watchdog forks its workers. The
+    graph build is profiled first, with the edge arrays only loaded here.
+
+    :param Profiler profiler: The profiler, nothing is profiled if it's
+        ``None``
+    :param list profiled: ``(phase, func)`` tuples of the other phases
+    """
+    if profiler is None:
+        return
+    edges = dimacs.load_gr_arrays(path)
+    profiler.profile(
+        bench.name, dataset, "Creation (build)", lambda: bench.build_graph(edges)
+    )
+    del edges
+    for phase, func in profiled:
+        profiler.profile(bench.name, dataset, phase, func)
+
+
+def run_shortest_path(
+    bench, path, creation_variants=False, watchdog=None, profiler=None
+):
+    """Run the shortest path benchmarks on a DIMACS graph
+
+    :param Backend bench: The backend to benchmark
+    :param str path: The path to the ``.gr`` file
+    :param bool creation_variants: Also time the backend's
+        :attr:`~bench_common.backend.Backend.creation_variants`
+    :param Watchdog watchdog: Run the single source, all pairs and distance
+        matrix benchmarks under the watchdog's limits. Creation,
+        preprocessing and the query workloads are always run in this
+        process, the graph and index they build are used afterwards.
+    :param Profiler profiler: Profile every phase which finished once all
+        of them are timed, see :mod:`bench_common.profiling`
+
+    :returns: The path of the written result file
+    """
+    model = memory.MemoryModel.load()
+    peaks = {}
+    with memory.PhaseMemory() as creation_memory:
+        creation = timing.measure(lambda: bench.load_gr(path))
+    peaks["Creation"] = creation_memory.peak_rss
+    creation_heap_peak = _python_heap_peak(lambda: bench.load_gr(path))
+    # Make sure the binary cache exists so only loading from it is timed
+    dimacs.load_gr_arrays(path)
+    cached_creation = timing.measure(lambda: bench.load_gr(path, cache=True))
+    graph = cached_creation.result
+    creation_stages, build, stage_memory = _measure_creation_stages(bench, path)
+    variants = {}
+    if creation_variants:
+        for label, options in bench.creation_variants.items():
+            variants[label] = timing.measure(lambda: bench.load_gr(path, **options))
+    num_nodes = bench.num_nodes(graph)
+    num_arcs = bench.num_edges(graph)
+    dataset = ".".join(path.split("/")[-1].split(".")[0:2])
+    graph_size = {"num_nodes": num_nodes, "num_edges": num_arcs}
+    writer = results.ResultWriter(bench.name, bench.version())
+    writer.add_timing(
+        dataset,
+        "Creation",
+        creation,
+        peak_rss=peaks["Creation"],
+        py_heap_peak=creation_heap_peak,
+        **graph_size
+    )
+    writer.add_timing(dataset, "Creation (cached)", cached_creation, **graph_size)
+    # The reader thread overlaps decompressing with tokenizing so the stages
+    # can add up to more than the parse took
+    notes = {"decompress": "uncompressed"}
+    if path.endswith("gz"):
+        notes["decompress"] = dimacs.DECOMPRESSOR
+    for stage, samples in creation_stages.items():
+        for repeat, ns in enumerate(samples):
+            writer.add_record(
+                dataset,
+                "Creation (%s)" % stage,
+                repeat,
+                ns,
+                note=notes.get(stage),
+                **stage_memory.get(stage, {}),
+                **graph_size
+            )
+    writer.add_timing(
+        dataset, "Creation (build)", build, **stage_memory["build"], **graph_size
+    )
+    for label, variant in variants.items():
+        writer.add_timing(dataset, label, variant, **graph_size)
+    # The phases to profile and their functions, these only hold on to the
+    # graph and inputs the run keeps anyway
+    profiled = [
+        ("Creation", lambda: bench.load_gr(path)),
+        ("Creation (cached)", lambda: bench.load_gr(path, cache=True)),
+        ("Creation (parse)", lambda: dimacs.parse_gr_arrays(path)),
+    ]
+    if creation_variants:
+        for label, options in bench.creation_variants.items():
+            profiled.append((label, functools.partial(bench.load_gr, path, **options)))
+    if bench.supports("preprocess"):
+        decision = model.plan(
+            bench.name,
+            "Preprocessing",
+            num_nodes,
+            num_arcs,
+            max_nodes=bench.preprocess_max_nodes,
+        )
+        if decision.action == "skip":
+            # Without the index the backend can't answer any query
+            writer.add_decision(dataset, "Preprocessing", decision, **graph_size)
+            for algorithm in ["Single Source", "Query Workload", "Query Latency"]:
+                writer.add_skipped(
+                    dataset, algorithm, "graph wasn't preprocessed", **graph_size
+                )
+            result_path = writer.write(dataset)
+            _profile_phases(profiler, bench, path, dataset, profiled)
+            return result_path
+        print("running preprocessing")
+        with memory.PhaseMemory() as preprocessing_memory:
+            # Preprocessing is far too slow to repeat, one sample is enough
+            preprocessing = timing.measure(
+                lambda: bench.preprocess(graph),
+                warmup=0,
+                min_repeat=1,
+                max_repeat=1,
+                min_sample_time=0,
+            )
+        writer.add_decision(
+            dataset,
+            "Preprocessing",
+            decision,
+            preprocessing,
+            peak_rss=preprocessing_memory.peak_rss,
+            index_bytes=bench.index_size(graph),
+            **graph_size
+        )
+        profiled.append(("Preprocessing", lambda: bench.preprocess(graph)))
+    print("staring single source")
+    single_source_shortest_path = call_watchdog.measure(
+        lambda: bench.sssp(graph, 0, num_nodes - 1), watchdog
+    )
+    peaks["Single Source"] = single_source_shortest_path.peak_rss
+    workload = query_workload.load_queries(path)
+    settled = {}
+    if num_nodes <= p2p.SETTLED_MAX_NODES and any(
+        bench.supports(operation) for _, operation in p2p.VARIANTS
+    ):
+        settled = p2p.load_settled(path)
+    if bench.supports("count_settled"):
+        # A speedup technique's queries settle far fewer nodes than Dijkstra,
+        # it counts them with an untimed run of every query
+        settled["Dijkstra"] = [
+            bench.count_settled(graph, query.source, query.target) for query in workload
+        ]
+    elif not bench.supports("preprocess"):
+        settled["Dijkstra"] = [2 ** query.rank + 1 for query in workload]
+    query_results = []
+    for label, func, note in _query_variants(bench, graph, path):
+        if func is None:
+            query_results.append((label, None, None, note))
+            continue
+        print("running query workload with %s" % label)
+        query_batch, query_latencies = _measure_queries(workload, func)
+        query_results.append((label, query_batch, query_latencies, None))
+        profiled.append(
+            (
+                "Query Workload" + ("" if label == "Dijkstra" else " (%s)" % label),
+                functools.partial(_run_queries, workload, func),
+            )
+        )
+    phases = {}
+    for phase in ["All Pairs Shortest Path Length", "Distance Matrix"]:
+        phases[phase] = _measure_phase(
+            bench, graph, phase, num_nodes, num_arcs, model, peaks, watchdog=watchdog
+        )
+    for phase, func in bench.extra_phases(graph):
+        phases[phase] = _measure_phase(
+            bench,
+            graph,
+            phase,
+            num_nodes,
+            num_arcs,
+            model,
+            peaks,
+            func=func,
+            watchdog=watchdog,
+        )
+
+    writer.add_outcome(
+        dataset, "Single Source", single_source_shortest_path, **graph_size
+    )
+    for label, query_batch, query_latencies, note in query_results:
+        # Plain Dijkstra keeps the unsuffixed names of earlier results
+        suffix = "" if label == "Dijkstra" else " (%s)" % label
+        if query_batch is None:
+            for algorithm in ["Query Workload", "Query Latency"]:
+                writer.add_skipped(dataset, algorithm + suffix, note, **graph_size)
+            continue
+        writer.add_timing(
+            dataset,
+            "Query Workload" + suffix,
+            query_batch,
+            batch_size=len(workload),
+            **graph_size
+        )
+        for index, query_pass, ns in query_latencies:
+            query = workload[index]
+            writer.add_record(
+                dataset,
+                "Query Latency" + suffix,
+                query_pass,
+                ns,
+                rank=query.rank,
+                settled=settled[label][index] if label in settled else None,
+                note="%s -> %s" % (query.source, query.target),
+                **graph_size
+            )
+    if single_source_shortest_path.status == results.STATUS_OK:
+        profiled.append(("Single Source", lambda: bench.sssp(graph, 0, num_nodes - 1)))
+    for phase, (decision, outcome, func) in phases.items():
+        if outcome is None:
+            writer.add_decision(dataset, phase, decision, **graph_size)
+        elif outcome.status != results.STATUS_OK:
+            writer.add_outcome(dataset, phase, outcome, **graph_size)
+        else:
+            writer.add_decision(
+                dataset,
+                phase,
+                decision,
+                outcome.timing,
+                peak_rss=peaks.get(phase),
+                py_heap_peak=outcome.py_heap_peak,
+                **graph_size
+            )
+            profiled.append((phase, func))
+    result_path = writer.write(dataset)
+    _profile_phases(profiler, bench, path, dataset, profiled)
+    return result_path
+
+
+def _pair_graphs(bench, corpus, path, pair):
+    """Build the target and pattern graph of a corpus pair
+
+    :returns: A list of the target graph, which is searched for the
+        pattern, and the pattern graph
+    """
+    graphs = []
+    for graph_id, graph_file in [
+        (pair.target, pair.target_path),
+        (pair.pattern, pair.pattern_path),
+    ]:
+        if bench.supports("build_graphsdb"):
+            graph = bench.build_graphsdb(corpus.edges(graph_id), directed=False)
+        else:
+            graph_file_path = os.path.join(path, graph_file)
+            graph = bench.load_graphsdb(graph_file_path, directed=False)
+        graphs.append(graph)
+    return graphs
+
+
+def _run_pairs(func, pair_graphs, induced):
+    for graphs in pair_graphs:
+        func(*graphs, induced=induced)
+
+
+def _measure_pairs(bench, corpus, path, indices, runs, family_timeout=0, watchdog=None):
+    """Time the subgraph isomorphism modes on some corpus pairs
+
+    :param Backend bench: The backend to benchmark
+    :param ArgCorpus corpus: The corpus of the ARG database
+    :param str path: The root of the ARG database
+    :param list indices: The indices of the pairs in ``corpus.pairs``
+    :param list runs: The ``(mode, induced)`` tuples to time, see
+        :data:`ISO_MODES`
+    :param float family_timeout: The seconds the pairs of a family may take
+        before its remaining pairs are skipped, 0 for no limit
+    :param Watchdog watchdog: Run every call under the watchdog's limits
+
+    :returns: A list of ``(index, run_outcomes)`` tuples where
+        ``run_outcomes`` has a ``(mode, induced, Outcome, embeddings)``
+        tuple per run, or is ``None`` if the pair was skipped for its
+        family's time limit. The outcome is ``None`` if the backend doesn't
+        support the mode and doesn't keep the result so it can be sent back
+        from a worker process.
+    """
+    timings = []
+    family_ns = collections.defaultdict(int)
+    for index in indices:
+        pair = corpus.pairs[index]
+        if family_timeout and family_ns[pair.family] >= family_timeout * 10 ** 9:
+            timings.append((index, None))
+            continue
+        start = time.perf_counter_ns()
+        graphs = _pair_graphs(bench, corpus, path, pair)
+        run_outcomes = []
+        for mode, induced in runs:
+            operation = ISO_MODES[mode]
+            if not bench.supports(operation):
+                run_outcomes.append((mode, induced, None, None))
+                continue
+            func = getattr(bench, operation)
+            outcome = call_watchdog.measure(
+                lambda: func(*graphs, induced=induced),
+                watchdog,
+                result=ISO_RESULTS[mode],
+                min_sample_time=ISO_MIN_SAMPLE_TIME,
+            )
+            embeddings = None
+            if outcome.status == results.STATUS_OK:
+                if not outcome.timing.result:
+                    error_str = " ".join([pair.target_path, pair.pattern_path])
+                    raise Exception("%s should be isomorphic" % error_str)
+                if mode != "first":
+                    embeddings = outcome.timing.result
+                outcome.timing.result = None
+            run_outcomes.append((mode, induced, outcome, embeddings))
+        timings.append((index, run_outcomes))
+        family_ns[pair.family] += time.perf_counter_ns() - start
+    return timings
+
+
+def _worker_iso_shard(shard):
+    """Time a shard of the corpus pairs in a pinned pool worker
+
+    :param tuple shard: The worker's ``(cpu, indices)``
+    """
+    cpu, indices = shard
+    os.sched_setaffinity(0, {cpu})
+    return _measure_pairs(
+        _WORKER_STATE["bench"],
+        _WORKER_STATE["corpus"],
+        _WORKER_STATE["path"],
+        indices,
+        _WORKER_STATE["runs"],
+        _WORKER_STATE["family_timeout"],
+        _WORKER_STATE["watchdog"],
+    )
+
+
+def run_isomorphism(
+    bench,
+    path,
+    workers=1,
+    modes=DEFAULT_ISO_MODES,
+    semantics=DEFAULT_ISO_SEMANTICS,
+    families=DEFAULT_ISO_FAMILIES,
+    family_timeout=ISO_FAMILY_TIMEOUT,
+    watchdog=None,
+    profiler=None,
+):
+    """Run the subgraph isomorphism benchmarks on the ARG database
+
+    With more than one worker the pairs are sharded round robin over a pool
+    of forked processes, each pinned to its own CPU so the per pair times
+    stay comparable with a serial run. The records are written in corpus
+    order either way, and the whole sweep's pairs per second is recorded as
+    "Subgraph Isomorphism Sweep".
+
+    Every mode is run with every semantics, each is recorded under
+    :func:`bench_common.results.isomorphism_algorithm` with the number of
+    embeddings found by the ``all`` and ``count`` modes.
+
+    The pairs of every graph family in the corpus are run smallest target
+    first. Once a worker spent ``family_timeout`` seconds on a family the
+    rest of its pairs are recorded as skipped, so a family where a
+    library's search blows up doesn't hold up the others.
+
+    :param Backend bench: The backend to benchmark
+    :param str path: The root of the ARG database
+    :param int workers: The number of worker processes, ``0`` for one per
+        CPU this process may run on
+    :param list modes: The modes to run from :data:`ISO_MODES`
+    :param list semantics: ``"induced"`` and/or ``"non-induced"`` matching
+    :param list families: fnmatch patterns of the families to run, e.g.
+        ``si2/rand/*``
+    :param float family_timeout: The seconds a worker may spend on a
+        family, 0 for no limit
+    :param Watchdog watchdog: Run every call under the watchdog's limits, a
+        call it stops is recorded with its ``"timeout"`` or ``"oom"``
+        status
+    :param Profiler profiler: After the sweep profile every mode over the
+        pairs it finished, see :mod:`bench_common.profiling`
+
+    :returns: The path of the written result file
+    """
+    writer = results.ResultWriter(bench.name, bench.version())
+    corpus = graphsdb.load_corpus(path)
+    cpus = sorted(os.sched_getaffinity(0))
+    if not workers:
+        workers = len(cpus)
+    indices = [
+        index
+        for index, pair in enumerate(corpus.pairs)
+        if any(fnmatch.fnmatchcase(pair.family, family) for family in families)
+    ]
+    runs = [(mode, ISO_SEMANTICS[name]) for mode in modes for name in semantics]
+    print("running %s pairs on %s workers" % (len(indices), workers))
+    if workers == 1:
+        start = time.perf_counter_ns()
+        timings = _measure_pairs(
+            bench, corpus, path, indices, runs, family_timeout, watchdog
+        )
+        sweep_ns = time.perf_counter_ns() - start
+    else:
+        # A pair always goes to the same worker for a given worker count
+        shards = [
+            (cpus[worker % len(cpus)], indices[worker::workers])
+            for worker in range(workers)
+        ]
+        _WORKER_STATE.update(
+            bench=bench,
+            corpus=corpus,
+            path=path,
+            runs=runs,
+            family_timeout=family_timeout,
+            watchdog=watchdog,
+        )
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            start = time.perf_counter_ns()
+            shard_timings = list(pool.map(_worker_iso_shard, shards))
+            sweep_ns = time.perf_counter_ns() - start
+        _WORKER_STATE.clear()
+        timings = sorted(
+            (pair_timing for shard in shard_timings for pair_timing in shard),
+            key=lambda pair_timing: pair_timing[0],
+        )
+    measured = 0
+    # The pairs every algorithm finished, the ones to profile
+    finished = collections.defaultdict(list)
+    for index, run_outcomes in timings:
+        if run_outcomes is None:
+            for mode, induced in runs:
+                writer.add_skipped(
+                    corpus.pairs[index].name,
+                    results.isomorphism_algorithm(mode, induced),
+                    "%s time limit of %s sec. reached"
+                    % (corpus.pairs[index].family, family_timeout),
+                    workers=workers,
+                )
+            continue
+        measured += 1
+        for mode, induced, outcome, embeddings in run_outcomes:
+            algorithm = results.isomorphism_algorithm(mode, induced)
+            if outcome is None:
+                writer.add_skipped(
+                    corpus.pairs[index].name,
+                    algorithm,
+                    "not supported by backend",
+                    workers=workers,
+                )
+                continue
+            writer.add_outcome(
+                corpus.pairs[index].name,
+                algorithm,
+                outcome,
+                workers=workers,
+                embeddings=embeddings,
+            )
+            if outcome.status == results.STATUS_OK:
+                finished[algorithm].append(index)
+    writer.add_record(
+        "graphsdb",
+        results.ISOMORPHISM_SWEEP,
+        0,
+        sweep_ns,
+        batch_size=measured,
+        workers=workers,
+        note=", ".join(
+            results.isomorphism_algorithm(mode, induced) for mode, induced in runs
+        ),
+    )
+    result_path = writer.write("subgraph_iso")
+    if profiler is not None:
+        for mode, induced in runs:
+            algorithm = results.isomorphism_algorithm(mode, induced)
+            if not finished[algorithm]:
+                continue
+            pair_graphs = [
+                _pair_graphs(bench, corpus, path, corpus.pairs[index])
+                for index in finished[algorithm]
+            ]
+            profiler.profile(
+                bench.name,
+                "graphsdb",
+                algorithm,
+                functools.partial(
+                    _run_pairs, getattr(bench, ISO_MODES[mode]), pair_graphs, induced
+                ),
+            )
+    return result_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a benchmark on a backend")
+    parser.add_argument("backend", help="The backend name, see bench_common.backend")
+    parser.add_argument("algorithm", choices=ALGORITHMS)
+    parser.add_argument(
+        "path",
+        help="The .gr file for shortest_path, multi_source and thread_scaling, "
+        "the ARG database root otherwise",
+    )
+    parser.add_argument(
+        "--creation-variants",
+        action="store_true",
+        help="Also time the backend's alternative graph construction paths",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=ISO_WORKERS,
+        help="The number of processes the isomorphism pairs are sharded "
+        "over, 0 for one per CPU",
+    )
+    parser.add_argument(
+        "--iso-modes",
+        nargs="+",
+        choices=list(ISO_MODES),
+        default=DEFAULT_ISO_MODES,
+        help="The isomorphism modes: time to the first match, to enumerate "
+        "all embeddings and to count them",
+    )
+    parser.add_argument(
+        "--iso-semantics",
+        nargs="+",
+        choices=list(ISO_SEMANTICS),
+        default=DEFAULT_ISO_SEMANTICS,
+        help="Match induced subgraphs and/or monomorphisms",
+    )
+    parser.add_argument(
+        "--families",
+        nargs="+",
+        default=DEFAULT_ISO_FAMILIES,
+        help="fnmatch patterns of the ARG database families to run",
+    )
+    parser.add_argument(
+        "--family-timeout",
+        type=float,
+        default=ISO_FAMILY_TIMEOUT,
+        help="Skip the rest of a family's isomorphism pairs after this many "
+        "seconds, 0 for no limit",
+    )
+    parser.add_argument(
+        "--watchdog",
+        action="store_true",
+        help="Run every measured call in a supervised worker process and "
+        "record calls over the limits as timeout or oom",
+    )
+    parser.add_argument(
+        "--watchdog-timeout",
+        type=float,
+        default=call_watchdog.TIMEOUT,
+        help="The seconds a call may run for under the watchdog",
+    )
+    parser.add_argument(
+        "--watchdog-max-rss",
+        type=float,
+        default=call_watchdog.MAX_RSS,
+        help="The bytes a call's worker may grow to under the watchdog, "
+        "defaults to 90%% of the available memory",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile every phase with cProfile after it's timed, see "
+        "bench_common.profiling",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=profiling.PROFILE_DIR,
+        help="The directory the profiles are written to",
+    )
+    parser.add_argument(
+        "--profile-native",
+        choices=list(profiling.NATIVE_PROFILERS),
+        default=profiling.NATIVE,
+        help="Also record a native profile of the extension frames",
+    )
+    parser.add_argument(
+        "--num-sources",
+        type=int,
+        default=MULTI_SOURCES,
+        help="The number of sources for multi_source",
+    )
+    args = parser.parse_args(argv)
+
+    bench = backend_registry.get_backend(args.backend)
+    watchdog = None
+    if args.watchdog:
+        watchdog = call_watchdog.Watchdog(args.watchdog_timeout, args.watchdog_max_rss)
+    profiler = None
+    if args.profile:
+        profiler = profiling.Profiler(args.profile_dir, args.profile_native)
+    if args.algorithm == "shortest_path":
+        run_shortest_path(
+            bench,
+            args.path,
+            creation_variants=args.creation_variants,
+            watchdog=watchdog,
+            profiler=profiler,
+        )
+    elif args.algorithm == "multi_source":
+        run_multi_source(bench, args.path, num_sources=args.num_sources)
+    elif args.algorithm == "thread_scaling":
+        scaling.run_thread_scaling(bench, args.path)
+    elif not bench.supports("subgraph_iso"):
+        print("Skipping isomorphism, %s doesn't support it" % bench.name)
+    else:
+        run_isomorphism(
+            bench,
+            args.path,
+            workers=args.workers,
+            modes=args.iso_modes,
+            semantics=args.iso_semantics,
+            families=args.families,
+            family_timeout=args.family_timeout,
+            watchdog=watchdog,
+            profiler=profiler,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Library independent parser for the ARG database graph files
+
+The unlabeled graph files of the ARG database are a sequence of little
+endian 16 bit words::
+
+    num_nodes
+    out_degree(0) target ... target
+    out_degree(1) target ... target
+    ...
+
+https://mivia.unisa.it/datasets/graph-database/arg-database/
+
+Like :mod:`bench_common.dimacs` the whole file is read into one array and
+decoded into edge arrays, each library's ``graphsdb_parser`` builds its
+graph from them with its bulk constructor.
+
+The isomorphism benchmark doesn't read the thousands of small files though.
+:func:`write_corpus` parses every pattern/target pair of the database once
+into a single packed container (``<graphsdb>.corpus``) with the graphs as
+concatenated CSR arrays and an index of the pairs by name. Every backend's
+run memory maps it with :class:`ArgCorpus`, so the parsing isn't repeated
+per library and no file system access happens between the timed pairs.
+"""
+
+import argparse
+from collections import namedtuple
+import hashlib
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+# The ARG database directories the isomorphism benchmark runs on, the
+# pattern (A) and target (B) graphs are in <prefix>/<group>/<type>. Every
+# group and type directory found under a prefix is a family of the corpus.
+SUBGRAPH_PREFIXES = ["si6", "si4", "si2"]
+# The graph groups of the database and their plot titles:
+#
+# * rand: randomly connected with edge probability 0.01, 0.05 and 0.1
+#   (types r001, r005 and r01)
+# * bvg: bounded valence 3, 6 and 9 (b03, b06 and b09), the irregular
+#   variants (b03m etc.) have some edges moved so the valence varies
+# * m2D, m3D and m4D: meshes (m2D etc.), the irregular variants (m2Dr2,
+#   m2Dr4 and m2Dr6 etc.) have 0.2, 0.4 and 0.6 extra edges per node
+GRAPH_GROUPS = {
+    "rand": "Randomly connected graphs",
+    "bvg": "Bounded valence graphs",
+    "m2D": "2D meshes",
+    "m3D": "3D meshes",
+    "m4D": "4D meshes",
+}
+_TYPE_PATTERN = re.compile(
+    r"(?P<group>r|b|m[234]D)(?P<parameter>\d*)(?P<irregular>m|r\d)?"
+)
+
+CORPUS_SUFFIX = ".corpus"
+CORPUS_VERSION = 2
+# magic, version, padding, num_graphs, indptr length, neighbors length,
+# index length. The header is 48 bytes so the arrays after it stay aligned.
+_CORPUS_HEADER = struct.Struct("<8sIIqqqq")
+_CORPUS_MAGIC = b"ARGCORPS"
+
+ArgPair = namedtuple(
+    "ArgPair", ["name", "family", "pattern", "target", "pattern_path", "target_path"]
+)
+ArgPair.__doc__ = """A pattern/target pair of the corpus
+
+``name`` is the pattern's file name and ``family`` its directory, e.g.
+``si2/bvg/b03``. ``pattern`` and ``target`` are graph ids for
+:meth:`ArgCorpus.edges`, the paths are relative to the database root.
+"""
+
+ArgType = namedtuple("ArgType", ["group", "label", "irregular"])
+ArgType.__doc__ = """The graph group of an ARG database type, see :func:`arg_type`"""
+
+ArgEdges = namedtuple("ArgEdges", ["num_nodes", "sources", "targets"])
+ArgEdges.__doc__ = """Edge arrays parsed from an ARG database graph file
+
+The ``sources`` and ``targets`` arrays are int64 in the order the edges
+are listed in the file. An undirected graph lists an edge from both its
+endpoints.
+"""
+
+
+def _degree_positions(words, num_nodes):
+    """Find the position of every node's degree word
+
+    A node's degree word follows the targets of the node before it, so the
+    positions are a chain through the words. It's followed with pointer
+    doubling: from the jump of every word to the next degree word, each pass
+    doubles the nodes found and squares the jumps, that's a NumPy pass per
+    doubling instead of a Python step per node.
+    """
+    length = len(words)
+    # The jump from every word if it were a degree word, the ones past the
+    # end go to a sentinel at length which jumps to itself
+    jumps = np.full(length + 1, length, dtype=np.int64)
+    jumps[:length] = np.arange(1, length + 1) + words
+    np.minimum(jumps, length, out=jumps)
+    positions = np.array([min(1, length)], dtype=np.int64)
+    while len(positions) < num_nodes:
+        positions = np.concatenate((positions, jumps[positions]))
+        if len(positions) < num_nodes:
+            jumps = jumps[jumps]
+    positions = positions[:num_nodes]
+    past_end = np.flatnonzero(positions == length)
+    if len(past_end):
+        raise Exception(
+            "Invalid ARG file, it ends before the edges of node %s" % past_end[0]
+        )
+    return positions
+
+
+def decode_arg_words(words):
+    """Decode the 16 bit words of an ARG database graph file
+
+    :param words: The file contents as an array of unsigned 16 bit integers
+
+    :returns: An :class:`ArgEdges` tuple
+    """
+    if not len(words):
+        raise Exception("Invalid ARG file, it's empty")
+    num_nodes = int(words[0])
+    degree_positions = _degree_positions(words, num_nodes)
+    degrees = words[degree_positions].astype(np.int64)
+    # Every node takes its degree word and its targets, the running total
+    # ends at the word after the last node's targets
+    node_ends = 1 + np.cumsum(degrees + 1)
+    end = int(node_ends[-1]) if num_nodes else 1
+    if end != len(words):
+        raise Exception(
+            "Invalid ARG file, expected %s words for %s nodes but found %s"
+            % (end, num_nodes, len(words))
+        )
+    is_target = np.ones(len(words), dtype=bool)
+    is_target[0] = False
+    is_target[degree_positions] = False
+    sources = np.repeat(np.arange(num_nodes, dtype=np.int64), degrees)
+    targets = words[is_target].astype(np.int64)
+    if len(targets) and targets.max() >= num_nodes:
+        raise Exception(
+            "Invalid ARG file, edge target %s out of range for %s nodes"
+            % (targets.max(), num_nodes)
+        )
+    return ArgEdges(num_nodes, sources, targets)
+
+
+def parse_arg_arrays(path):
+    """Parse an ARG database graph file into edge arrays
+
+    :param str path: A path to the graph file to parse
+
+    :returns: An :class:`ArgEdges` tuple
+    """
+    with open(path, "rb") as graph_file:
+        data = graph_file.read()
+    if len(data) % 2:
+        raise Exception("Invalid ARG file, it has an odd number of bytes")
+    return decode_arg_words(np.frombuffer(data, dtype="<u2"))
+
+
+def arg_type(g_type):
+    """Describe an ARG database graph type
+
+    :param str g_type: The type directory (and second field of the file
+        names), e.g. ``b03`` or ``m2Dr4``
+
+    :returns: An :class:`ArgType` with the type's group in
+        :data:`GRAPH_GROUPS`, a label for plots and whether it's an
+        irregular variant. Unknown types are their own group.
+    """
+    match = _TYPE_PATTERN.fullmatch(g_type)
+    if match is None:
+        return ArgType(g_type, g_type, False)
+    group, parameter, irregular = match.groups()
+    if group == "r":
+        return ArgType("rand", "edge probability 0.%s" % parameter[1:], False)
+    if group == "b":
+        label = "valence %s" % int(parameter)
+        if irregular:
+            return ArgType("bvg", "irregular, " + label, True)
+        return ArgType("bvg", label, False)
+    if irregular:
+        return ArgType(
+            group, "irregular, %s extra edges" % (int(irregular[1:]) / 10), True
+        )
+    return ArgType(group, "regular", False)
+
+
+def split_pair_name(name):
+    """Split the name of a pair into its prefix, type and size
+
+    :param str name: The pattern's file name, e.g. ``si2_b03_m200.A00``
+
+    :returns: A ``(prefix, type, num_nodes)`` tuple like
+        ``("si2", "b03", 200)``, the number of nodes is the target's
+    """
+    fields = name.split(".")[0].split("_")
+    if len(fields) != 3 or not fields[2][1:].isdigit():
+        raise Exception("Invalid ARG file name %s" % name)
+    return fields[0], fields[1], int(fields[2][1:])
+
+
+def corpus_path(graphsdb_path):
+    """Return the path of the corpus container for an ARG database"""
+    return os.path.normpath(graphsdb_path) + CORPUS_SUFFIX
+
+
+def _subdirectories(path):
+    if not os.path.isdir(path):
+        return []
+    return sorted(
+        name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name))
+    )
+
+
+def _pair_files(graphsdb_path):
+    """Return the ``(family, pattern, target)`` relative paths of every pair
+    in a deterministic order
+
+    The pairs of a family are ordered by the size of the target graph so a
+    family's time limit in the driver skips its largest graphs.
+    """
+    pairs = []
+    for prefix in SUBGRAPH_PREFIXES:
+        prefix_path = os.path.join(graphsdb_path, prefix)
+        for group in _subdirectories(prefix_path):
+            for g_type in _subdirectories(os.path.join(prefix_path, group)):
+                family = "/".join([prefix, group, g_type])
+                graph_dir_path = os.path.join(graphsdb_path, family)
+                filenames = sorted(
+                    (split_pair_name(filename)[2], filename)
+                    for filename in os.listdir(graph_dir_path)
+                    if ".A" in filename
+                )
+                for _, filename in filenames:
+                    pairs.append(
+                        (
+                            family,
+                            os.path.join(family, filename),
+                            os.path.join(family, filename.replace("A", "B")),
+                        )
+                    )
+    return pairs
+
+
+def _fingerprint(graphsdb_path, pairs):
+    """Digest of the size and mtime of every file of the pairs"""
+    digest = hashlib.sha256()
+    for _, pattern_path, target_path in pairs:
+        for relative_path in (pattern_path, target_path):
+            stat = os.stat(os.path.join(graphsdb_path, relative_path))
+            digest.update(
+                (
+                    "%s:%s:%s\n" % (relative_path, stat.st_size, stat.st_mtime_ns)
+                ).encode()
+            )
+    return digest.hexdigest()
+
+
+def write_corpus(graphsdb_path, out_path=None):
+    """Parse every pair of an ARG database into a corpus container
+
+    The container is a fixed size header followed by the int64 offsets of
+    every graph into the indptr and neighbor arrays, the concatenated
+    int32 CSR indptr arrays (relative to the graph's first neighbor), the
+    concatenated uint16 neighbor arrays and a JSON index of the pairs.
+    Files with the same contents are stored once.
+
+    :param str graphsdb_path: The root of the ARG database
+    :param str out_path: The container path, defaults to
+        :func:`corpus_path`
+
+    :returns: The path of the written container
+    """
+    if out_path is None:
+        out_path = corpus_path(graphsdb_path)
+    pairs = _pair_files(graphsdb_path)
+    graph_ids = {}
+    indptrs = []
+    neighbors = []
+    index = []
+
+    def _add_graph(relative_path):
+        with open(os.path.join(graphsdb_path, relative_path), "rb") as graph_file:
+            data = graph_file.read()
+        key = hashlib.sha256(data).digest()
+        if key not in graph_ids:
+            if len(data) % 2:
+                raise Exception(
+                    "Invalid ARG file %s, it has an odd number of bytes" % relative_path
+                )
+            edges = decode_arg_words(np.frombuffer(data, dtype="<u2"))
+            indptr = np.zeros(edges.num_nodes + 1, dtype=np.int32)
+            np.cumsum(
+                np.bincount(edges.sources, minlength=edges.num_nodes), out=indptr[1:]
+            )
+            graph_ids[key] = len(indptrs)
+            indptrs.append(indptr)
+            # Sources are in ascending order already, the targets are CSR
+            neighbors.append(edges.targets.astype("<u2"))
+        return graph_ids[key]
+
+    for family, pattern_path, target_path in pairs:
+        index.append(
+            {
+                "name": os.path.basename(pattern_path),
+                "family": family,
+                "pattern": _add_graph(pattern_path),
+                "target": _add_graph(target_path),
+                "pattern_path": pattern_path,
+                "target_path": target_path,
+            }
+        )
+    indptr_offsets = np.zeros(len(indptrs) + 1, dtype="<i8")
+    np.cumsum([len(indptr) for indptr in indptrs], out=indptr_offsets[1:])
+    neighbor_offsets = np.zeros(len(neighbors) + 1, dtype="<i8")
+    np.cumsum([len(targets) for targets in neighbors], out=neighbor_offsets[1:])
+    raw_index = json.dumps(
+        {"fingerprint": _fingerprint(graphsdb_path, pairs), "pairs": index}
+    ).encode()
+    header = _CORPUS_HEADER.pack(
+        _CORPUS_MAGIC,
+        CORPUS_VERSION,
+        0,
+        len(indptrs),
+        int(indptr_offsets[-1]),
+        int(neighbor_offsets[-1]),
+        len(raw_index),
+    )
+    # Write to a temporary file and rename it so a concurrent reader never
+    # sees a partially written container
+    tmp_path = "%s.%s.tmp" % (out_path, os.getpid())
+    with open(tmp_path, "wb") as fd:
+        fd.write(header)
+        indptr_offsets.tofile(fd)
+        neighbor_offsets.tofile(fd)
+        for indptr in indptrs:
+            indptr.astype("<i4").tofile(fd)
+        for targets in neighbors:
+            targets.tofile(fd)
+        fd.write(raw_index)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _read_corpus_header(path):
+    try:
+        with open(path, "rb") as fd:
+            raw_header = fd.read(_CORPUS_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw_header) != _CORPUS_HEADER.size:
+        return None
+    header = _CORPUS_HEADER.unpack(raw_header)
+    if header[0] != _CORPUS_MAGIC or header[1] != CORPUS_VERSION:
+        return None
+    return header
+
+
+class ArgCorpus:
+    """A memory mapped corpus container written by :func:`write_corpus`
+
+    :param str path: The path of the container
+
+    :attr list pairs: The :class:`ArgPair` tuples in the order they were
+        found
+    :attr str fingerprint: The digest of the database files it was built
+        from
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = _read_corpus_header(path)
+        if header is None:
+            raise Exception("Invalid corpus file %s" % path)
+        _, _, _, num_graphs, indptr_size, neighbors_size, index_size = header
+        offset = _CORPUS_HEADER.size
+        self._indptr_offsets = np.memmap(
+            path, dtype="<i8", mode="r", offset=offset, shape=num_graphs + 1
+        )
+        offset += 8 * (num_graphs + 1)
+        self._neighbor_offsets = np.memmap(
+            path, dtype="<i8", mode="r", offset=offset, shape=num_graphs + 1
+        )
+        offset += 8 * (num_graphs + 1)
+        # np.memmap can't map an empty region
+        self._indptr = np.zeros(0, dtype="<i4")
+        if indptr_size:
+            self._indptr = np.memmap(
+                path, dtype="<i4", mode="r", offset=offset, shape=indptr_size
+            )
+        offset += 4 * indptr_size
+        self._neighbors = np.zeros(0, dtype="<u2")
+        if neighbors_size:
+            self._neighbors = np.memmap(
+                path, dtype="<u2", mode="r", offset=offset, shape=neighbors_size
+            )
+        offset += 2 * neighbors_size
+        with open(path, "rb") as fd:
+            fd.seek(offset)
+            index = json.loads(fd.read(index_size))
+        self.fingerprint = index["fingerprint"]
+        self.pairs = [ArgPair(**pair) for pair in index["pairs"]]
+
+    @property
+    def num_graphs(self):
+        return len(self._indptr_offsets) - 1
+
+    def edges(self, graph_id):
+        """Return the edge arrays of a graph
+
+        :param int graph_id: The ``pattern`` or ``target`` of an
+            :class:`ArgPair`
+
+        :returns: An :class:`ArgEdges` tuple like
+            :func:`parse_arg_arrays` returns
+        """
+        indptr = self._indptr[
+            self._indptr_offsets[graph_id] : self._indptr_offsets[graph_id + 1]
+        ]
+        start = self._neighbor_offsets[graph_id]
+        stop = self._neighbor_offsets[graph_id + 1]
+        num_nodes = len(indptr) - 1
+        sources = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(indptr))
+        targets = self._neighbors[start:stop].astype(np.int64)
+        return ArgEdges(num_nodes, sources, targets)
+
+
+def load_corpus(graphsdb_path):
+    """Load the corpus of an ARG database, writing it first if needed
+
+    The container is rewritten if the database files changed since it was
+    written.
+
+    :param str graphsdb_path: The root of the ARG database
+
+    :returns: An :class:`ArgCorpus`
+    """
+    path = corpus_path(graphsdb_path)
+    if _read_corpus_header(path) is not None:
+        corpus = ArgCorpus(path)
+        if corpus.fingerprint == _fingerprint(
+            graphsdb_path, _pair_files(graphsdb_path)
+        ):
+            return corpus
+    write_corpus(graphsdb_path, path)
+    return ArgCorpus(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pack the ARG database into an isomorphism corpus"
+    )
+    parser.add_argument("path", help="The root of the ARG database")
+    args = parser.parse_args(argv)
+    corpus = load_corpus(args.path)
+    print(
+        "Wrote %s pairs (%s distinct graphs) to %s"
+        % (len(corpus.pairs), corpus.num_graphs, corpus.path)
+    )
+
+
+if __name__ == "__main__":
+    main()
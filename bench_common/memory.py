@@ -0,0 +1,416 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Memory model used to decide which benchmarks fit on the current machine
+
+Every library and benchmark phase has a linear model of its peak memory::
+
+    bytes = per_node * n + per_arc * m + per_pair * n ** 2
+
+The built in coefficients are rough estimates, they can be replaced by ones
+fitted from the peak RSS the shortest path scripts record for each phase
+(see :class:`PhaseMemory`) in the result store::
+
+    python -m bench_common.memory fit results
+
+which writes ``memory_model.json`` in the repository root. At runtime the
+model is compared against the memory currently available to decide whether
+to run a phase as is, run it in chunks of sources, or skip it.
+"""
+
+import argparse
+import ctypes
+import gc
+from collections import defaultdict
+from collections import namedtuple
+import json
+import os
+import resource
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(REPO_ROOT, "memory_model.json")
+
+# Only plan to use this fraction of the available memory
+HEADROOM = 0.8
+# Record the peak of the Python heap allocations (tracemalloc) of every
+# phase, tracing slows the calls down so it takes an extra untimed call
+TRACE_ALLOCATIONS = os.getenv("BENCH_TRACEMALLOC", "0") == "1"
+# The quadratic phases take too long to run on graphs this size regardless
+# of memory
+MAX_NODES = {
+    "All Pairs Shortest Path Length": 100000,
+    "All Pairs Shortest Path Length (Floyd-Warshall)": 10000,
+    "Distance Matrix": 100000,
+}
+
+# (per_node, per_arc, per_pair) in bytes
+DEFAULT_COEFFICIENTS = {
+    "retworkx": {
+        "Creation": (100, 250, 0),
+        "Single Source": (40, 0, 0),
+        "All Pairs Shortest Path Length": (0, 0, 40),
+        "Distance Matrix": (0, 0, 8),
+    },
+    "networkx": {
+        "Creation": (400, 700, 0),
+        "Single Source": (200, 0, 0),
+        "All Pairs Shortest Path Length": (0, 0, 150),
+        "Distance Matrix": (0, 0, 24),
+    },
+    "igraph": {
+        "Creation": (50, 250, 0),
+        "Single Source": (40, 0, 0),
+        "All Pairs Shortest Path Length": (0, 0, 40),
+        "Distance Matrix": (0, 0, 48),
+    },
+    "graph-tool": {
+        "Creation": (50, 200, 0),
+        "Single Source": (40, 0, 0),
+        "All Pairs Shortest Path Length": (0, 0, 16),
+        "Distance Matrix": (0, 0, 24),
+    },
+    "scipy": {
+        "Creation": (8, 64, 0),
+        "Single Source": (24, 0, 0),
+        "Single Source (limited)": (24, 0, 0),
+        "All Pairs Shortest Path Length": (0, 0, 16),
+        "All Pairs Shortest Path Length (Floyd-Warshall)": (0, 0, 16),
+        "Distance Matrix": (0, 0, 16),
+    },
+    "alt": {
+        "Creation": (16, 120, 0),
+        "Single Source": (200, 0, 0),
+        "Preprocessing": (300, 0, 0),
+    },
+    "ch": {
+        "Creation": (16, 120, 0),
+        "Single Source": (200, 0, 0),
+        "Preprocessing": (600, 400, 0),
+    },
+}
+
+Decision = namedtuple(
+    "Decision", ["action", "estimate", "available", "chunk_size", "reason"]
+)
+Decision.__doc__ = """The plan for running a benchmark phase
+
+``action`` is one of ``"run"``, ``"chunk"`` or ``"skip"``. For ``"chunk"``
+the phase should be run over ``chunk_size`` sources at a time.
+"""
+
+
+def _proc_status(field):
+    """Return a memory field of /proc/self/status in bytes or None"""
+    try:
+        with open("/proc/self/status") as fd:
+            for line in fd:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss():
+    """Return the peak resident set size of this process in bytes"""
+    peak = _proc_status("VmHWM")
+    if peak is None:
+        # ru_maxrss is in kilobytes on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return peak
+
+
+def current_rss():
+    """Return the resident set size of this process in bytes"""
+    rss = _proc_status("VmRSS")
+    if rss is None:
+        return peak_rss()
+    return rss
+
+
+def trim_heap():
+    """Return the free memory of the heap to the system
+
+    Collects garbage and, with glibc, trims the C heap so memory freed by
+    an earlier phase isn't reused by the next one without showing in its
+    resident set.
+    """
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def reset_peak_rss():
+    """Reset the peak resident set size of this process to its current size
+
+    :returns: Whether the peak could be reset, it needs Linux's
+        ``/proc/self/clear_refs``
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as fd:
+            fd.write("5")
+    except OSError:
+        return False
+    return True
+
+
+class PhaseMemory:
+    """Measure the memory of a benchmark phase
+
+    Used as a context manager around the phase. The heap is trimmed (see
+    :func:`trim_heap`) and the peak resident set of the process is reset when
+    the phase starts so the peak is the phase's own.
+    Where it can't be reset the peak is the growth of the process' peak,
+    which is 0 for a phase that stays below an earlier phase's peak.
+
+    :attr int peak_rss: The growth of the peak resident set over the
+        resident set when the phase started in bytes
+    :attr int retained: The growth of the resident set from the start to
+        the end of the phase in bytes, e.g. the memory of a built graph
+    """
+
+    def __enter__(self):
+        trim_heap()
+        self.start_rss = current_rss()
+        if reset_peak_rss():
+            self.start_peak = self.start_rss
+        else:
+            self.start_peak = peak_rss()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.peak_rss = max(peak_rss() - self.start_peak, 0)
+        self.retained = current_rss() - self.start_rss
+
+
+def python_heap_peak(func):
+    """Return the peak of the Python heap allocations of a call
+
+    The allocations are traced with :mod:`tracemalloc`, which includes the
+    NumPy arrays but not the memory a library's extension allocates itself.
+
+    :param callable func: The call, without any arguments
+
+    :returns: The peak in bytes
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def available_memory():
+    """Return the memory available for new allocations in bytes
+
+    This uses ``MemAvailable`` from ``/proc/meminfo`` and falls back to the
+    number of free physical pages where that isn't available.
+    """
+    try:
+        with open("/proc/meminfo") as fd:
+            for line in fd:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+class MemoryModel:
+    """Per library and phase peak memory model
+
+    :param dict coefficients: A mapping of library name to a mapping of phase
+        name to ``(per_node, per_arc, per_pair)`` byte coefficients. Missing
+        entries fall back to :data:`DEFAULT_COEFFICIENTS`.
+    """
+
+    def __init__(self, coefficients=None):
+        self.coefficients = {
+            library: dict(phases) for library, phases in DEFAULT_COEFFICIENTS.items()
+        }
+        for library, phases in (coefficients or {}).items():
+            self.coefficients.setdefault(library, {}).update(
+                {phase: tuple(coeffs) for phase, coeffs in phases.items()}
+            )
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """Load a fitted model, using the default one if ``path`` is missing"""
+        try:
+            with open(path) as fd:
+                return cls(json.load(fd))
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, path=MODEL_PATH):
+        with open(path, "w") as fd:
+            json.dump(self.coefficients, fd, indent=2, sort_keys=True)
+
+    def estimate(self, library, phase, num_nodes, num_arcs):
+        """Estimate the peak memory in bytes of running a phase"""
+        per_node, per_arc, per_pair = self.coefficients[library][phase]
+        return per_node * num_nodes + per_arc * num_arcs + per_pair * num_nodes ** 2
+
+    def plan(
+        self,
+        library,
+        phase,
+        num_nodes,
+        num_arcs,
+        available=None,
+        chunkable=False,
+        max_nodes=None,
+    ):
+        """Decide how to run a benchmark phase
+
+        :param str library: The library name
+        :param str phase: The phase name, e.g. ``"All Pairs Shortest Path
+            Length"``
+        :param int num_nodes: The number of nodes in the graph
+        :param int num_arcs: The number of arcs in the graph
+        :param int available: The memory available in bytes, defaults to
+            :func:`available_memory`
+        :param bool chunkable: Whether the phase can be run over a subset of
+            source nodes at a time. The ``per_pair`` memory is then only
+            needed for the sources in the current chunk.
+        :param int max_nodes: Skip the phase regardless of memory for graphs
+            with this many nodes or more. This bounds the runtime of the
+            quadratic phases which would take days on the USA graphs,
+            defaults to the phase's entry in :data:`MAX_NODES`.
+
+        Phases without coefficients for ``library`` are always run unless
+        the graph has ``max_nodes`` or more nodes.
+
+        :returns: A :class:`Decision`
+        """
+        if available is None:
+            available = available_memory()
+        if phase not in self.coefficients.get(library, {}):
+            estimate = None
+        else:
+            estimate = self.estimate(library, phase, num_nodes, num_arcs)
+        if max_nodes is None:
+            max_nodes = MAX_NODES.get(phase)
+        if max_nodes is not None and num_nodes >= max_nodes:
+            return Decision(
+                "skip", estimate, available, None, "graph has >= %s nodes" % max_nodes
+            )
+        if estimate is None:
+            # A new backend which hasn't been fitted yet
+            return Decision("run", estimate, available, None, "no memory model")
+        budget = available * HEADROOM
+        if estimate <= budget:
+            return Decision("run", estimate, available, None, "fits in memory")
+        per_node, per_arc, per_pair = self.coefficients[library][phase]
+        fixed = per_node * num_nodes + per_arc * num_arcs
+        per_source = per_pair * num_nodes
+        if chunkable and per_source and fixed + per_source <= budget:
+            chunk_size = int((budget - fixed) // per_source)
+            return Decision(
+                "chunk", estimate, available, chunk_size, "chunked to fit in memory"
+            )
+        return Decision("skip", estimate, available, None, "doesn't fit in memory")
+
+
+def read_measurements(directory):
+    """Read the peak RSS samples recorded in a result directory
+
+    :param str directory: A directory of result files, see
+        :func:`bench_common.results.load_results`
+
+    :returns: A dict mapping ``(library, phase)`` to a list of
+        ``(num_nodes, num_arcs, peak_rss_bytes)`` tuples
+    """
+    from bench_common import results
+
+    frame = results.load_results(directory, legacy_csv=False)
+    # The resident set a call reached before the watchdog stopped it is only
+    # a lower bound of its peak
+    frame = frame[frame["status"].isin([results.STATUS_OK, results.STATUS_CHUNKED])]
+    # Where the peak couldn't be reset a phase that stayed below an earlier
+    # phase's peak records 0, that isn't a usable sample
+    frame = frame[frame["peak_rss"].fillna(0) > 0]
+    frame = frame.drop_duplicates(
+        ["library", "dataset", "algorithm", "host", "git_sha"]
+    )
+    samples = defaultdict(list)
+    for row in frame.itertuples():
+        samples[(row.library, row.algorithm)].append(
+            (int(row.num_nodes), int(row.num_edges), int(row.peak_rss))
+        )
+    return samples
+
+
+def fit(samples):
+    """Fit ``(per_node, per_arc, per_pair)`` coefficients to measurements
+
+    :param list samples: A list of ``(num_nodes, num_arcs, peak_bytes)``
+
+    :returns: A tuple of non-negative coefficients
+    """
+    import numpy as np
+
+    design = np.array([[n, m, float(n) ** 2] for n, m, _ in samples], dtype=float)
+    peaks = np.array([peak for _, _, peak in samples], dtype=float)
+    # Solve on normalized columns so the n**2 column doesn't dominate, then
+    # refit without any column that came out negative
+    active = [i for i in range(3) if design[:, i].any()]
+    while active:
+        columns = design[:, active]
+        scale = columns.max(axis=0)
+        solution = np.linalg.lstsq(columns / scale, peaks, rcond=None)[0] / scale
+        if (solution >= 0).all():
+            break
+        active = [i for i, value in zip(active, solution) if value >= 0]
+    coefficients = [0.0, 0.0, 0.0]
+    for i, value in zip(active, solution if active else []):
+        coefficients[i] = float(value)
+    return tuple(coefficients)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the benchmark memory model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    fit_parser = subparsers.add_parser(
+        "fit", help="Fit the model from the peak RSS recorded in results"
+    )
+    fit_parser.add_argument("result_dirs", nargs="+")
+    fit_parser.add_argument("--output", default=MODEL_PATH)
+    show_parser = subparsers.add_parser(
+        "plan", help="Show the plan for every phase of a graph"
+    )
+    show_parser.add_argument("gr_file")
+    args = parser.parse_args(argv)
+
+    if args.command == "fit":
+        samples = defaultdict(list)
+        for directory in args.result_dirs:
+            for key, dir_samples in read_measurements(directory).items():
+                samples[key].extend(dir_samples)
+        coefficients = defaultdict(dict)
+        for (library, phase), phase_samples in sorted(samples.items()):
+            coefficients[library][phase] = fit(phase_samples)
+            print("%s %s: %s" % (library, phase, coefficients[library][phase]))
+        MemoryModel(coefficients).save(args.output)
+    else:
+        from bench_common import dimacs
+
+        num_nodes, num_arcs = dimacs.read_gr_header(args.gr_file)
+        model = MemoryModel.load()
+        for library, phases in sorted(model.coefficients.items()):
+            for phase in phases:
+                decision = model.plan(library, phase, num_nodes, num_arcs)
+                print("%s %s: %s" % (library, phase, decision))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Parallel orchestrator for the benchmark suite
+
+This builds the (backend x dataset x algorithm) job matrix and runs the jobs
+concurrently. Every job is a separate invocation of the generic benchmark
+driver (:mod:`bench_common.driver`) with that library's venv interpreter so
+the libraries stay isolated from each other. Jobs are pinned to their own
+CPUs and only as many jobs are started as fit in the memory budget at once.
+
+Run it from the repository root with::
+
+    python -m bench_common.orchestrator --output-dir results
+"""
+
+import argparse
+from collections import namedtuple
+import glob
+import os
+import subprocess
+import sys
+import time
+
+from bench_common import dimacs
+from bench_common import graphsdb
+from bench_common import memory
+from bench_common import queries
+from bench_common import results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GR_FILES = [
+    "dimacs_9/USA-road-1.USA.gr.gz",
+    "dimacs_9/distance/USA-road-d.USA.gr.gz",
+    "dimacs_9/distance/USA-road-d.NY.gr.gz",
+    "dimacs_9/time/USA-road-t.USA.gr.gz",
+    "dimacs_9/time/USA-road-t.NY.gr.gz",
+    "dimacs_9/distance/rome99.gr",
+]
+GRAPHSDB_PATH = "arg_db/graphsdb"
+
+# The interpreter and benchmark package for each library, and the
+# algorithms it supports if not all of them. The venv interpreters are
+# relative to the repository root (see interpreter()). graph-tool isn't on
+# PyPI so it runs with the system python.
+BACKENDS = {
+    "retworkx": {
+        "python": "retworkx_venv/bin/python",
+        "package": "retworkx_bench",
+    },
+    "networkx": {
+        "python": "networkx_venv/bin/python",
+        "package": "networkx_bench",
+    },
+    "igraph": {
+        "python": "igraph_venv/bin/python",
+        "package": "igraph_bench",
+    },
+    "graph-tool": {
+        "python": "python",
+        "package": "graph_tool_bench",
+    },
+    "scipy": {
+        "python": "scipy_venv/bin/python",
+        "package": "scipy_bench",
+        "algorithms": ["shortest_path", "multi_source"],
+    },
+    # The preprocessing speedup engines only answer point to point queries
+    "alt": {
+        "python": "scipy_venv/bin/python",
+        "package": "speedup_bench",
+        "algorithms": ["shortest_path"],
+    },
+    "ch": {
+        "python": "scipy_venv/bin/python",
+        "package": "speedup_bench",
+        "algorithms": ["shortest_path"],
+    },
+}
+ALGORITHMS = ["shortest_path", "isomorphism", "multi_source", "thread_scaling"]
+# multi_source and thread_scaling measure scaling over the CPUs of the job,
+# they're only run on request with more than one CPU per job
+DEFAULT_ALGORITHMS = ["shortest_path", "isomorphism"]
+# The algorithms run on every DIMACS graph and their result file suffix
+GR_ALGORITHMS = {
+    "shortest_path": "",
+    "multi_source": "_multi_source",
+    "thread_scaling": "_thread_scaling",
+}
+
+ISOMORPHISM_MEMORY = 2 * 1024 ** 3
+
+Job = namedtuple(
+    "Job", ["name", "backend", "algorithm", "command", "output", "inputs", "memory"]
+)
+
+
+def dataset_name(path):
+    """Return the dataset name the benchmark scripts use for a gr file"""
+    return ".".join(os.path.basename(path).split(".")[0:2])
+
+
+def interpreter(python):
+    """Return the command of a backend's interpreter
+
+    The jobs run in the output directory, so a venv interpreter is resolved
+    against the repository root while a bare command like ``python`` is
+    looked up on the ``PATH``.
+    """
+    if os.path.dirname(python):
+        return os.path.join(REPO_ROOT, python)
+    return python
+
+
+def estimate_memory(backend, gr_path, model):
+    """Estimate the peak memory in bytes of a shortest path job
+
+    This is the graph's creation memory plus the largest of the phases the
+    job's script will decide to run on this machine.
+    """
+    num_nodes, num_arcs = dimacs.read_gr_header(gr_path)
+    phase_memory = [0]
+    coefficients = model.coefficients.get(backend, {})
+    for phase in coefficients:
+        if phase == "Creation":
+            continue
+        decision = model.plan(backend, phase, num_nodes, num_arcs)
+        if decision.action == "run":
+            phase_memory.append(decision.estimate)
+        elif decision.action == "chunk":
+            phase_memory.append(decision.available * memory.HEADROOM)
+    creation = 0
+    if "Creation" in coefficients:
+        creation = model.estimate(backend, "Creation", num_nodes, num_arcs)
+    return creation + max(phase_memory)
+
+
+def _sources(backend):
+    package = BACKENDS[backend]["package"]
+    return glob.glob(os.path.join(REPO_ROOT, package, "*.py")) + glob.glob(
+        os.path.join(REPO_ROOT, "bench_common", "*.py")
+    )
+
+
+def build_jobs(backends, algorithms, gr_files, graphsdb_path, output_dir, model=None):
+    """Build the job matrix
+
+    :param list backends: The backend names from :data:`BACKENDS` to run
+    :param list algorithms: The algorithm suites from :data:`ALGORITHMS`
+    :param list gr_files: The DIMACS graph files for the shortest path suite,
+        files which don't exist are skipped
+    :param str graphsdb_path: The root of the ARG database for the
+        isomorphism suite
+    :param str output_dir: The directory the result files are written to
+    :param MemoryModel model: The memory model used to estimate each job's
+        memory, defaults to :meth:`MemoryModel.load`
+
+    :returns: A list of :class:`Job` objects
+    """
+    if model is None:
+        model = memory.MemoryModel.load()
+    jobs = []
+    for backend in backends:
+        config = BACKENDS[backend]
+        backend_algorithms = config.get("algorithms", ALGORITHMS)
+        for algorithm, suffix in GR_ALGORITHMS.items():
+            if algorithm not in algorithms or algorithm not in backend_algorithms:
+                continue
+            for gr_file in gr_files:
+                if not os.path.isfile(gr_file):
+                    print("Skipping missing data file %s" % gr_file)
+                    continue
+                dataset = dataset_name(gr_file)
+                inputs = [gr_file] + _sources(backend)
+                co_file = dimacs.coordinates_path(gr_file)
+                if co_file is not None:
+                    inputs.append(co_file)
+                jobs.append(
+                    Job(
+                        "%s_%s_%s" % (backend, algorithm, dataset),
+                        backend,
+                        algorithm,
+                        [
+                            interpreter(config["python"]),
+                            "-m",
+                            "bench_common.driver",
+                            backend,
+                            algorithm,
+                            os.path.abspath(gr_file),
+                        ],
+                        results.result_path(backend, dataset + suffix, output_dir),
+                        inputs,
+                        estimate_memory(backend, gr_file, model),
+                    )
+                )
+        if (
+            "isomorphism" in algorithms
+            and "isomorphism" in backend_algorithms
+            and os.path.isdir(graphsdb_path)
+        ):
+            jobs.append(
+                Job(
+                    "%s_isomorphism" % backend,
+                    backend,
+                    "isomorphism",
+                    [
+                        interpreter(config["python"]),
+                        "-m",
+                        "bench_common.driver",
+                        backend,
+                        "isomorphism",
+                        os.path.abspath(graphsdb_path),
+                        # Shard the pairs over every CPU the job is pinned to
+                        "--workers",
+                        "0",
+                    ],
+                    results.result_path(backend, "subgraph_iso", output_dir),
+                    [graphsdb_path] + _sources(backend),
+                    ISOMORPHISM_MEMORY,
+                )
+            )
+    return jobs
+
+
+def is_up_to_date(job):
+    """Check whether a job's result file is newer than all of its inputs"""
+    try:
+        output_mtime = os.stat(job.output).st_mtime
+    except FileNotFoundError:
+        return False
+    return all(os.stat(path).st_mtime <= output_mtime for path in job.inputs)
+
+
+class Scheduler:
+    """Run jobs concurrently under a CPU and memory budget
+
+    :param int cpus_per_job: The number of CPUs each job is pinned to
+    :param float mem_size: The memory budget in bytes, defaults to the
+        memory currently available. A job is only started if its estimated
+        memory fits next to the already running jobs, a job larger than the
+        whole budget is run on its own.
+    :param int max_jobs: The maximum number of concurrent jobs, defaults to
+        as many as there are CPU slots
+    :param str log_dir: The directory each job's output is logged to
+    """
+
+    def __init__(self, cpus_per_job=1, mem_size=None, max_jobs=None, log_dir="."):
+        cpus = sorted(os.sched_getaffinity(0))
+        self.cpu_slots = [
+            set(cpus[i : i + cpus_per_job])
+            for i in range(0, len(cpus) - cpus_per_job + 1, cpus_per_job)
+        ] or [set(cpus)]
+        if max_jobs is not None:
+            self.cpu_slots = self.cpu_slots[:max_jobs]
+        if mem_size is None:
+            mem_size = memory.available_memory() * memory.HEADROOM
+        self.mem_size = mem_size
+        self.log_dir = log_dir
+        self.failed = []
+
+    def _launch(self, job, cpus):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [REPO_ROOT, env.get("PYTHONPATH")])
+        )
+        log = open(os.path.join(self.log_dir, job.name + ".log"), "w")
+        print("Starting %s on CPUs %s" % (job.name, sorted(cpus)))
+        process = subprocess.Popen(
+            job.command,
+            cwd=os.path.dirname(os.path.abspath(job.output)),
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            preexec_fn=lambda: os.sched_setaffinity(0, cpus),
+        )
+        return process, log
+
+    def run(self, jobs):
+        """Run all the jobs and block until they're finished
+
+        :returns: The list of jobs which exited with a non-zero status
+        """
+        pending = list(jobs)
+        free_slots = list(self.cpu_slots)
+        running = {}
+        while pending or running:
+            used_memory = sum(state[0].memory for state in running.values())
+            for job in list(pending):
+                if not free_slots:
+                    break
+                if running and used_memory + job.memory > self.mem_size:
+                    continue
+                pending.remove(job)
+                cpus = free_slots.pop(0)
+                process, log = self._launch(job, cpus)
+                running[process] = (job, cpus, log, time.time())
+                used_memory += job.memory
+            time.sleep(1)
+            for process in list(running):
+                if process.poll() is None:
+                    continue
+                job, cpus, log, start = running.pop(process)
+                log.close()
+                free_slots.append(cpus)
+                status = "finished" if process.returncode == 0 else "FAILED"
+                print("%s %s in %.1f sec." % (job.name, status, time.time() - start))
+                if process.returncode != 0:
+                    self.failed.append(job)
+        return self.failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=ALGORITHMS, default=DEFAULT_ALGORITHMS
+    )
+    parser.add_argument("--gr-files", nargs="+", default=GR_FILES)
+    parser.add_argument("--graphsdb", default=GRAPHSDB_PATH)
+    parser.add_argument("--output-dir", default="results")
+    parser.add_argument(
+        "--mem-size",
+        type=float,
+        help="Memory budget in bytes for all concurrently running jobs, "
+        "defaults to the memory currently available",
+    )
+    parser.add_argument("--cpus-per-job", type=int, default=1)
+    parser.add_argument("--jobs", type=int, help="Maximum concurrent jobs")
+    parser.add_argument(
+        "--force", action="store_true", help="Run jobs even if results are up to date"
+    )
+    parser.add_argument(
+        "--watchdog",
+        action="store_true",
+        help="Run the shortest path and isomorphism calls under the driver's "
+        "watchdog, see bench_common.watchdog",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only print the jobs that would run"
+    )
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    log_dir = os.path.join(args.output_dir, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    jobs = build_jobs(
+        args.backends, args.algorithms, args.gr_files, args.graphsdb, args.output_dir
+    )
+    if args.watchdog:
+        for job in jobs:
+            if job.algorithm in ("shortest_path", "isomorphism"):
+                job.command.append("--watchdog")
+    if not args.force:
+        for job in [job for job in jobs if is_up_to_date(job)]:
+            print("Skipping %s, %s is up to date" % (job.name, job.output))
+            jobs.remove(job)
+    # Start the largest jobs first so small ones fill in around them
+    jobs.sort(key=lambda job: job.memory, reverse=True)
+    if args.dry_run:
+        for job in jobs:
+            print(
+                "%s (%.1f GB): %s"
+                % (job.name, job.memory / 1024 ** 3, " ".join(job.command))
+            )
+        return 0
+    # Generate the query workloads once instead of in every backend's job,
+    # the settled node counts are left to the jobs (see bench_common.p2p)
+    for gr_file in sorted(
+        {job.inputs[0] for job in jobs if job.algorithm == "shortest_path"}
+    ):
+        print("Generating the query workload for %s" % gr_file)
+        queries.load_queries(gr_file)
+    if any(job.algorithm == "isomorphism" for job in jobs):
+        # Pack the ARG database once instead of in every job
+        print("Packing the isomorphism corpus for %s" % args.graphsdb)
+        graphsdb.load_corpus(args.graphsdb)
+    scheduler = Scheduler(
+        cpus_per_job=args.cpus_per_job,
+        mem_size=args.mem_size,
+        max_jobs=args.jobs,
+        log_dir=log_dir,
+    )
+    failed = scheduler.run(jobs)
+    if failed:
+        print("Failed jobs: %s" % ", ".join(job.name for job in failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Point to point query variants for the query workload
+
+Besides plain Dijkstra stopping at the target the query workload (see
+:mod:`bench_common.queries`) is run with each variant in :data:`VARIANTS`
+that a backend implements:
+
+* bidirectional Dijkstra, searching from both ends until they meet
+* A* with a great circle distance heuristic from the road graph's DIMACS
+  coordinate file (:class:`GreatCircle`)
+
+None of the libraries report how many nodes a search settled, so the counts
+come from the reference implementations in this module. They're a property
+of the variant rather than the library (up to tie breaking) and are saved
+next to the query workload like it by the first shortest path job which
+needs them. The reference searches are pure Python, so they're only run for
+graphs up to :data:`SETTLED_MAX_NODES` nodes. A plain Dijkstra query of rank
+``2 ** r`` settles ``2 ** r + 1`` nodes by construction.
+"""
+
+import heapq
+import json
+import math
+import os
+
+import numpy as np
+
+from bench_common import dimacs
+from bench_common import queries as query_workload
+
+# The label and backend method of every query variant
+VARIANTS = [
+    ("Bidirectional Dijkstra", "bidirectional_sssp"),
+    ("A*", "astar"),
+]
+
+EARTH_RADIUS = 6371000.0
+
+# The largest graph the settled nodes are counted for, the reference
+# searches of the larger graphs would take longer than the benchmarks
+SETTLED_MAX_NODES = int(os.getenv("BENCH_SETTLED_MAX_NODES", "1000000"))
+
+
+def _haversine(longitude1, latitude1, longitude2, latitude2):
+    """The great circle distance in meters between points in radians"""
+    a = (
+        np.sin((latitude2 - latitude1) / 2) ** 2
+        + np.cos(latitude1)
+        * np.cos(latitude2)
+        * np.sin((longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GreatCircle:
+    """A* heuristic from the great circle distance between nodes
+
+    The arc weights are distances or travel times in units which aren't
+    meters, so the great circle distance is scaled by the smallest ratio of
+    an arc's weight to its great circle length. Every path is at least that
+    ratio times the great circle distance between its ends which makes the
+    heuristic admissible and consistent for either kind of graph.
+
+    :param GrCoordinates coordinates: The node coordinates
+    :param GrEdges edges: The edge arrays of the graph
+    """
+
+    def __init__(self, coordinates, edges):
+        longitude = np.radians(coordinates.longitude)
+        latitude = np.radians(coordinates.latitude)
+        arc_lengths = _haversine(
+            longitude[edges.sources],
+            latitude[edges.sources],
+            longitude[edges.targets],
+            latitude[edges.targets],
+        )
+        positive = arc_lengths > 0
+        if positive.any():
+            # Shave off rounding error so the estimate never overshoots
+            self.scale = float(
+                np.min(edges.weights[positive] / arc_lengths[positive])
+            ) * (1 - 1e-9)
+        else:
+            self.scale = 0.0
+        self._longitude = longitude.tolist()
+        self._latitude = latitude.tolist()
+        self._cos_latitude = np.cos(latitude).tolist()
+
+    def heuristic(self, target):
+        """Return the estimate of the remaining cost to ``target``
+
+        :param int target: The target node
+
+        :returns: A function taking a node index and returning a lower
+            bound of the shortest path length from it to ``target``
+        """
+        longitude = self._longitude
+        latitude = self._latitude
+        cos_latitude = self._cos_latitude
+        target_longitude = longitude[target]
+        target_latitude = latitude[target]
+        target_cos = cos_latitude[target]
+        factor = 2 * EARTH_RADIUS * self.scale
+
+        def _estimate(node):
+            sin_latitude = math.sin((latitude[node] - target_latitude) / 2)
+            sin_longitude = math.sin((longitude[node] - target_longitude) / 2)
+            a = (
+                sin_latitude * sin_latitude
+                + cos_latitude[node] * target_cos * sin_longitude * sin_longitude
+            )
+            return factor * math.asin(math.sqrt(min(a, 1.0)))
+
+        return _estimate
+
+
+def load_great_circle(path, edges=None):
+    """Build the :class:`GreatCircle` heuristic for a graph file
+
+    :param str path: The path to the ``.gr`` file
+    :param GrEdges edges: The graph's edge arrays, loaded with
+        :func:`bench_common.dimacs.load_gr_arrays` if not set
+
+    :returns: A :class:`GreatCircle` or ``None`` if there's no coordinate
+        file with the graph's nodes (see
+        :func:`bench_common.dimacs.coordinates_path`)
+    """
+    co_path = dimacs.coordinates_path(path)
+    if co_path is None:
+        return None
+    if edges is None:
+        edges = dimacs.load_gr_arrays(path)
+    coordinates = dimacs.parse_co_arrays(co_path)
+    if len(coordinates.longitude) != edges.num_nodes:
+        return None
+    return GreatCircle(coordinates, edges)
+
+
+def _adjacency(edges):
+    # Memory views index like lists without a Python object per arc
+    return tuple(memoryview(array) for array in dimacs.csr_arrays(edges))
+
+
+def settled_astar(adjacency, source, target, estimate):
+    """Count the nodes A* settles before reaching the target
+
+    :param tuple adjacency: The CSR arrays of the graph
+    :param int source: The source node
+    :param int target: The target node
+    :param callable estimate: The heuristic, see :meth:`GreatCircle.heuristic`
+    """
+    indptr, targets, weights = adjacency
+    distances = {source: 0.0}
+    settled = set()
+    heap = [(estimate(source), source)]
+    while heap:
+        _, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == target:
+            break
+        distance = distances[node]
+        for i in range(indptr[node], indptr[node + 1]):
+            neighbor = targets[i]
+            new_distance = distance + weights[i]
+            if neighbor not in settled and new_distance < distances.get(
+                neighbor, math.inf
+            ):
+                distances[neighbor] = new_distance
+                heapq.heappush(heap, (new_distance + estimate(neighbor), neighbor))
+    return len(settled)
+
+
+def settled_bidirectional(forward, backward, source, target):
+    """Count the nodes bidirectional Dijkstra settles in both directions
+
+    Like ``networkx.bidirectional_dijkstra`` the directions alternate and
+    the search stops once a node is settled from both ends.
+
+    :param tuple forward: The CSR arrays of the graph
+    :param tuple backward: The CSR arrays of the reversed graph
+    :param int source: The source node
+    :param int target: The target node
+    """
+    adjacency = [forward, backward]
+    distances = [{source: 0.0}, {target: 0.0}]
+    settled = [set(), set()]
+    heaps = [[(0.0, source)], [(0.0, target)]]
+    direction = 1
+    while heaps[0] and heaps[1]:
+        direction = 1 - direction
+        distance, node = heapq.heappop(heaps[direction])
+        if node in settled[direction]:
+            continue
+        settled[direction].add(node)
+        if node in settled[1 - direction]:
+            break
+        indptr, targets, weights = adjacency[direction]
+        for i in range(indptr[node], indptr[node + 1]):
+            neighbor = targets[i]
+            new_distance = distance + weights[i]
+            if neighbor not in settled[direction] and new_distance < distances[
+                direction
+            ].get(neighbor, math.inf):
+                distances[direction][neighbor] = new_distance
+                heapq.heappush(heaps[direction], (new_distance, neighbor))
+    return len(settled[0]) + len(settled[1])
+
+
+def count_settled(path, workload):
+    """Count the settled nodes of every variant for a query workload
+
+    :param str path: The path to the ``.gr`` file
+    :param list workload: The :class:`~bench_common.queries.Query` tuples
+
+    :returns: A dict mapping each variant label in :data:`VARIANTS` to a
+        list of counts in the order of ``workload``. A* is left out if the
+        graph has no coordinate file.
+    """
+    edges = dimacs.load_gr_arrays(path)
+    forward = _adjacency(edges)
+    backward = _adjacency(
+        dimacs.GrEdges(edges.num_nodes, edges.targets, edges.sources, edges.weights)
+    )
+    counts = {
+        "Bidirectional Dijkstra": [
+            settled_bidirectional(forward, backward, query.source, query.target)
+            for query in workload
+        ]
+    }
+    great_circle = load_great_circle(path, edges)
+    if great_circle is not None:
+        counts["A*"] = [
+            settled_astar(
+                forward,
+                query.source,
+                query.target,
+                great_circle.heuristic(query.target),
+            )
+            for query in workload
+        ]
+    return counts
+
+
+def settled_path(
+    path, num_sources=query_workload.NUM_SOURCES, seed=query_workload.SEED
+):
+    """Return the path the settled node counts of a workload are saved to"""
+    return "%s.q%s-s%s.settled.json" % (path, num_sources, seed)
+
+
+def load_settled(
+    path, num_sources=query_workload.NUM_SOURCES, seed=query_workload.SEED
+):
+    """Load the settled node counts for a workload, counting them if needed
+
+    :param str path: The path to the ``.gr`` file
+    :param int num_sources: The number of random sources of the workload
+    :param int seed: The random generator seed of the workload
+
+    :returns: The dict returned by :func:`count_settled`
+    """
+    saved_path = settled_path(path, num_sources, seed)
+    stat = os.stat(path)
+    co_path = dimacs.coordinates_path(path)
+    try:
+        with open(saved_path) as fd:
+            saved = json.load(fd)
+        if (
+            saved["size"] == stat.st_size
+            and saved["mtime_ns"] == stat.st_mtime_ns
+            and saved["coordinates"] == co_path
+        ):
+            return saved["settled"]
+    except (OSError, ValueError, KeyError):
+        pass
+    workload = query_workload.load_queries(path, num_sources, seed)
+    settled = count_settled(path, workload)
+    tmp_path = "%s.%s.tmp" % (saved_path, os.getpid())
+    with open(tmp_path, "w") as fd:
+        json.dump(
+            {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "coordinates": co_path,
+                "settled": settled,
+            },
+            fd,
+        )
+    os.replace(tmp_path, saved_path)
+    return settled
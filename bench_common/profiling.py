@@ -0,0 +1,166 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Profile the phases of a benchmark run
+
+In the driver's ``--profile`` mode every measured phase is run once more
+after all the timings are done, so the profilers don't change the recorded
+times, with :mod:`cProfile` and optionally a native sampling profiler which
+also sees the frames of a library's C/C++/Rust extension. The native
+profiler records a separate run of the phase with :mod:`cProfile` off, whose
+per call hooks would otherwise show up in its samples:
+
+* ``perf``: ``perf record -g`` attached to the driver, written as
+  ``perf.data`` plus its ``perf script`` output, which FlameGraph's
+  ``stackcollapse-perf.pl`` or speedscope turn into a flame graph. On
+  Python 3.12+ the perf trampoline is activated so the Python frames show
+  up too.
+* ``py-spy``: ``py-spy record --native`` attached to the driver, written
+  as a flame graph SVG
+
+Every artifact is named ``<library>_<dataset>_<phase>`` in the profile
+directory, e.g. ``igraph_rome99.gr_creation.pstats``. A phase is called
+until it ran for :data:`MIN_TIME` for each profiler so the sampling
+profilers get enough samples of the shorter phases.
+
+The settings can be set from the environment:
+
+* ``BENCH_PROFILE_DIR``: the directory of the artifacts (default
+  ``profiles``)
+* ``BENCH_PROFILE_NATIVE``: ``perf`` or ``py-spy`` for a native profile
+* ``BENCH_PROFILE_RATE``: the native profilers' samples per second
+  (default 999)
+* ``BENCH_PROFILE_MIN_TIME``: the seconds a phase is called for (default 1)
+"""
+
+import cProfile
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+PROFILE_DIR = os.getenv("BENCH_PROFILE_DIR", "profiles")
+NATIVE = os.getenv("BENCH_PROFILE_NATIVE") or None
+RATE = int(os.getenv("BENCH_PROFILE_RATE", "999"))
+MIN_TIME = float(os.getenv("BENCH_PROFILE_MIN_TIME", "1"))
+
+# The native profilers and the extension of their artifact
+NATIVE_PROFILERS = {"perf": "perf.data", "py-spy": "svg"}
+
+# Seconds to wait for a native profiler to attach before the phase starts
+ATTACH_DELAY = 0.5
+
+
+def artifact_name(library, dataset, phase):
+    """Return the file name of a phase's artifacts without an extension"""
+    phase = re.sub(r"[^0-9a-z]+", "_", phase.lower()).strip("_")
+    return "%s_%s_%s" % (library, dataset, phase)
+
+
+def _native_command(native, pid, path):
+    if native == "perf":
+        return ["perf", "record", "-g", "-F", str(RATE), "-p", str(pid), "-o", path]
+    return [
+        "py-spy",
+        "record",
+        "--native",
+        "--rate",
+        str(RATE),
+        "--format",
+        "flamegraph",
+        "--pid",
+        str(pid),
+        "--output",
+        path,
+    ]
+
+
+class Profiler:
+    """Profile phases of a benchmark run and write their artifacts
+
+    :param str directory: The directory the artifacts are written to
+    :param str native: ``"perf"`` or ``"py-spy"`` to also record a native
+        profile, ``None`` for only :mod:`cProfile`
+    :param float min_time: The seconds a phase is called for by each
+        profiler
+    """
+
+    def __init__(self, directory=PROFILE_DIR, native=NATIVE, min_time=MIN_TIME):
+        if native is not None:
+            if native not in NATIVE_PROFILERS:
+                raise Exception(
+                    "Unknown native profiler %s, use one of %s"
+                    % (native, ", ".join(NATIVE_PROFILERS))
+                )
+            if shutil.which(native) is None:
+                raise Exception("%s isn't installed" % native)
+        self.directory = directory
+        self.native = native
+        self.min_time = min_time
+
+    def _run(self, func):
+        start = time.perf_counter()
+        func()
+        while time.perf_counter() - start < self.min_time:
+            func()
+
+    def _start_native(self, path):
+        if self.native == "perf" and hasattr(sys, "activate_stack_trampoline"):
+            sys.activate_stack_trampoline("perf")
+        recorder = subprocess.Popen(
+            _native_command(self.native, os.getpid(), path),
+            stdout=subprocess.DEVNULL,
+        )
+        time.sleep(ATTACH_DELAY)
+        return recorder
+
+    def _stop_native(self, recorder, path):
+        # Both profilers write their output when they're interrupted
+        recorder.send_signal(signal.SIGINT)
+        recorder.wait()
+        if self.native == "perf":
+            if hasattr(sys, "deactivate_stack_trampoline"):
+                sys.deactivate_stack_trampoline()
+            with open(path[: -len(".data")] + ".txt", "w") as fd:
+                subprocess.run(["perf", "script", "-i", path], stdout=fd, check=True)
+
+    def profile(self, library, dataset, phase, func):
+        """Profile a phase
+
+        :param str library: The name of the benchmarked library
+        :param str dataset: The dataset of the phase
+        :param str phase: The phase, the algorithm of its results
+        :param callable func: Runs the phase, without any arguments
+
+        :returns: The paths of the written artifacts
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, artifact_name(library, dataset, phase))
+        paths = [base + ".pstats"]
+        print("profiling %s" % phase)
+        native_path = None
+        if self.native is not None:
+            native_path = "%s.%s" % (base, NATIVE_PROFILERS[self.native])
+            paths.append(native_path)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            self._run(func)
+        finally:
+            profile.disable()
+        profile.dump_stats(paths[0])
+        if native_path is not None:
+            recorder = self._start_native(native_path)
+            try:
+                self._run(func)
+            finally:
+                self._stop_native(recorder, native_path)
+        return paths
@@ -0,0 +1,178 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Reproducible point to point query workloads stratified by Dijkstra rank
+
+Like the ``.p2p`` query sets of the 9th DIMACS challenge the queries are
+bucketed by Dijkstra rank: the target of a query with rank ``2 ** i`` is the
+``2 ** i``-th node a Dijkstra search from its source settles. Low rank
+queries are local, high rank queries cross the whole graph, so the latency
+per bucket shows how each library's early exit scales with the distance.
+
+``num_sources`` sources are drawn with a seeded random generator and every
+source gets one target per rank bucket. Computing the ranks takes a full
+Dijkstra search per source so a workload is saved next to the ``.gr`` file
+(``<path>.q<num_sources>-s<seed>.json``) and reused while the ``.gr`` file
+is unchanged. It's generated before the jobs start by the orchestrator or
+with::
+
+    python -m bench_common.queries dimacs_9/distance/USA-road-d.NY.gr.gz
+"""
+
+import argparse
+from collections import namedtuple
+import heapq
+import json
+import os
+
+import numpy as np
+
+from bench_common import dimacs
+
+NUM_SOURCES = int(os.getenv("BENCH_QUERY_SOURCES", "8"))
+SEED = int(os.getenv("BENCH_QUERY_SEED", "2021"))
+# The smallest rank bucket is 2 ** MIN_RANK_EXPONENT
+MIN_RANK_EXPONENT = 1
+
+Query = namedtuple("Query", ["source", "target", "rank"])
+
+
+def _settle_order_heapq(indptr, targets, weights, source):
+    indptr = indptr.tolist()
+    targets = targets.tolist()
+    weights = weights.tolist()
+    distances = {source: 0.0}
+    settled = set()
+    order = []
+    heap = [(0.0, source)]
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        order.append(node)
+        for i in range(indptr[node], indptr[node + 1]):
+            target = targets[i]
+            new_distance = distance + weights[i]
+            if target not in settled and new_distance < distances.get(
+                target, float("inf")
+            ):
+                distances[target] = new_distance
+                heapq.heappush(heap, (new_distance, target))
+    return np.array(order)
+
+
+def settle_order(edges, source):
+    """Return the nodes reachable from source in Dijkstra settle order
+
+    :param GrEdges edges: The parsed edge arrays
+    :param int source: The source node
+
+    :returns: An array where entry ``r`` is the node with Dijkstra rank
+        ``r`` (the source itself has rank 0)
+    """
+    indptr, targets, weights = dimacs.csr_arrays(edges)
+    try:
+        import scipy.sparse
+        from scipy.sparse import csgraph
+    except ImportError:
+        return _settle_order_heapq(indptr, targets, weights, source)
+    matrix = scipy.sparse.csr_matrix(
+        (weights, targets, indptr), shape=(edges.num_nodes, edges.num_nodes)
+    )
+    distances = csgraph.dijkstra(matrix, indices=source)
+    reachable = np.flatnonzero(np.isfinite(distances))
+    return reachable[np.argsort(distances[reachable], kind="stable")]
+
+
+def random_sources(num_nodes, num_sources=NUM_SOURCES, seed=SEED):
+    """Draw distinct random source nodes
+
+    :param int num_nodes: The number of nodes in the graph
+    :param int num_sources: The number of sources to draw
+    :param int seed: The random generator seed
+
+    :returns: A list of node indices
+    """
+    rng = np.random.default_rng(seed)
+    return rng.choice(num_nodes, size=num_sources, replace=False).tolist()
+
+
+def generate_queries(edges, num_sources=NUM_SOURCES, seed=SEED):
+    """Draw a rank stratified query workload
+
+    :param GrEdges edges: The parsed edge arrays
+    :param int num_sources: The number of random sources
+    :param int seed: The random generator seed
+
+    :returns: A list of :class:`Query` tuples, ``rank`` is the exponent of
+        the query's rank bucket
+    """
+    queries = []
+    for source in random_sources(edges.num_nodes, num_sources, seed):
+        order = settle_order(edges, source)
+        exponent = MIN_RANK_EXPONENT
+        while 2 ** exponent < len(order):
+            queries.append(Query(source, int(order[2 ** exponent]), exponent))
+            exponent += 1
+    return queries
+
+
+def queries_path(path, num_sources=NUM_SOURCES, seed=SEED):
+    """Return the path a workload for a ``.gr`` file is saved to"""
+    return "%s.q%s-s%s.json" % (path, num_sources, seed)
+
+
+def load_queries(path, num_sources=NUM_SOURCES, seed=SEED):
+    """Load the workload for a ``.gr`` file, generating it if needed
+
+    :param str path: The path to the ``.gr`` file
+    :param int num_sources: The number of random sources
+    :param int seed: The random generator seed
+
+    :returns: A list of :class:`Query` tuples
+    """
+    saved_path = queries_path(path, num_sources, seed)
+    stat = os.stat(path)
+    try:
+        with open(saved_path) as fd:
+            saved = json.load(fd)
+        if saved["size"] == stat.st_size and saved["mtime_ns"] == stat.st_mtime_ns:
+            return [Query(*query) for query in saved["queries"]]
+    except (OSError, ValueError, KeyError):
+        pass
+    queries = generate_queries(dimacs.load_gr_arrays(path), num_sources, seed)
+    tmp_path = "%s.%s.tmp" % (saved_path, os.getpid())
+    with open(tmp_path, "w") as fd:
+        json.dump(
+            {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "num_sources": num_sources,
+                "seed": seed,
+                "queries": queries,
+            },
+            fd,
+        )
+    os.replace(tmp_path, saved_path)
+    return queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate query workloads")
+    parser.add_argument("gr_files", nargs="+")
+    parser.add_argument("--num-sources", type=int, default=NUM_SOURCES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args(argv)
+    for path in args.gr_files:
+        queries = load_queries(path, args.num_sources, args.seed)
+        print("%s: %s queries" % (path, len(queries)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Structured result store shared by all the benchmark scripts
+
+Every benchmark run writes one JSON lines file with a record per timing
+sample, all with the same columns (:data:`COLUMNS`). Writing a file per run
+means concurrently running orchestrator jobs never write to the same file.
+:func:`load_results` reads a whole directory of them back into a single
+pandas DataFrame which the plotting code queries.
+
+The CSV files written by earlier versions of the scripts (like the ones in
+``results/``) are converted to the same columns when loaded so old and new
+results can be plotted together. ``python -m bench_common.results export``
+writes the combined store to a single Parquet (if pyarrow is installed) or
+CSV file.
+"""
+
+import argparse
+import csv
+import functools
+import glob
+import json
+import os
+import platform
+import socket
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLUMNS = [
+    "library",
+    "library_version",
+    "dataset",
+    "algorithm",
+    "repeat",
+    "ns",
+    # The growth of the peak resident set during the phase in bytes, see
+    # bench_common.memory.PhaseMemory. For a call the watchdog stopped it's
+    # the growth of the worker's resident set over the one it was forked
+    # with, so it never includes the driver's pages either
+    "peak_rss",
+    # The peak of the Python heap allocations of a call in bytes, only
+    # traced with BENCH_TRACEMALLOC=1
+    "py_heap_peak",
+    # The resident memory of the built graph in bytes
+    "graph_bytes",
+    "num_nodes",
+    "num_edges",
+    # The Dijkstra rank exponent of a query, see bench_common.queries
+    "rank",
+    # The number of queries timed together in a sample
+    "batch_size",
+    # The number of nodes a query settled, see bench_common.p2p
+    "settled",
+    # The number of threads or processes a sample ran on
+    "workers",
+    # The speedup and parallel efficiency over the fewest workers, see
+    # bench_common.scaling
+    "speedup",
+    "efficiency",
+    # The memory of a speedup technique's preprocessed index in bytes
+    "index_bytes",
+    # The number of subgraph isomorphism embeddings a sample found
+    "embeddings",
+    # The wall clock time a measurement ran for before the watchdog stopped
+    # it, see bench_common.watchdog
+    "elapsed_ns",
+    "status",
+    "note",
+    "host",
+    "cpu_model",
+    "python_version",
+    "git_sha",
+]
+
+NUMERIC_COLUMNS = [
+    "repeat",
+    "ns",
+    "peak_rss",
+    "py_heap_peak",
+    "graph_bytes",
+    "num_nodes",
+    "num_edges",
+    "rank",
+    "batch_size",
+    "settled",
+    "workers",
+    "speedup",
+    "efficiency",
+    "index_bytes",
+    "embeddings",
+    "elapsed_ns",
+]
+
+# Status of a record, only "ok" and "chunked" records have a time. The
+# watchdog records a call it stopped as "timeout" or "oom"
+STATUS_OK = "ok"
+STATUS_CHUNKED = "chunked"
+STATUS_SKIPPED = "skipped"
+STATUS_TIMEOUT = "timeout"
+STATUS_OOM = "oom"
+
+ISOMORPHISM = "Subgraph Isomorphism"
+# The throughput of the whole isomorphism sweep
+ISOMORPHISM_SWEEP = "Subgraph Isomorphism Sweep"
+
+
+def isomorphism_algorithm(mode, induced):
+    """Return the algorithm name of a subgraph isomorphism mode
+
+    :param str mode: ``"first"`` match, enumerate ``"all"`` embeddings or
+        ``"count"`` them
+    :param bool induced: Whether induced subgraphs or monomorphisms are
+        matched
+
+    The first induced match keeps the :data:`ISOMORPHISM` name of the
+    earlier results which only ran that.
+    """
+    if mode == "first" and induced:
+        return ISOMORPHISM
+    return "%s (%s, %s)" % (ISOMORPHISM, mode, "induced" if induced else "non-induced")
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as fd:
+            for line in fd:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def _git_sha():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"],
+                cwd=REPO_ROOT,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@functools.lru_cache()
+def environment():
+    """Return the environment metadata columns for this process"""
+    return {
+        "host": socket.gethostname(),
+        "cpu_model": _cpu_model(),
+        "python_version": platform.python_version(),
+        "git_sha": _git_sha(),
+    }
+
+
+def result_path(library, name, directory="."):
+    """Return the path of the result file for a benchmark run"""
+    return os.path.join(directory, "%s_%s.jsonl" % (library, name))
+
+
+class ResultWriter:
+    """Collect the records of a benchmark run and write them to the store
+
+    :param str library: The name of the benchmarked library, e.g.
+        ``"graph-tool"``
+    :param str library_version: The version of the benchmarked library
+    """
+
+    def __init__(self, library, library_version):
+        self.library = library
+        self.library_version = str(library_version)
+        self.records = []
+
+    def add_record(self, dataset, algorithm, repeat, ns, **kwargs):
+        """Add a single record
+
+        :param int repeat: The index of the sample
+        :param int ns: The time of the sample in nanoseconds
+
+        Any keyword arguments are set as columns of the record.
+        """
+        record = dict.fromkeys(COLUMNS)
+        record.update(environment())
+        record.update(
+            library=self.library,
+            library_version=self.library_version,
+            dataset=dataset,
+            algorithm=algorithm,
+            repeat=repeat,
+            ns=ns,
+            status=STATUS_OK,
+        )
+        record.update(kwargs)
+        self.records.append(record)
+
+    def add_timing(self, dataset, algorithm, timing, **kwargs):
+        """Add a record for every sample of a :class:`~bench_common.timing.Timing`
+
+        Any keyword arguments (``peak_rss``, ``num_nodes``, ``num_edges``,
+        ``status``, ``note``) are set on every record.
+        """
+        for repeat, sample in enumerate(timing.samples_ns):
+            self.add_record(dataset, algorithm, repeat, int(sample), **kwargs)
+
+    def add_skipped(self, dataset, algorithm, note=None, **kwargs):
+        """Add a record for a benchmark that wasn't run"""
+        self.add_record(
+            dataset, algorithm, None, None, status=STATUS_SKIPPED, note=note, **kwargs
+        )
+
+    def add_outcome(self, dataset, algorithm, outcome, **kwargs):
+        """Add the records of a :class:`~bench_common.watchdog.Outcome`
+
+        The records of a finished call get its ``peak_rss`` and
+        ``py_heap_peak`` unless they're passed. A call the watchdog stopped
+        gets a single record with its status, the growth of the resident
+        set it reached as ``peak_rss`` and the time it ran for as ``elapsed_ns`` instead of a
+        time.
+        """
+        if outcome.status == STATUS_OK:
+            kwargs.setdefault("peak_rss", outcome.peak_rss)
+            kwargs.setdefault("py_heap_peak", outcome.py_heap_peak)
+            self.add_timing(dataset, algorithm, outcome.timing, **kwargs)
+            return
+        kwargs.update(
+            status=outcome.status,
+            peak_rss=outcome.peak_rss,
+            elapsed_ns=outcome.elapsed_ns,
+        )
+        self.add_record(dataset, algorithm, None, None, **kwargs)
+
+    def add_decision(self, dataset, algorithm, decision, timing=None, **kwargs):
+        """Add the records for a phase planned by the memory model
+
+        :param decision: The :class:`~bench_common.memory.Decision` for the
+            phase
+        :param timing: The :class:`~bench_common.timing.Timing` if the phase
+            was run
+        """
+        if decision.action == "skip" or timing is None:
+            self.add_skipped(dataset, algorithm, note=decision.reason, **kwargs)
+            return
+        if decision.action == "chunk":
+            kwargs["status"] = STATUS_CHUNKED
+            kwargs["note"] = "%s sources per chunk" % decision.chunk_size
+        self.add_timing(dataset, algorithm, timing, **kwargs)
+
+    def write(self, name, directory="."):
+        """Write the records to ``<library>_<name>.jsonl`` in ``directory``
+
+        :returns: The path of the written file
+        """
+        path = result_path(self.library, name, directory)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as fd:
+            for record in self.records:
+                fd.write(json.dumps(record))
+                fd.write("\n")
+        os.replace(tmp_path, path)
+        return path
+
+
+def _legacy_csv_records(path):
+    """Convert a CSV written by an older version of the scripts to records"""
+    basename = os.path.basename(path)[: -len(".csv")]
+    library, _, dataset = basename.partition("_")
+    if library == "graph" and dataset.startswith("tool_"):
+        library, dataset = "graph-tool", dataset[len("tool_") :]
+    legacy = {
+        "library": library,
+        "status": STATUS_OK,
+        "note": "converted from %s" % os.path.basename(path),
+    }
+    records = []
+    with open(path) as csvfile:
+        rows = list(csv.reader(csvfile))
+    if not rows or rows[0] == COLUMNS:
+        # An empty file or a store exported with ``export``
+        return records
+    if dataset == "subgraph_iso":
+        for row in rows[1:]:
+            # Only the mean was stored
+            seconds = float(row[3]) if len(row) > 3 else float(row[1])
+            records.append(
+                dict(
+                    legacy,
+                    dataset=row[0],
+                    algorithm=ISOMORPHISM,
+                    repeat=0,
+                    ns=int(seconds * 10 ** 9),
+                )
+            )
+        return records
+    num_nodes = num_edges = None
+    for row in rows:
+        if row[0] == "Graph Size":
+            num_nodes, num_edges = int(row[1]), int(row[2])
+    for row in rows:
+        if row[0] in ("Stats", "Peak RSS", "Decision", "Graph Size"):
+            continue
+        for repeat, seconds in enumerate(row[1:]):
+            records.append(
+                dict(
+                    legacy,
+                    dataset=dataset,
+                    algorithm=row[0],
+                    repeat=repeat,
+                    ns=int(float(seconds) * 10 ** 9),
+                    num_nodes=num_nodes,
+                    num_edges=num_edges,
+                )
+            )
+    return records
+
+
+def load_results(directory=".", legacy_csv=True):
+    """Load every result in a directory into a pandas DataFrame
+
+    :param str directory: The directory with the result files
+    :param bool legacy_csv: Also load CSV files written by older versions of
+        the scripts. Results for a library and dataset in the new format
+        take precedence over a CSV for the same pair.
+
+    :returns: A DataFrame with the :data:`COLUMNS` columns
+    """
+    import pandas as pd
+
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+        frames.append(pd.read_json(path, lines=True, dtype=False))
+    for path in sorted(glob.glob(os.path.join(directory, "*.parquet"))):
+        frames.append(pd.read_parquet(path))
+    frame = pd.concat(frames, ignore_index=True) if frames else None
+    if legacy_csv:
+        records = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+            records.extend(_legacy_csv_records(path))
+        if records:
+            legacy = pd.DataFrame.from_records(records)
+            if frame is not None:
+                covered = set(zip(frame["library"], frame["dataset"]))
+                keep = [
+                    pair not in covered
+                    for pair in zip(legacy["library"], legacy["dataset"])
+                ]
+                legacy = legacy[keep]
+            frames = [frame, legacy] if frame is not None else [legacy]
+            frame = pd.concat(frames, ignore_index=True)
+    if frame is None:
+        frame = pd.DataFrame(columns=COLUMNS)
+    frame = frame.reindex(columns=COLUMNS)
+    for column in NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column])
+    return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark result store tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser(
+        "export", help="Write every result in a directory to a single file"
+    )
+    export_parser.add_argument("directory")
+    export_parser.add_argument(
+        "output", help="The output path, ending in .parquet or .csv"
+    )
+    args = parser.parse_args(argv)
+
+    frame = load_results(args.directory)
+    if args.output.endswith(".parquet"):
+        frame.to_parquet(args.output, index=False)
+    else:
+        frame.to_csv(args.output, index=False)
+    print("Wrote %s results to %s" % (len(frame), args.output))
+
+
+if __name__ == "__main__":
+    main()
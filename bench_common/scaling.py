@@ -0,0 +1,220 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Thread count scaling sweep for the parallel all pairs phases
+
+retworkx runs its all pairs Dijkstra and distance matrix on a rayon thread
+pool (``RAYON_NUM_THREADS``) and graph-tool runs ``shortest_distance`` with
+OpenMP (``OMP_NUM_THREADS``). Both read the thread count once when the pool
+is created, so every thread count is run in a new process with the
+backend's :attr:`~bench_common.backend.Backend.thread_env` set.
+
+Two sweeps are run for 1, 2, 4, ... up to the number of CPUs the job may
+use:
+
+* strong scaling: the whole graph at every thread count
+* weak scaling: the subgraph induced by a prefix of the nodes, sized so the
+  work per thread stays the same. The all pairs phases take ~n ** 2 time so
+  ``t`` threads get ``n * sqrt(t / max_threads)`` nodes and the most
+  threads get the whole graph.
+
+The speedup and parallel efficiency over one thread are recorded with every
+sample. For the weak sweep the efficiency is the one thread time over the
+time and the speedup is the scaled speedup, the efficiency times the
+threads.
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from bench_common import backend as backend_registry
+from bench_common import dimacs
+from bench_common import memory
+from bench_common import results
+from bench_common import timing
+
+PHASES = ["All Pairs Shortest Path Length", "Distance Matrix"]
+MODES = ["strong", "weak"]
+
+
+def worker_counts(max_workers=None):
+    """Return the pool sizes of a scaling curve, 1, 2, 4, ... and the max
+
+    :param int max_workers: The largest pool size, defaults to the number
+        of CPUs this process may run on
+    """
+    if max_workers is None:
+        max_workers = len(os.sched_getaffinity(0))
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    return counts + [max_workers]
+
+
+def add_scaling_columns(records, weak=False):
+    """Set the speedup and efficiency of timed records in place
+
+    Every algorithm's records are compared to the median time of its
+    records with the fewest workers.
+
+    :param list records: The records of a sweep, see
+        :class:`~bench_common.results.ResultWriter`
+    :param bool weak: Whether the records are from a weak scaling sweep
+    """
+    timed = [record for record in records if record["ns"] is not None]
+    for algorithm in {record["algorithm"] for record in timed}:
+        algorithm_records = [
+            record for record in timed if record["algorithm"] == algorithm
+        ]
+        base_workers = min(record["workers"] for record in algorithm_records)
+        base = statistics.median(
+            record["ns"]
+            for record in algorithm_records
+            if record["workers"] == base_workers
+        )
+        for record in algorithm_records:
+            ratio = base / record["ns"]
+            workers = record["workers"] / base_workers
+            if weak:
+                record.update(speedup=ratio * workers, efficiency=ratio)
+            else:
+                record.update(speedup=ratio, efficiency=ratio / workers)
+
+
+def measure_threads(bench, path, threads, mode, num_nodes=None):
+    """Time the parallel phases in this process
+
+    This is run in a child process per thread count by
+    :func:`run_thread_scaling`, the thread count has to be set in the
+    environment already.
+
+    :param Backend bench: The backend to benchmark
+    :param str path: The path to the ``.gr`` file
+    :param int threads: The thread count set in the environment
+    :param str mode: ``"strong"`` or ``"weak"``
+    :param int num_nodes: Only use the subgraph induced by the first
+        ``num_nodes`` nodes
+
+    :returns: The :class:`~bench_common.results.ResultWriter` with the
+        records
+    """
+    model = memory.MemoryModel.load()
+    edges = dimacs.load_gr_arrays(path)
+    if num_nodes is not None:
+        edges = dimacs.induced_prefix(edges, num_nodes)
+    graph = bench.build_graph(edges)
+    graph_nodes = bench.num_nodes(graph)
+    graph_arcs = bench.num_edges(graph)
+    dataset = ".".join(path.split("/")[-1].split(".")[0:2])
+    writer = results.ResultWriter(bench.name, bench.version())
+    for phase, operation in zip(PHASES, ["apsp", "distance_matrix"]):
+        algorithm = "%s (%s scaling)" % (phase, mode)
+        columns = {
+            "num_nodes": graph_nodes,
+            "num_edges": graph_arcs,
+            "workers": threads,
+        }
+        if not bench.supports(operation):
+            writer.add_skipped(
+                dataset, algorithm, "not supported by backend", **columns
+            )
+            continue
+        decision = model.plan(bench.name, phase, graph_nodes, graph_arcs)
+        phase_timing = None
+        if decision.action == "run":
+            print("running %s with %s threads" % (algorithm, threads))
+            func = getattr(bench, operation)
+            phase_timing = timing.measure(lambda: func(graph))
+        writer.add_decision(dataset, algorithm, decision, phase_timing, **columns)
+    return writer
+
+
+def run_thread_scaling(bench, path):
+    """Run the strong and weak thread scaling sweeps on a DIMACS graph
+
+    :param Backend bench: The backend to benchmark
+    :param str path: The path to the ``.gr`` file
+
+    :returns: The path of the written result file
+    """
+    dataset = ".".join(path.split("/")[-1].split(".")[0:2])
+    writer = results.ResultWriter(bench.name, bench.version())
+    if bench.thread_env is None:
+        for phase in PHASES:
+            for mode in MODES:
+                writer.add_skipped(
+                    dataset,
+                    "%s (%s scaling)" % (phase, mode),
+                    "library has no thread count setting",
+                )
+        return writer.write(dataset + "_thread_scaling")
+    num_nodes, _ = dimacs.read_gr_header(path)
+    # Make sure the binary cache exists before the children race to write it
+    dimacs.load_gr_arrays(path)
+    counts = worker_counts()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in MODES:
+            mode_records = []
+            for threads in counts:
+                command = [
+                    sys.executable,
+                    "-m",
+                    "bench_common.scaling",
+                    bench.name,
+                    path,
+                    "--threads",
+                    str(threads),
+                    "--mode",
+                    mode,
+                    "--output-dir",
+                    tmp_dir,
+                ]
+                if mode == "weak":
+                    weak_nodes = math.ceil(num_nodes * math.sqrt(threads / counts[-1]))
+                    command += ["--num-nodes", str(weak_nodes)]
+                env = dict(os.environ)
+                env[bench.thread_env] = str(threads)
+                subprocess.run(command, env=env, check=True)
+                output = results.result_path(
+                    bench.name, "%s_%s" % (mode, threads), tmp_dir
+                )
+                with open(output) as fd:
+                    mode_records.extend(json.loads(line) for line in fd)
+            add_scaling_columns(mode_records, weak=mode == "weak")
+            writer.records.extend(mode_records)
+    return writer.write(dataset + "_thread_scaling")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the parallel phases at one thread count"
+    )
+    parser.add_argument("backend")
+    parser.add_argument("path")
+    parser.add_argument("--threads", type=int, required=True)
+    parser.add_argument("--mode", choices=MODES, default="strong")
+    parser.add_argument("--num-nodes", type=int)
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args(argv)
+    bench = backend_registry.get_backend(args.backend)
+    writer = measure_threads(
+        bench, args.path, args.threads, args.mode, num_nodes=args.num_nodes
+    )
+    writer.write("%s_%s" % (args.mode, args.threads), args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
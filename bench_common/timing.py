@@ -0,0 +1,208 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""High resolution timing harness shared by the benchmark scripts
+
+:func:`measure` times a callable with :func:`time.perf_counter_ns` after a
+number of warmup calls. Calls which are faster than :data:`MIN_SAMPLE_TIME`
+are looped (like :meth:`timeit.Timer.autorange`) so every sample is long
+enough to be measured accurately, and samples are collected until the
+relative standard error of their mean is below the target (or the time
+budget runs out).
+
+The defaults can be overridden from the environment so the orchestrator or
+a user can tune a whole sweep without editing the scripts:
+
+* ``BENCH_WARMUP``: number of warmup calls (default 1)
+* ``BENCH_MIN_REPEAT``: minimum number of samples (default 5)
+* ``BENCH_MAX_REPEAT``: maximum number of samples (default 100)
+* ``BENCH_TARGET_RSE``: target relative standard error (default 0.01)
+* ``BENCH_MAX_TIME``: seconds to keep sampling after ``BENCH_MIN_REPEAT``
+  samples trying to reach the target (default 60)
+* ``BENCH_DISABLE_GC``: set to 1 to disable the garbage collector during
+  the timed regions
+"""
+
+import gc
+import math
+import os
+import statistics
+import time
+
+WARMUP = int(os.getenv("BENCH_WARMUP", "1"))
+MIN_REPEAT = int(os.getenv("BENCH_MIN_REPEAT", "5"))
+MAX_REPEAT = int(os.getenv("BENCH_MAX_REPEAT", "100"))
+TARGET_RSE = float(os.getenv("BENCH_TARGET_RSE", "0.01"))
+MAX_TIME = float(os.getenv("BENCH_MAX_TIME", "60"))
+DISABLE_GC = os.getenv("BENCH_DISABLE_GC", "0") == "1"
+
+# Calls faster than this are repeated in a loop for each sample (in seconds)
+MIN_SAMPLE_TIME = 0.2
+# The resolution of time.perf_counter_ns in ns
+CLOCK_RESOLUTION_NS = time.get_clock_info("perf_counter").resolution * 10 ** 9
+
+
+class Timing:
+    """The samples collected by :func:`measure`
+
+    :param list samples_ns: The time per call of every sample in nanoseconds
+    :param int number: The number of calls looped in each sample
+    :param result: The return value of the last call
+    """
+
+    def __init__(self, samples_ns, number, result=None):
+        self.samples_ns = samples_ns
+        self.number = number
+        self.result = result
+
+    @property
+    def seconds(self):
+        """The time per call of every sample in seconds"""
+        return [sample / 10 ** 9 for sample in self.samples_ns]
+
+    @property
+    def mean(self):
+        return statistics.mean(self.samples_ns)
+
+    @property
+    def min(self):
+        return min(self.samples_ns)
+
+    @property
+    def median(self):
+        return statistics.median(self.samples_ns)
+
+    @property
+    def p95(self):
+        ordered = sorted(self.samples_ns)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    @property
+    def stddev(self):
+        if len(self.samples_ns) < 2:
+            return 0.0
+        return statistics.stdev(self.samples_ns)
+
+    @property
+    def rse(self):
+        """The relative standard error of the mean"""
+        if len(self.samples_ns) < 2 or not self.mean:
+            return math.inf
+        return self.stddev / math.sqrt(len(self.samples_ns)) / self.mean
+
+    def summary(self):
+        """Return the summary statistics of the samples
+
+        :returns: A list of the mean, min, median, p95 and stddev in seconds
+            followed by the number of samples and the calls per sample
+        """
+        return [
+            self.mean / 10 ** 9,
+            self.min / 10 ** 9,
+            self.median / 10 ** 9,
+            self.p95 / 10 ** 9,
+            self.stddev / 10 ** 9,
+            len(self.samples_ns),
+            self.number,
+        ]
+
+
+def _loops_per_sample(call_ns, min_sample_time):
+    """Pick the number of calls per sample from the 1, 2, 5, 10, ... series"""
+    target_ns = min_sample_time * 10 ** 9
+    # A call can take 0 ns on a coarse clock, which no number of loops makes
+    # up for, it took up to the clock's resolution
+    call_ns = max(call_ns, CLOCK_RESOLUTION_NS, 1)
+    number = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            loops = number * multiplier
+            if loops * call_ns >= target_ns:
+                return loops
+        number *= 10
+
+
+def _time_sample(func, number, disable_gc):
+    gc_enabled = gc.isenabled()
+    if disable_gc:
+        gc.collect()
+        gc.disable()
+    try:
+        if number == 1:
+            start = time.perf_counter_ns()
+            result = func()
+            stop = time.perf_counter_ns()
+        else:
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                result = func()
+            stop = time.perf_counter_ns()
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return stop - start, result
+
+
+def measure(
+    func,
+    warmup=None,
+    min_repeat=None,
+    max_repeat=None,
+    target_rse=None,
+    max_time=None,
+    disable_gc=None,
+    min_sample_time=MIN_SAMPLE_TIME,
+):
+    """Time a callable
+
+    :param callable func: The function to time, it is called without any
+        arguments
+    :param int warmup: The number of untimed calls before sampling. The
+        duration of the last warmup call is used to pick how many calls to
+        loop per sample.
+    :param int min_repeat: The minimum number of samples to take
+    :param int max_repeat: The maximum number of samples to take
+    :param float target_rse: Stop sampling once the relative standard error
+        of the mean is at most this
+    :param float max_time: Stop sampling after this many seconds once
+        ``min_repeat`` samples were taken even if ``target_rse`` wasn't
+        reached
+    :param bool disable_gc: Disable the garbage collector during the timed
+        region of every sample
+    :param float min_sample_time: Loop calls faster than this many seconds
+        so every sample takes at least this long
+
+    The other parameters default to the module level settings which can be
+    set from the environment.
+
+    :returns: A :class:`Timing` with the samples and the last return value
+    """
+    warmup = WARMUP if warmup is None else warmup
+    min_repeat = MIN_REPEAT if min_repeat is None else min_repeat
+    max_repeat = MAX_REPEAT if max_repeat is None else max_repeat
+    target_rse = TARGET_RSE if target_rse is None else target_rse
+    max_time = MAX_TIME if max_time is None else max_time
+    disable_gc = DISABLE_GC if disable_gc is None else disable_gc
+
+    number = 1
+    for _ in range(warmup):
+        elapsed, _ = _time_sample(func, 1, disable_gc)
+        number = _loops_per_sample(elapsed, min_sample_time)
+    timing = Timing([], number)
+    deadline = None
+    while len(timing.samples_ns) < max_repeat:
+        elapsed, timing.result = _time_sample(func, number, disable_gc)
+        timing.samples_ns.append(elapsed / number)
+        if len(timing.samples_ns) < min_repeat:
+            continue
+        if deadline is None:
+            # The time budget only starts once min_repeat samples were taken
+            deadline = time.perf_counter_ns() + max_time * 10 ** 9
+        if timing.rse <= target_rse or time.perf_counter_ns() >= deadline:
+            break
+    return timing
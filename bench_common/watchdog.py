@@ -0,0 +1,217 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Run measured calls in a supervised worker process
+
+A single pathological call (an isomorphism pair whose search doesn't prune,
+an all pairs run on a graph that's too large) can't be interrupted from
+Python once it's inside a library's extension. With a :class:`Watchdog` the
+driver forks a worker for every measured call, which runs
+:func:`bench_common.timing.measure` while the driver polls it. The worker is
+killed when it runs longer than the wall clock limit or its resident set
+grows over the memory limit, and the call is recorded with a ``"timeout"``
+or ``"oom"`` status instead of a time.
+
+The worker's resident set starts with the driver's pages it shares copy on
+write (the graph, the interpreter), so its growth is measured from the
+resident set right after the fork, like the growth
+:class:`bench_common.memory.PhaseMemory` records for a finished call.
+
+The worker is forked so it shares the graph with the driver copy on write.
+Libraries with a thread pool (retworkx's rayon pool, graph-tool's OpenMP
+threads) can't use it in a forked child once the parent started it, so in
+watchdog mode every call which may run threaded has to go through the
+watchdog.
+
+The limits can be set from the environment:
+
+* ``BENCH_WATCHDOG_TIMEOUT``: seconds a call may run for, including its
+  warmup and every sample (default 3600)
+* ``BENCH_WATCHDOG_MAX_RSS``: bytes the worker's resident set may grow by,
+  defaults to 90% of the memory available when the watchdog is created
+"""
+
+from collections import namedtuple
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+
+from bench_common import memory
+from bench_common import results
+from bench_common import timing
+
+TIMEOUT = float(os.getenv("BENCH_WATCHDOG_TIMEOUT", "3600"))
+MAX_RSS = float(os.getenv("BENCH_WATCHDOG_MAX_RSS", "0"))
+
+# How often the worker's run time and memory are checked in seconds
+POLL_INTERVAL = 0.05
+
+Outcome = namedtuple(
+    "Outcome", ["status", "timing", "peak_rss", "elapsed_ns", "py_heap_peak"]
+)
+Outcome.__doc__ = """The outcome of a measured call
+
+``status`` is :data:`bench_common.results.STATUS_OK` with the
+:class:`~bench_common.timing.Timing` of the call, or
+:data:`~bench_common.results.STATUS_TIMEOUT` or
+:data:`~bench_common.results.STATUS_OOM` if the watchdog stopped it and
+``timing`` is ``None``. ``peak_rss`` is the growth of the peak resident set
+during the call (of the worker's resident set over the one it was forked
+with when it was stopped), ``elapsed_ns`` the
+wall clock time of the whole measurement. ``py_heap_peak`` is the peak of the
+Python heap allocations of a single call if
+:data:`bench_common.memory.TRACE_ALLOCATIONS` is set, ``None`` otherwise.
+"""
+
+
+def _worker_rss(pid):
+    """Return the resident set size of a process in bytes"""
+    try:
+        with open("/proc/%s/status" % pid) as fd:
+            for line in fd:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _measure(func, result, kwargs):
+    with memory.PhaseMemory() as phase_memory:
+        call_timing = timing.measure(func, **kwargs)
+    if result is not None:
+        call_timing.result = result(call_timing.result)
+    py_heap_peak = None
+    if memory.TRACE_ALLOCATIONS:
+        py_heap_peak = memory.python_heap_peak(func)
+    return call_timing, phase_memory.peak_rss, py_heap_peak
+
+
+class Watchdog:
+    """Limits for the measured calls of a benchmark run
+
+    :param float timeout: The seconds a call may run for
+    :param float max_rss: The bytes the worker's resident set may grow by,
+        0 for 90% of the memory available now
+    """
+
+    def __init__(self, timeout=TIMEOUT, max_rss=MAX_RSS):
+        self.timeout = timeout
+        self.max_rss = max_rss or 0.9 * memory.available_memory()
+
+    def measure(self, func, result=None, **kwargs):
+        """Measure a call in a supervised worker process
+
+        :param callable func: The function to time, see
+            :func:`bench_common.timing.measure`
+        :param callable result: Reduce the return value of the call in the
+            worker, e.g. to its length, only the reduced value is sent back.
+            The return value is dropped if this isn't set.
+
+        Any keyword arguments are passed to
+        :func:`bench_common.timing.measure`.
+
+        :returns: An :class:`Outcome`
+        """
+        if result is None:
+            result = _drop_result
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        start = time.perf_counter_ns()
+        pid = os.fork()
+        if pid == 0:
+            receiver.close()
+            status = 0
+            try:
+                sender.send((results.STATUS_OK, _measure(func, result, kwargs)))
+            except BaseException:
+                sender.send(("error", traceback.format_exc()))
+                status = 1
+            finally:
+                sender.close()
+                os._exit(status)
+        sender.close()
+        # The worker starts with the driver's resident pages, only what it
+        # adds to them counts
+        start_rss = _worker_rss(pid)
+        rss = 0
+        try:
+            while not receiver.poll(POLL_INTERVAL):
+                elapsed_ns = time.perf_counter_ns() - start
+                rss = max(rss, _worker_rss(pid) - start_rss)
+                if elapsed_ns > self.timeout * 10 ** 9:
+                    return Outcome(results.STATUS_TIMEOUT, None, rss, elapsed_ns, None)
+                if rss > self.max_rss:
+                    return Outcome(results.STATUS_OOM, None, rss, elapsed_ns, None)
+            try:
+                status, value = receiver.recv()
+            except EOFError:
+                # The worker died without sending anything back, it was
+                # killed by the kernel's OOM killer or crashed
+                _, wait_status = os.waitpid(pid, 0)
+                pid = None
+                if (
+                    os.WIFSIGNALED(wait_status)
+                    and os.WTERMSIG(wait_status) == signal.SIGKILL
+                ):
+                    return Outcome(
+                        results.STATUS_OOM,
+                        None,
+                        rss,
+                        time.perf_counter_ns() - start,
+                        None,
+                    )
+                raise Exception("Watchdog worker died with status %s" % wait_status)
+            if status != results.STATUS_OK:
+                raise Exception("Watchdog worker failed:\n%s" % value)
+            call_timing, peak_rss, py_heap_peak = value
+            return Outcome(
+                results.STATUS_OK,
+                call_timing,
+                peak_rss,
+                time.perf_counter_ns() - start,
+                py_heap_peak,
+            )
+        finally:
+            receiver.close()
+            if pid is not None:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                os.waitpid(pid, 0)
+
+
+def _drop_result(value):
+    return None
+
+
+def measure(func, watchdog=None, result=None, **kwargs):
+    """Measure a call, in a supervised worker if a watchdog is set
+
+    :param callable func: The function to time
+    :param Watchdog watchdog: The limits of the call, it's measured in this
+        process without any limit if this is ``None``
+    :param callable result: Reduce the return value of the call, see
+        :meth:`Watchdog.measure`. In this process the return value is kept
+        as is if this isn't set.
+
+    :returns: An :class:`Outcome`
+    """
+    if watchdog is not None:
+        return watchdog.measure(func, result=result, **kwargs)
+    start = time.perf_counter_ns()
+    call_timing, peak_rss, py_heap_peak = _measure(func, result, kwargs)
+    return Outcome(
+        results.STATUS_OK,
+        call_timing,
+        peak_rss,
+        time.perf_counter_ns() - start,
+        py_heap_peak,
+    )
@@ -1,9 +1,5 @@
 #!/usr/bin/env python3
 
-from collections import defaultdict
-import csv
-import statistics
-
 import matplotlib.pyplot as plt
 
 try:
@@ -23,379 +19,797 @@ except:
     print("Skipping seaborn import (no TikZ output will be generated)")
 
 import numpy as np
-
-
-def creation_time_graph():
-    # Only use slower larger datasets, the following is the full list:
-    # single_source_shortest_files = [
-    #     'USA-road-1.USA', 'USA-road-d.NY', 'USA-road-d.USA', 'USA-road-t.NY',
-    #     'USA-road-t.USA', 'rome99.gr'
-    # ]
-    single_source_shortest_files = [
-        "USA-road-1.USA",
-        "USA-road-d.USA",
-        "USA-road-t.USA",
+import pandas as pd
+
+from bench_common import graphsdb
+from bench_common import results
+
+# The order and legend label of the libraries, libraries found in the
+# results which aren't listed here are plotted after these with their name
+# as the label
+LIBRARY_LABELS = {
+    "retworkx": "retworkx",
+    "networkx": "NetworkX",
+    "igraph": "igraph",
+    "graph-tool": "graph-tool",
+    "scipy": "SciPy",
+    "alt": "ALT",
+    "ch": "CH",
+}
+
+# The y axis label of each metric column of the summary
+METRICS = {
+    "seconds": "Runtime (sec.)",
+    "ns_per_cell": "Time per cell (ns)",
+    "queries_per_sec": "Queries per second",
+    "index_mb": "Index memory (MB)",
+    "pairs_per_sec": "Pairs per second",
+    "peak_mb": "Peak memory growth (MB)",
+    "py_heap_mb": "Python heap peak (MB)",
+    "bytes_per_edge": "Bytes per edge",
+}
+
+# Only the slower larger datasets are used for the USA figures, the full
+# list is:
+#     'USA-road-1.USA', 'USA-road-d.NY', 'USA-road-d.USA', 'USA-road-t.NY',
+#     'USA-road-t.USA', 'rome99.gr'
+USA_DATASETS = ["USA-road-1.USA", "USA-road-d.USA", "USA-road-t.USA"]
+
+# The stages of graph creation timed separately, see bench_common.dimacs
+CREATION_STAGES = ["decompress", "tokenize", "build"]
+
+# Every bar figure, each has:
+#
+# * name: The output file name without an extension
+# * algorithm: The algorithm column of the results to plot
+# * datasets: The datasets on the x axis
+# * panels: A list of (metric, title) tuples, one subplot each
+#
+# and optionally:
+#
+# * libraries: The libraries to plot, defaults to every library with results
+# * figsize, width: The figure size and bar width
+# * legend: Keyword arguments for ax.legend()
+# * xlim_scale, ylim_scale: Extend the axes to leave room for the legend
+#   and bar labels
+# * label_fmt: The format of the bar labels
+FIGURES = [
+    {
+        "name": "creation",
+        "algorithm": "Creation",
+        "datasets": USA_DATASETS,
+        "panels": [("seconds", "Time to create a weighted directed graph")],
+        "figsize": (12.8, 4.8),
+        "width": 0.195,
+        "legend": {"loc": "upper left", "bbox_to_anchor": (1.01, 1)},
+        "ylim_scale": 1.15,
+    },
+    {
+        "name": "creation_memory",
+        "algorithm": "Creation (build)",
+        "datasets": USA_DATASETS,
+        "panels": [
+            ("peak_mb", "Peak memory to build the graph"),
+            ("bytes_per_edge", "Memory of the built graph per edge"),
+        ],
+        "figsize": (12.8, 4.8),
+        "legend": {"loc": "upper left"},
+        "ylim_scale": 1.15,
+        "label_fmt": "%.3g",
+    },
+    {
+        "name": "single_source_shortest_path",
+        "algorithm": "Single Source",
+        "datasets": USA_DATASETS,
+        "panels": [("seconds", "Single Source Shortest path between 2 nodes")],
+        "figsize": (7, 4.8),
+        "width": 0.175,
+        "xlim_scale": 1.45,
+        "ylim_scale": 1.15,
+    },
+    {
+        "name": "single_source_shortest_path_2",
+        "algorithm": "Single Source",
+        "datasets": ["USA-road-d.NY", "USA-road-t.NY"],
+        "panels": [("seconds", "Single Source Shortest path between 2 nodes")],
+        "legend": {"loc": "upper left"},
+    },
+    {
+        "name": "single_source_shortest_path_memory",
+        "algorithm": "Single Source",
+        "datasets": USA_DATASETS,
+        "panels": [("peak_mb", "Single Source Shortest path peak memory")],
+        "figsize": (7, 4.8),
+        "width": 0.175,
+        "xlim_scale": 1.45,
+        "ylim_scale": 1.15,
+        "label_fmt": "%.3g",
+    },
+    {
+        "name": "all_pairs",
+        "algorithm": "All Pairs Shortest Path Length",
+        "datasets": ["rome99.gr"],
+        "panels": [("seconds", "All Pairs Shortest Path Length")],
+        "figsize": (7, 4.8),
+        "ylim_scale": 1.15,
+    },
+    {
+        "name": "all_pairs_memory",
+        "algorithm": "All Pairs Shortest Path Length",
+        "datasets": ["rome99.gr"],
+        "panels": [
+            ("peak_mb", "All Pairs Shortest Path Length peak memory"),
+            ("py_heap_mb", "All Pairs Shortest Path Length Python heap"),
+        ],
+        "figsize": (12.8, 4.8),
+        "ylim_scale": 1.15,
+        "label_fmt": "%.3g",
+    },
+    {
+        "name": "distance_matrix",
+        "algorithm": "Distance Matrix",
+        "datasets": ["rome99.gr"],
+        "panels": [
+            ("seconds", "Distance Matrix"),
+            ("ns_per_cell", "Distance Matrix time per cell"),
+        ],
+        "figsize": (12.8, 4.8),
+        "label_fmt": "%.3g",
+    },
+    {
+        "name": "distance_matrix_memory",
+        "algorithm": "Distance Matrix",
+        "datasets": ["rome99.gr"],
+        "panels": [
+            ("peak_mb", "Distance Matrix peak memory"),
+            ("py_heap_mb", "Distance Matrix Python heap"),
+        ],
+        "figsize": (12.8, 4.8),
+        "ylim_scale": 1.15,
+        "label_fmt": "%.3g",
+    },
+    {
+        "name": "query_workload",
+        "algorithm": "Query Workload",
+        "datasets": ["USA-road-d.NY", "USA-road-t.NY"],
+        "panels": [("queries_per_sec", "Point to point query throughput")],
+        "legend": {"loc": "upper left"},
+        "label_fmt": "%.3g",
+    },
+    {
+        "name": "preprocessing",
+        "algorithm": "Preprocessing",
+        "datasets": ["USA-road-d.NY", "USA-road-t.NY"],
+        "panels": [
+            ("seconds", "Time to preprocess the graph"),
+            ("index_mb", "Memory of the preprocessed index"),
+        ],
+        "libraries": ["alt", "ch"],
+        "figsize": (12.8, 4.8),
+        "width": 0.35,
+        "legend": {"loc": "upper left"},
+        "label_fmt": "%.3g",
+    },
+    {
+        "name": "subgraph_isomorphism_sweep",
+        "algorithm": results.ISOMORPHISM_SWEEP,
+        "datasets": ["graphsdb"],
+        "panels": [("pairs_per_sec", "Subgraph isomorphism sweep throughput")],
+        "figsize": (7, 4.8),
+        "label_fmt": "%.3g",
+    },
+]
+
+# Every scaling figure, each has a name, the dataset to plot and panels
+# which are (algorithm, metric, title) tuples. Each panel plots the median
+# speedup or efficiency (see bench_common.scaling) of every library against
+# the number of workers.
+SCALING_FIGURES = [
+    {
+        "name": "multi_source_scaling",
+        "dataset": "USA-road-d.NY",
+        "panels": [
+            (
+                "Multi Source (threads)",
+                "speedup",
+                "Multi source Dijkstra, thread pool",
+            ),
+            (
+                "Multi Source (processes)",
+                "speedup",
+                "Multi source Dijkstra, process pool",
+            ),
+        ],
+    },
+    {
+        "name": "thread_scaling",
+        "dataset": "rome99.gr",
+        "panels": [
+            (
+                "All Pairs Shortest Path Length (strong scaling)",
+                "speedup",
+                "All Pairs Shortest Path Length",
+            ),
+            ("Distance Matrix (strong scaling)", "speedup", "Distance Matrix"),
+        ],
+    },
+    {
+        "name": "thread_scaling_weak",
+        "dataset": "rome99.gr",
+        "panels": [
+            (
+                "All Pairs Shortest Path Length (weak scaling)",
+                "efficiency",
+                "All Pairs Shortest Path Length, weak scaling",
+            ),
+            (
+                "Distance Matrix (weak scaling)",
+                "efficiency",
+                "Distance Matrix, weak scaling",
+            ),
+        ],
+    },
+]
+
+# The y axis label of the scaling metrics
+SCALING_METRICS = {
+    "speedup": "Speedup",
+    "efficiency": "Parallel efficiency",
+}
+
+# The datasets of the query latency by Dijkstra rank figure
+QUERY_LATENCY_DATASETS = ["USA-road-d.NY", "USA-road-t.NY"]
+
+# The preprocessing speedup engines, their queries settle their own counts
+# of nodes unlike the libraries' searches
+SPEEDUP_LIBRARIES = ["alt", "ch"]
+
+# The label and line style of each query variant in the latency figure
+QUERY_VARIANTS = {
+    "Query Latency": ("Dijkstra", "-"),
+    "Query Latency (Bidirectional Dijkstra)": ("Bidirectional Dijkstra", "--"),
+    "Query Latency (A*)": ("A*", ":"),
+}
+
+
+def summarize(frame):
+    """Reduce the result records to one row per benchmark
+
+    :param frame: The DataFrame returned by
+        :func:`bench_common.results.load_results`
+
+    :returns: A DataFrame indexed by ``(algorithm, library, dataset)`` with
+        the median time in ``seconds``, the time per cell of an n x n
+        matrix in ``ns_per_cell``, the ``queries_per_sec`` of a query batch
+        (``pairs_per_sec`` of an isomorphism sweep), the ``index_mb`` of a
+        preprocessed index, the ``embeddings`` an isomorphism mode found,
+        the memory of the benchmark in ``peak_mb``, ``py_heap_mb`` and the
+        ``bytes_per_edge`` of a built graph and the graph size. A benchmark the watchdog stopped has its status in
+        ``censored`` and the time it ran for in ``censored_seconds``, a
+        lower bound of a call's runtime if the first call didn't finish.
+    """
+    stopped = frame[frame["status"].isin([results.STATUS_TIMEOUT, results.STATUS_OOM])]
+    frame = frame[frame["ns"].notna()]
+    summary = frame.groupby(["algorithm", "library", "dataset"]).agg(
+        ns=("ns", "median"),
+        num_nodes=("num_nodes", "max"),
+        num_edges=("num_edges", "max"),
+        batch_size=("batch_size", "max"),
+        index_bytes=("index_bytes", "max"),
+        embeddings=("embeddings", "max"),
+        peak_rss=("peak_rss", "max"),
+        py_heap_peak=("py_heap_peak", "max"),
+        graph_bytes=("graph_bytes", "max"),
+    )
+    summary["seconds"] = summary["ns"] / 10 ** 9
+    summary["ns_per_cell"] = summary["ns"] / summary["num_nodes"] ** 2
+    summary["queries_per_sec"] = summary["batch_size"] / summary["seconds"]
+    summary["index_mb"] = summary["index_bytes"] / 2 ** 20
+    # The batch of an isomorphism sweep is its pairs
+    summary["pairs_per_sec"] = summary["queries_per_sec"]
+    summary["peak_mb"] = summary["peak_rss"] / 2 ** 20
+    summary["py_heap_mb"] = summary["py_heap_peak"] / 2 ** 20
+    summary["bytes_per_edge"] = summary["graph_bytes"] / summary["num_edges"]
+    censored = stopped.groupby(["algorithm", "library", "dataset"]).agg(
+        censored=("status", "first"), elapsed_ns=("elapsed_ns", "max")
+    )
+    summary = summary.join(censored, how="outer")
+    summary["censored_seconds"] = summary["elapsed_ns"] / 10 ** 9
+    return summary
+
+
+def load_summary(directory="."):
+    """Load every result once and reduce it with :func:`summarize`
+
+    :param str directory: The directory with the result files
+    """
+    return summarize(results.load_results(directory))
+
+
+def libraries(summary):
+    """Return the libraries with results in plotting order"""
+    found = set(summary.index.get_level_values("library"))
+    ordered = [library for library in LIBRARY_LABELS if library in found]
+    return ordered + sorted(found - set(LIBRARY_LABELS))
+
+
+def bar_figure(summary, spec):
+    """Plot a bar figure from its spec in :data:`FIGURES`"""
+    algorithm = spec["algorithm"]
+    datasets = spec["datasets"]
+    figure_libraries = spec.get("libraries") or libraries(summary)
+    if algorithm not in summary.index.get_level_values("algorithm"):
+        print("Skipping %s graph, no %s results found" % (spec["name"], algorithm))
+        return
+    data = summary.loc[algorithm]
+    in_datasets = data[data.index.get_level_values("dataset").isin(datasets)]
+    # Results from before a metric was recorded (e.g. memory) or without it
+    # (the Python heap is only traced on request) don't get a panel
+    panels = [
+        (metric, title)
+        for metric, title in spec["panels"]
+        if in_datasets[metric].notna().any() or in_datasets["censored"].notna().any()
     ]
-    retworkx_times = []
-    networkx_times = []
-    igraph_times = []
-    graph_tools_times = []
-    for file in single_source_shortest_files:
-        retworkx_file = "retworkx_" + file + ".csv"
-        with open(retworkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Creation":
-                    retworkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        networkx_file = "networkx_" + file + ".csv"
-        with open(networkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Creation":
-                    networkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        igraph_file = "igraph_" + file + ".csv"
-        with open(igraph_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Creation":
-                    igraph_times.append(statistics.mean([float(x) for x in row[1:]]))
-        graph_tools_file = "graph-tool_" + file + ".csv"
-        with open(graph_tools_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Creation":
-                    graph_tools_times.append(
-                        statistics.mean([float(x) for x in row[1:]])
-                    )
-    x = np.arange(len(single_source_shortest_files))
-    width = 0.195
+    if not panels:
+        print("Skipping %s graph, no %s results found" % (spec["name"], algorithm))
+        return
+    x = np.arange(len(datasets))
+    # The widths are for 4 libraries, keep each group as wide with more
+    width = spec.get("width", 0.2333) * 4 / len(figure_libraries)
     if HAS_SNS:
         sns.set_theme()
-    fig, ax = plt.subplots(figsize=(12.8, 4.8))
-    retworkx_rects = ax.bar(x - 3 * width / 2, retworkx_times, width, label="retworkx")
-    networkx_rects = ax.bar(x - width / 2, networkx_times, width, label="NetworkX")
-    igraph_rects = ax.bar(x + width / 2, igraph_times, width, label="igraph")
-    graph_tools_rects = ax.bar(
-        x + 3 * width / 2, graph_tools_times, width, label="graph-tool"
+    fig, axes = plt.subplots(
+        ncols=len(panels), figsize=spec.get("figsize"), squeeze=False
     )
-
-    ax.set_ylabel("Runtime (sec.)")
-    ax.set_title("Time to create a weighted directed graph", fontweight="bold")
-    ax.set_xlabel("Data File")
-    ax.set_xticks(x)
-    ax.set_xticklabels(single_source_shortest_files)
-    ax.legend(loc="upper left", bbox_to_anchor=(1.01,1))
-
-    ax.bar_label(retworkx_rects, padding=3)
-    ax.bar_label(networkx_rects, padding=3)
-    ax.bar_label(igraph_rects, padding=3)
-    ax.bar_label(graph_tools_rects, padding=3)
-    ax.set_ylim(top=np.amax(graph_tools_times)*1.15)
+    censored = (
+        data[["censored", "censored_seconds"]]
+        .unstack("dataset")
+        .reindex(index=figure_libraries)
+    )
+    for ax, (metric, title) in zip(axes[0], panels):
+        values = (
+            data[metric]
+            .unstack("dataset")
+            .reindex(index=figure_libraries, columns=datasets)
+            .fillna(0.0)
+        )
+        top = np.amax(values.to_numpy())
+        for i, library in enumerate(figure_libraries):
+            offset = (2 * i - (len(figure_libraries) - 1)) * width / 2
+            rects = ax.bar(
+                x + offset,
+                values.loc[library],
+                width,
+                label=LIBRARY_LABELS.get(library, library),
+            )
+            if "label_fmt" in spec:
+                ax.bar_label(rects, padding=3, fmt=spec["label_fmt"])
+            else:
+                ax.bar_label(rects, padding=3)
+            # A run the watchdog stopped is an empty bar up to the time it
+            # ran for, only a lower bound of a runtime can be drawn
+            for j, dataset in enumerate(datasets):
+                status = censored["censored"].get(dataset, {}).get(library)
+                if not isinstance(status, str) or values.loc[library, dataset]:
+                    continue
+                height = 0.0
+                if metric == "seconds":
+                    height = censored.loc[library, ("censored_seconds", dataset)]
+                    top = max(top, height)
+                bound = ax.bar(
+                    x[j] + offset,
+                    height,
+                    width,
+                    fill=False,
+                    hatch="//",
+                    edgecolor=rects.patches[0].get_facecolor(),
+                )
+                ax.bar_label(bound, labels=[status], padding=3)
+        ax.set_ylabel(METRICS[metric])
+        ax.set_title(title, fontweight="bold")
+        ax.set_xlabel("Data File")
+        ax.set_xticks(x)
+        ax.set_xticklabels(datasets)
+        if "xlim_scale" in spec:
+            ax.set_xlim(right=np.amax(x) * spec["xlim_scale"])
+        if "ylim_scale" in spec:
+            ax.set_ylim(top=top * spec["ylim_scale"])
+        ax.legend(**spec.get("legend", {}))
     fig.tight_layout()
-    fig.savefig("creation.png")
+    fig.savefig(spec["name"] + ".png")
 
     if HAS_TIKZ:
-        tikzplotlib.save("creation.tex")
-
-
-def single_source_graph():
-    # Only use slower larger datasets, the following is the full list:
-    # single_source_shortest_files = [
-    #     'USA-road-1.USA', 'USA-road-d.NY', 'USA-road-d.USA', 'USA-road-t.NY',
-    #     'USA-road-t.USA', 'rome99.gr'
-    # ]
-    single_source_shortest_files = [
-        "USA-road-1.USA",
-        "USA-road-d.USA",
-        "USA-road-t.USA",
+        tikzplotlib.save(spec["name"] + ".tex")
+
+
+def isomorphism_graph(summary):
+    """Plot the summed runtime of each ARG database graph by size, one
+    figure per graph group with a panel per type and subgraph size
+
+    A graph where a library has fewer pairs than the others, because its
+    family's time limit was reached, isn't plotted for that library so its
+    line ends at the largest graph it finished. A graph with a pair the
+    watchdog stopped is plotted as a lower bound marker.
+    """
+    if results.ISOMORPHISM not in summary.index.get_level_values("algorithm"):
+        print("Skipping subgraph isomorphism graph, no results found")
+        return
+    iso_summary = summary.loc[results.ISOMORPHISM]
+    # A pair the watchdog stopped took at least as long as it ran for
+    pair_times = iso_summary["seconds"].fillna(iso_summary["censored_seconds"])
+    pair_stopped = iso_summary["seconds"].isna() & iso_summary["censored"].notna()
+    graph_keys = [
+        pair_times.index.get_level_values("library"),
+        pair_times.index.get_level_values("dataset").str.split(".").str[0],
+    ]
+    # Median of each pair's samples summed over the pairs of a graph
+    by_graph = pair_times.groupby(graph_keys)
+    graph_times = by_graph.sum().unstack(0)
+    pair_counts = by_graph.count().unstack(0)
+    graph_stopped = pair_stopped.groupby(graph_keys).any().unstack(0, fill_value=False)
+    iso_libraries = [
+        library for library in libraries(summary) if library in graph_times
+    ]
+    complete = pair_counts.eq(pair_counts.max(axis=1), axis=0)
+    graph_bounds = graph_times.where(complete & graph_stopped)
+    graph_times = graph_times.where(complete & ~graph_stopped)
+    graphs = [graphsdb.split_pair_name(graph) for graph in graph_times.index]
+    index = pd.MultiIndex.from_tuples(graphs, names=["prefix", "type", "size"])
+    graph_times.index = index
+    graph_bounds.index = index
+    graph_times = graph_times.reindex(columns=iso_libraries)
+    graph_bounds = graph_bounds.reindex(columns=iso_libraries)
+    types = sorted(
+        {g_type for _, g_type, _ in graphs},
+        key=lambda g_type: (graphsdb.arg_type(g_type).irregular, g_type),
+    )
+    groups = {}
+    for g_type in types:
+        groups.setdefault(graphsdb.arg_type(g_type).group, []).append(g_type)
+    prefixes = [
+        prefix
+        for prefix in graphsdb.SUBGRAPH_PREFIXES
+        if prefix in graph_times.index.get_level_values("prefix")
     ]
-    retworkx_times = []
-    networkx_times = []
-    igraph_times = []
-    graph_tools_times = []
-    for file in single_source_shortest_files:
-        retworkx_file = "retworkx_" + file + ".csv"
-        with open(retworkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    retworkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        networkx_file = "networkx_" + file + ".csv"
-        with open(networkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    networkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        igraph_file = "igraph_" + file + ".csv"
-        with open(igraph_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    igraph_times.append(statistics.mean([float(x) for x in row[1:]]))
-        graph_tools_file = "graph-tool_" + file + ".csv"
-        with open(graph_tools_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    graph_tools_times.append(
-                        statistics.mean([float(x) for x in row[1:]])
-                    )
-    x = np.arange(len(single_source_shortest_files))
-    width = 0.175
     if HAS_SNS:
         sns.set_theme()
-    fig, ax = plt.subplots(figsize=(7, 4.8))
-    retworkx_rects = ax.bar(x - 3 * width / 2, retworkx_times, width, label="retworkx")
-    networkx_rects = ax.bar(x - width / 2, networkx_times, width, label="NetworkX")
-    igraph_rects = ax.bar(x + width / 2, igraph_times, width, label="igraph")
-    graph_tools_rects = ax.bar(
-        x + 3 * width / 2, graph_tools_times, width, label="graph-tool"
-    )
-
-    ax.set_ylabel("Runtime (sec.)")
-    ax.set_title("Single Source Shortest path between 2 nodes", fontweight="bold")
-    ax.set_xlabel("Data File")
-    ax.set_xticks(x)
-    ax.set_xticklabels(single_source_shortest_files)
-    ax.set_xlim(right=np.amax(x)*1.45)
-    ax.set_ylim(top=np.amax(networkx_times)*1.15)
-    ax.legend()
-
-    ax.bar_label(retworkx_rects, padding=3)
-    ax.bar_label(networkx_rects, padding=3)
-    ax.bar_label(igraph_rects, padding=3)
-    ax.bar_label(graph_tools_rects, padding=3)
-    fig.tight_layout()
-    fig.savefig("single_source_shortest_path.png")
+        sns.set_context("notebook", font_scale=2, rc={"lines.linewidth": 2.5})
+    for group, group_types in groups.items():
+        fig = plt.figure(
+            figsize=(29 * len(group_types) / 3, 22 * len(prefixes) / 3),
+            constrained_layout=True,
+        )
+        ax = fig.subplots(nrows=len(prefixes), ncols=len(group_types), squeeze=False)
+        fig.suptitle(
+            graphsdb.GRAPH_GROUPS.get(group, group), fontsize=30, fontweight="bold"
+        )
+        for i, percent in enumerate(prefixes):
+            for j, g_type in enumerate(group_types):
+                if (percent, g_type) not in graph_times.index.droplevel("size"):
+                    ax[i, j].set_visible(False)
+                    continue
+                panel = graph_times.loc[(percent, g_type)].sort_index()
+                bounds = graph_bounds.loc[(percent, g_type)].sort_index()
+                indices = panel.index.tolist()
+
+                x = np.arange(len(indices))
+                for library in iso_libraries:
+                    (line,) = ax[i, j].plot(
+                        x,
+                        panel[library].tolist(),
+                        marker="o",
+                        label=LIBRARY_LABELS.get(library, library),
+                    )
+                    ax[i, j].plot(
+                        x,
+                        bounds[library].tolist(),
+                        linestyle="none",
+                        marker="^",
+                        markersize=12,
+                        color=line.get_color(),
+                    )
+                if bounds.notna().to_numpy().any():
+                    ax[i, j].plot(
+                        [],
+                        [],
+                        "k^",
+                        linestyle="none",
+                        label="Stopped by the watchdog (lower bound)",
+                    )
+                ax[i, j].set_ylabel("Sum of Runtime (sec.)")
+                ax[i, j].set_title(
+                    f"{graphsdb.arg_type(g_type).label} \n and subgraph size of {percent[-1]}0%",
+                    fontweight="bold",
+                    fontsize=25,
+                )
+                ax[i, j].set_xlabel("Number of graph nodes")
+                ax[i, j].set_xticks(x)
+                ax[i, j].set_xticklabels(indices)
+                ax[i, j].legend()
+                ax[i, j].set_yscale("log")
+
+        # The bounded valence figure keeps the name it had before the other
+        # groups were benchmarked
+        if group == "bvg":
+            name = "subgraph_isomorphism"
+        else:
+            name = "subgraph_isomorphism_%s" % group
+        fig.savefig(name + ".png", dpi=200)
+        plt.close(fig)
 
     if HAS_TIKZ:
-        tikzplotlib.save("single_source_shortest_path.tex")
+        pass
+        # tikzplotlib.save("subgraph_isomorphism.tex")
 
 
-def single_source_graph_NY():
-    single_source_shortest_files = [
-        "USA-road-d.NY",
-        "USA-road-t.NY",
+def creation_stages_graph(summary):
+    """Plot the time of each graph creation stage next to the whole
+    creation, one panel per USA dataset"""
+    algorithms = ["Creation"] + ["Creation (%s)" % stage for stage in CREATION_STAGES]
+    found = summary.index.get_level_values("algorithm")
+    if not all(algorithm in found for algorithm in algorithms):
+        print("Skipping creation stages graph, no results found")
+        return
+    seconds = summary["seconds"].unstack("algorithm").reindex(columns=algorithms)
+    datasets = [
+        dataset
+        for dataset in USA_DATASETS
+        if dataset in seconds.index.get_level_values("dataset")
+        and seconds.xs(dataset, level="dataset")[algorithms[1]].notna().any()
     ]
-    retworkx_times = []
-    networkx_times = []
-    igraph_times = []
-    graph_tools_times = []
-    for file in single_source_shortest_files:
-        retworkx_file = "retworkx_" + file + ".csv"
-        with open(retworkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    retworkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        networkx_file = "networkx_" + file + ".csv"
-        with open(networkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    networkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        igraph_file = "igraph_" + file + ".csv"
-        with open(igraph_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    igraph_times.append(statistics.mean([float(x) for x in row[1:]]))
-        graph_tools_file = "graph-tool_" + file + ".csv"
-        with open(graph_tools_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "Single Source":
-                    graph_tools_times.append(
-                        statistics.mean([float(x) for x in row[1:]])
-                    )
-    x = np.arange(len(single_source_shortest_files))
-    width = 0.2333
+    if not datasets:
+        print("Skipping creation stages graph, no results found")
+        return
     if HAS_SNS:
         sns.set_theme()
-    fig, ax = plt.subplots()
-    retworkx_rects = ax.bar(x - 3 * width / 2, retworkx_times, width, label="retworkx")
-    networkx_rects = ax.bar(x - width / 2, networkx_times, width, label="NetworkX")
-    igraph_rects = ax.bar(x + width / 2, igraph_times, width, label="igraph")
-    graph_tools_rects = ax.bar(
-        x + 3 * width / 2, graph_tools_times, width, label="graph-tool"
+    fig, axes = plt.subplots(
+        ncols=len(datasets), figsize=(6.4 * len(datasets), 4.8), squeeze=False
     )
-
-    ax.set_ylabel("Runtime (sec.)")
-    ax.set_title("Single Source Shortest path between 2 nodes", fontweight="bold")
-    ax.set_xlabel("Data File")
-    ax.set_xticks(x)
-    ax.set_xticklabels(single_source_shortest_files)
-    ax.legend(loc="upper left")
-
-    ax.bar_label(retworkx_rects, padding=3)
-    ax.bar_label(networkx_rects, padding=3)
-    ax.bar_label(igraph_rects, padding=3)
-    ax.bar_label(graph_tools_rects, padding=3)
+    for ax, dataset in zip(axes[0], datasets):
+        data = seconds.xs(dataset, level="dataset").dropna(subset=[algorithms[1]])
+        stage_libraries = [
+            library for library in libraries(summary) if library in data.index
+        ]
+        x = np.arange(len(stage_libraries))
+        width = 0.8 / len(algorithms)
+        for i, algorithm in enumerate(algorithms):
+            offset = (2 * i - (len(algorithms) - 1)) * width / 2
+            ax.bar(
+                x + offset,
+                data[algorithm].reindex(stage_libraries).fillna(0.0),
+                width,
+                label=algorithm.replace("Creation (", "").rstrip(")").capitalize(),
+            )
+        ax.set_ylabel(METRICS["seconds"])
+        # Decompressing overlaps tokenizing so the stages don't add up to
+        # the creation time
+        ax.set_title("Graph creation stages on %s" % dataset, fontweight="bold")
+        ax.set_xticks(x)
+        ax.set_xticklabels(
+            [LIBRARY_LABELS.get(library, library) for library in stage_libraries]
+        )
+        ax.legend(loc="upper left")
     fig.tight_layout()
-    fig.savefig("single_source_shortest_path_2.png")
+    fig.savefig("creation_stages.png")
 
     if HAS_TIKZ:
-        tikzplotlib.save("single_source_shortest_path_2.tex")
-
-
-def all_pair_graph():
-    all_pair_files = ["rome99.gr"]
-    all_pair_libs = ["retworkx", "networkx", "igraph"]
-    retworkx_times = []
-    networkx_times = []
-    igraph_times = []
-    graph_tools_times = []
-    for file in all_pair_files:
-        retworkx_file = "retworkx_" + file + ".csv"
-        with open(retworkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "All Pairs Shortest Path Length":
-                    retworkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        networkx_file = "networkx_" + file + ".csv"
-        with open(networkx_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "All Pairs Shortest Path Length":
-                    networkx_times.append(statistics.mean([float(x) for x in row[1:]]))
-        igraph_file = "igraph_" + file + ".csv"
-        with open(igraph_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "All Pairs Shortest Path Length":
-                    igraph_times.append(statistics.mean([float(x) for x in row[1:]]))
-        graph_tools_file = "graph-tool_" + file + ".csv"
-        with open(graph_tools_file) as csvfile:
-            data_reader = csv.reader(csvfile)
-            for row in data_reader:
-                if row[0] == "All Pairs Shortest Path Length":
-                    graph_tools_times.append(
-                        statistics.mean([float(x) for x in row[1:]])
-                    )
-    x = np.arange(len(all_pair_files))
-    width = 0.2333
+        tikzplotlib.save("creation_stages.tex")
+
+
+def isomorphism_modes_graph(summary):
+    """Plot the time to the first match, to enumerate and to count every
+    embedding of the isomorphism pairs, and the embeddings per second"""
+    found = summary.index.get_level_values("algorithm")
+    labels = {
+        results.isomorphism_algorithm(mode, induced): "%s, %s"
+        % (mode, "induced" if induced else "non-induced")
+        for induced in [True, False]
+        for mode in ["first", "all", "count"]
+    }
+    mode_algorithms = list(labels)
+    mode_algorithms = [algorithm for algorithm in mode_algorithms if algorithm in found]
+    if mode_algorithms == [results.ISOMORPHISM] or not mode_algorithms:
+        print("Skipping isomorphism modes graph, no results found")
+        return
+    totals = (
+        summary.loc[mode_algorithms, ["seconds", "embeddings"]]
+        .groupby(["algorithm", "library"])
+        .sum(min_count=1)
+    )
+    mode_libraries = [
+        library
+        for library in libraries(summary)
+        if library in totals.index.get_level_values("library")
+    ]
     if HAS_SNS:
         sns.set_theme()
-    fig, ax = plt.subplots(figsize=(7, 4.8))
-    retworkx_rects = ax.bar(x - 3 * width / 2, retworkx_times, width, label="retworkx")
-    networkx_rects = ax.bar(x - width / 2, networkx_times, width, label="NetworkX")
-    igraph_rects = ax.bar(x + width / 2, igraph_times, width, label="igraph")
-    graph_tools_rects = ax.bar(
-        x + 3 * width / 2, graph_tools_times, width, label="graph-tool"
-    )
-
-    ax.set_ylabel("Runtime (sec.)")
-    ax.set_title("All Pairs Shortest Path Length", fontweight="bold")
-    ax.set_xlabel("Data File")
-    ax.set_xticks(x)
-    ax.set_xticklabels(all_pair_files)
-    ax.set_ylim(top=np.amax(networkx_times)*1.15)
-    ax.legend()
-
-    ax.bar_label(retworkx_rects, padding=3)
-    ax.bar_label(networkx_rects, padding=3)
-    ax.bar_label(igraph_rects, padding=3)
-    ax.bar_label(graph_tools_rects, padding=3)
+    fig, axes = plt.subplots(ncols=2, figsize=(12.8, 4.8))
+    x = np.arange(len(mode_libraries))
+    width = 0.8 / len(mode_algorithms)
+    for i, algorithm in enumerate(mode_algorithms):
+        data = totals.loc[algorithm].reindex(mode_libraries)
+        offset = (2 * i - (len(mode_algorithms) - 1)) * width / 2
+        axes[0].bar(
+            x + offset, data["seconds"].fillna(0.0), width, label=labels[algorithm]
+        )
+        axes[1].bar(
+            x + offset,
+            (data["embeddings"] / data["seconds"]).fillna(0.0),
+            width,
+            label=labels[algorithm],
+        )
+    axes[0].set_ylabel("Sum of Runtime (sec.)")
+    axes[0].set_title("Subgraph isomorphism modes", fontweight="bold")
+    axes[0].set_yscale("log")
+    # Only the all and count modes find the number of embeddings
+    axes[1].set_ylabel("Embeddings per second")
+    axes[1].set_title("Subgraph isomorphism enumeration rate", fontweight="bold")
+    for ax in axes:
+        ax.set_xticks(x)
+        ax.set_xticklabels(
+            [LIBRARY_LABELS.get(library, library) for library in mode_libraries]
+        )
+        ax.legend(loc="upper left")
     fig.tight_layout()
-    fig.savefig("all_pairs.png")
+    fig.savefig("subgraph_isomorphism_modes.png")
 
     if HAS_TIKZ:
-        tikzplotlib.save("all_pairs.tex")
-
-
-def isomorphism_graph():
-    retworkx_times = defaultdict(float)
-    networkx_times = defaultdict(float)
-    igraph_times = defaultdict(float)
-    graph_tool_times = defaultdict(float)
-    retworkx_file = "retworkx_subgraph_iso.csv"
-    with open(retworkx_file) as csvfile:
-        data_reader = csv.reader(csvfile)
-        for row in data_reader:
-            if row[0] == "Graph":
-                continue
-            file_prefix = row[0].split(".")[0]
-            retworkx_times[file_prefix] += float(row[1])
-    networkx_file = "networkx_subgraph_iso.csv"
-    with open(networkx_file) as csvfile:
-        data_reader = csv.reader(csvfile)
-        for row in data_reader:
-            if row[0] == "Graph":
-                continue
-            file_prefix = row[0].split(".")[0]
-            networkx_times[file_prefix] += float(row[1])
-    igraph_file = "igraph_subgraph_iso.csv"
-    with open(igraph_file) as csvfile:
-        data_reader = csv.reader(csvfile)
-        for row in data_reader:
-            if row[0] == "Graph":
-                continue
-            file_prefix = row[0].split(".")[0]
-            igraph_times[file_prefix] += float(row[1])
-    graph_tools_file = "graph_tool_subgraph_iso.csv"
-    with open(graph_tools_file) as csvfile:
-        data_reader = csv.reader(csvfile)
-        for row in data_reader:
-            if row[0] == "Graph":
-                continue
-            file_prefix = row[0].split(".")[0]
-            graph_tool_times[file_prefix] += float(row[1])
+        tikzplotlib.save("subgraph_isomorphism_modes.tex")
+
+
+def query_latency_graph(frame):
+    """Plot the median query latency and settled nodes of each Dijkstra
+    rank bucket for every query variant"""
+    latencies = frame[
+        frame["algorithm"].isin(QUERY_VARIANTS)
+        & frame["ns"].notna()
+        & frame["dataset"].isin(QUERY_LATENCY_DATASETS)
+    ]
+    if latencies.empty:
+        print("Skipping query latency graph, no results found")
+        return
+    grouped = latencies.groupby(["dataset", "algorithm", "library", "rank"])
+    medians = grouped["ns"].median() / 10 ** 9
+    settled = grouped["settled"].median()
+    colors = {library: "C%s" % i for i, library in enumerate(libraries(medians))}
     if HAS_SNS:
         sns.set_theme()
-        sns.set_context("notebook", font_scale=2, rc={"lines.linewidth": 2.5})
-    fig = plt.figure(figsize=(29, 22), constrained_layout=True)
-    subfigs = fig.subplots(nrows=3, ncols=3)
-    for i, percent in enumerate(["si6", "si4", "si2"]):
-        subfig = subfigs[i]
-        # subfig.suptitle(f"Subgraph is {percent[-1]}0% of graph size", fontsize=21, fontweight="bold")
-        # ax = subfig.subplots(nrows=1, ncols=3)
-        ax = subfigs
-        for j, valence in enumerate(["b03", "b06", "b09"]):
-            indices = []
-            retworkx_data = []
-            networkx_data = []
-            igraph_data = []
-            graph_tool_data = []
-            for graph, point in sorted(
-                retworkx_times.items(), key=lambda x: int(x[0].split("_")[-1][1:])
+    fig, axes = plt.subplots(
+        nrows=2,
+        ncols=len(QUERY_LATENCY_DATASETS),
+        figsize=(12.8, 9.6),
+        squeeze=False,
+    )
+    for column, dataset in enumerate(QUERY_LATENCY_DATASETS):
+        latency_ax, settled_ax = axes[:, column]
+        if dataset not in medians.index.get_level_values("dataset"):
+            latency_ax.set_visible(False)
+            settled_ax.set_visible(False)
+            continue
+        for algorithm, (variant, linestyle) in QUERY_VARIANTS.items():
+            if algorithm not in medians.loc[dataset].index.get_level_values(
+                "algorithm"
             ):
-                if graph.startswith("%s_%s_" % (percent, valence)):
-                    indices.append(int(graph.split("_")[-1][1:]))
-                    retworkx_data.append(point)
-                    networkx_data.append(networkx_times[graph])
-                    igraph_data.append(igraph_times[graph])
-                    graph_tool_data.append(graph_tool_times[graph])
-
-            x = np.arange(len(indices))
-            ax[i, j].plot(retworkx_data, label="retworkx")
-            ax[i, j].plot(networkx_data, label="NetworkX")
-            ax[i, j].plot(igraph_data, label="igraph")
-            ax[i, j].plot(graph_tool_data, label="graph-tool")
-            ax[i, j].set_ylabel("Sum of Runtime (sec.)")
-            ax[i, j].set_title(
-                f"Bounded-valance graph with valence = {valence[-1]} \n and subgraph size of {percent[-1]}0%", 
-                fontweight="bold", 
-                fontsize=25
+                continue
+            variant_medians = medians.loc[dataset, algorithm]
+            for library in libraries(variant_medians):
+                library_medians = variant_medians.loc[library]
+                latency_ax.plot(
+                    2 ** library_medians.index.to_numpy(dtype=int),
+                    library_medians.to_numpy(),
+                    marker="o",
+                    color=colors[library],
+                    linestyle=linestyle,
+                    label="%s, %s" % (LIBRARY_LABELS.get(library, library), variant),
+                )
+            # The settled nodes of the libraries' searches only depend on
+            # the variant, the speedup engines run their own search
+            variant_settled = settled.loc[dataset, algorithm]
+            settled_libraries = variant_settled.index.get_level_values("library")
+            shared_settled = (
+                variant_settled[~settled_libraries.isin(SPEEDUP_LIBRARIES)]
+                .groupby("rank")
+                .median()
+                .dropna()
             )
-            ax[i, j].set_xlabel("Number of graph nodes")
-            ax[i, j].set_xticks(x)
-            ax[i, j].set_xticklabels(indices)
-            ax[i, j].legend()
-            ax[i, j].set_yscale("log")
+            if not shared_settled.empty:
+                settled_ax.plot(
+                    2 ** shared_settled.index.to_numpy(dtype=int),
+                    shared_settled.to_numpy(),
+                    marker="o",
+                    linestyle=linestyle,
+                    label=variant,
+                )
+            for library in SPEEDUP_LIBRARIES:
+                if library not in settled_libraries:
+                    continue
+                engine_settled = variant_settled.loc[library].dropna()
+                settled_ax.plot(
+                    2 ** engine_settled.index.to_numpy(dtype=int),
+                    engine_settled.to_numpy(),
+                    marker="s",
+                    color=colors[library],
+                    linestyle=linestyle,
+                    label=LIBRARY_LABELS.get(library, library),
+                )
+        latency_ax.set_ylabel("Median query latency (sec.)")
+        latency_ax.set_title(dataset, fontweight="bold")
+        latency_ax.legend(loc="upper left", fontsize="small")
+        settled_ax.set_ylabel("Settled nodes")
+        settled_ax.legend(loc="upper left")
+        for ax in (latency_ax, settled_ax):
+            ax.set_xscale("log", base=2)
+            ax.set_yscale("log")
+            ax.set_xlabel("Dijkstra rank")
+    fig.tight_layout()
+    fig.savefig("query_latency.png")
+
+    if HAS_TIKZ:
+        tikzplotlib.save("query_latency.tex")
 
-    fig.savefig("subgraph_isomorphism.png", dpi=200)
+
+def scaling_graph(frame, spec):
+    """Plot a scaling figure from its spec in :data:`SCALING_FIGURES`"""
+    algorithms = [algorithm for algorithm, _, _ in spec["panels"]]
+    data = frame[
+        frame["algorithm"].isin(algorithms)
+        & (frame["dataset"] == spec["dataset"])
+        & frame["ns"].notna()
+        & frame["speedup"].notna()
+    ]
+    if data.empty:
+        print("Skipping %s graph, no results found" % spec["name"])
+        return
+    medians = data.groupby(["algorithm", "library", "workers"])[
+        ["speedup", "efficiency"]
+    ].median()
+    if HAS_SNS:
+        sns.set_theme()
+    fig, axes = plt.subplots(
+        ncols=len(spec["panels"]),
+        figsize=(6.4 * len(spec["panels"]), 4.8),
+        squeeze=False,
+    )
+    for ax, (algorithm, metric, title) in zip(axes[0], spec["panels"]):
+        if algorithm not in medians.index.get_level_values("algorithm"):
+            ax.set_visible(False)
+            continue
+        workers = medians.loc[algorithm].index.get_level_values("workers")
+        if metric == "speedup":
+            ideal = [1, workers.max()]
+        else:
+            ideal = [1, 1]
+        ax.plot([1, workers.max()], ideal, "k--", label="Ideal")
+        for library in libraries(medians.loc[algorithm]):
+            library_medians = medians.loc[(algorithm, library), metric]
+            ax.plot(
+                library_medians.index,
+                library_medians,
+                marker="o",
+                label=LIBRARY_LABELS.get(library, library),
+            )
+        ax.set_ylabel(SCALING_METRICS[metric])
+        ax.set_xlabel("Workers")
+        ax.set_title(title, fontweight="bold")
+        ax.legend(loc="upper left")
+    fig.tight_layout()
+    fig.savefig(spec["name"] + ".png")
 
     if HAS_TIKZ:
-        pass
-        # tikzplotlib.save("subgraph_isomorphism.tex")
+        tikzplotlib.save(spec["name"] + ".tex")
 
 
 def main():
-    isomorphism_graph()
-    creation_time_graph()
-    single_source_graph()
-    single_source_graph_NY()
-    all_pair_graph()
+    frame = results.load_results()
+    summary = summarize(frame)
+    isomorphism_graph(summary)
+    isomorphism_modes_graph(summary)
+    for spec in FIGURES:
+        bar_figure(summary, spec)
+    creation_stages_graph(summary)
+    query_latency_graph(frame)
+    for spec in SCALING_FIGURES:
+        scaling_graph(frame, spec)
 
 
 if __name__ == "__main__":
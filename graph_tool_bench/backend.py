@@ -0,0 +1,110 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import graph_tool.search
+import graph_tool.topology
+
+from bench_common import backend
+from graph_tool_bench import gr_parser
+from graph_tool_bench import graphsdb_parser
+
+
+class _TargetVisitor(graph_tool.search.AStarVisitor):
+    """Stop the A* search once the target is reached"""
+
+    def __init__(self, target):
+        self.target = target
+
+    def examine_vertex(self, u):
+        if int(u) == self.target:
+            raise graph_tool.search.StopSearch()
+
+
+@backend.register
+class GraphToolBackend(backend.Backend):
+    name = "graph-tool"
+    module = "graph_tool"
+    thread_env = "OMP_NUM_THREADS"
+
+    def load_gr(self, path, cache=False, **options):
+        return gr_parser.parse_gr_from_file(path, cache=cache, **options)
+
+    def build_graph(self, edges):
+        return gr_parser.build_graph(edges)
+
+    def num_nodes(self, graph):
+        return graph.num_vertices()
+
+    def num_edges(self, graph):
+        return graph.num_edges()
+
+    def sssp(self, graph, source, target):
+        return graph_tool.topology.shortest_distance(
+            graph,
+            source=source,
+            target=target,
+            weights=graph.edge_properties["weights"],
+        )
+
+    def astar(self, graph, source, target, heuristic):
+        distances, _ = graph_tool.search.astar_search(
+            graph,
+            source,
+            graph.edge_properties["weights"],
+            _TargetVisitor(target),
+            heuristic=lambda node: heuristic(int(node)),
+        )
+        return distances[target]
+
+    def sssp_lengths(self, graph, source):
+        return graph_tool.topology.shortest_distance(
+            graph, source=source, weights=graph.edge_properties["weights"]
+        )
+
+    def apsp(self, graph):
+        return graph_tool.topology.shortest_distance(
+            graph, weights=graph.edge_properties["weights"]
+        )
+
+    def apsp_sources(self, graph, sources):
+        # shortest_distance only takes a single source, every source's
+        # distances are dropped before the next one
+        for source in sources:
+            graph_tool.topology.shortest_distance(
+                graph, source=source, weights=graph.edge_properties["weights"]
+            )
+
+    def distance_matrix(self, graph):
+        # Unweighted like retworkx's digraph_distance_matrix
+        return graph_tool.topology.shortest_distance(graph).get_2d_array(
+            range(graph.num_vertices())
+        )
+
+    def load_graphsdb(self, path, directed=False):
+        return graphsdb_parser.parse_unlabeled_graphdb_from_file(
+            path, directed=directed
+        )
+
+    def build_graphsdb(self, edges, directed=False):
+        return graphsdb_parser.build_graph(edges, directed=directed)
+
+    def subgraph_iso(self, graph, subgraph, induced=True):
+        return graph_tool.topology.subgraph_isomorphism(
+            subgraph, graph, max_n=1, induced=induced
+        )
+
+    def subgraph_embeddings(self, graph, subgraph, induced=True):
+        return graph_tool.topology.subgraph_isomorphism(
+            subgraph, graph, max_n=0, induced=induced
+        )
+
+    def count_subgraph_embeddings(self, graph, subgraph, induced=True):
+        mappings = graph_tool.topology.subgraph_isomorphism(
+            subgraph, graph, max_n=0, induced=induced, generator=True
+        )
+        return sum(1 for _ in mappings)
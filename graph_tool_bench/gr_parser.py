@@ -6,9 +6,10 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import gzip
-
 import graph_tool
+import numpy as np
+
+from bench_common import dimacs
 
 """Parser for graph specification files from the 9th DIMACS challenge
 
@@ -19,48 +20,40 @@ http://users.diag.uniroma1.it/challenge9/format.shtml
 """
 
 
-def parse_gr_from_file(path, directed=True):
-    """Parse a graph specification file and return a retworkx graph object
+def parse_gr_from_file(path, directed=True, cache=False):
+    """Parse a graph specification file and return a graph-tool graph object
 
     :param str path: A path to the graph specification file to parse
     :param bool directed: Whether the returned graph is directed or not
-        if set to True a PyDAG function is returned (with cycle_check set to
-        False so it's a PyDiGraph) to maximize compatibility with functions
-        that predate the PyDiGraph class
+    :param bool cache: If set to True load the edge arrays from the binary
+        cache sidecar (writing it first if it doesn't exist) instead of
+        parsing the text file
 
-    :returns: A retworkx PyGraph or PyDAG object representing the input gr
-        file
+    :returns: A graph-tool Graph object representing the input gr file with
+        the arc weights stored in the ``weights`` edge property
+    """
+    if cache:
+        edges = dimacs.load_gr_arrays(path)
+    else:
+        edges = dimacs.parse_gr_arrays(path)
+    return build_graph(edges, directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build a graph-tool graph object from parsed DIMACS edge arrays
+
+    :param GrEdges edges: The edge arrays returned by
+        :func:`bench_common.dimacs.parse_gr_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: A graph-tool Graph object
     """
     return_graph = graph_tool.Graph(directed=directed)
     edge_weight = return_graph.new_edge_property("double")
     return_graph.edge_properties["weights"] = edge_weight
-    nodes_added = False
-    if path.endswith("gz"):
-        open_call = gzip.open
-    else:
-        open_call = open
-    with open_call(path, "rt") as fd:
-        for line in fd:
-            if line.startswith("c"):
-                continue
-            if line.startswith("p"):
-                num_nodes = int(line.split(" ")[2])
-                return_graph.add_vertex(num_nodes)
-                nodes_added = True
-            elif line.startswith("a"):
-                if not nodes_added:
-                    raise Exception(
-                        "Invalid gr file, program line not first non-comment " "line."
-                    )
-                components = line.split(" ")
-                u = int(components[1]) - 1
-                v = int(components[2]) - 1
-                weight = float(components[3])
-                edge_index = return_graph.add_edge(u, v)
-                edge_weight[edge_index] = weight
-            else:
-                raise Exception(
-                    "Invalid gr file line: '%s' doesn't start with a valid " "token"
-                )
-
+    return_graph.add_vertex(edges.num_nodes)
+    return_graph.add_edge_list(
+        np.column_stack((edges.sources, edges.targets, edges.weights)),
+        eprops=[edge_weight],
+    )
     return return_graph
@@ -6,9 +6,10 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import struct
-
 import graph_tool
+import numpy as np
+
+from bench_common import graphsdb
 
 """Parser for graph file format from ARG Databse
 
@@ -31,15 +32,20 @@ def parse_unlabeled_graphdb_from_file(path, directed=True):
     :returns: A retworkx PyGraph or PyDAG object representing the input gr
         file
     """
+    return build_graph(graphsdb.parse_arg_arrays(path), directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build a graph-tool graph object from parsed ARG edge arrays
+
+    :param ArgEdges edges: The edge arrays returned by
+        :func:`bench_common.graphsdb.parse_arg_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: A graph-tool Graph object, an edge listed from both endpoints
+        is added twice
+    """
     graph = graph_tool.Graph(directed=directed)
-    with open(path, "rb") as graph_file:
-        data = graph_file.read(2)
-        num_nodes = struct.unpack("<H", data)[0]
-        graph.add_vertex(num_nodes)
-        for i in range(num_nodes):
-            raw_edge_count = graph_file.read(2)
-            edge_count = struct.unpack_from("<H", raw_edge_count)[0]
-            for j in range(edge_count):
-                edge_target = struct.unpack_from("<H", graph_file.read(2))[0]
-                graph.add_edge(i, edge_target)
+    graph.add_vertex(edges.num_nodes)
+    graph.add_edge_list(np.column_stack((edges.sources, edges.targets)))
     return graph
@@ -0,0 +1,81 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+
+from bench_common import backend
+from igraph_bench import gr_parser
+from igraph_bench import graphsdb_parser
+
+
+@backend.register
+class IgraphBackend(backend.Backend):
+    name = "igraph"
+    module = "igraph"
+    creation_variants = {"Creation (from_networkx)": {"legacy": True}}
+
+    def load_gr(self, path, cache=False, **options):
+        return gr_parser.parse_gr_from_file(path, cache=cache, **options)
+
+    def build_graph(self, edges):
+        return gr_parser.build_graph(edges)
+
+    def num_nodes(self, graph):
+        return graph.vcount()
+
+    def num_edges(self, graph):
+        return graph.ecount()
+
+    def sssp(self, graph, source, target):
+        return graph.distances(source, target, weights="weight")
+
+    def astar(self, graph, source, target, heuristic):
+        return graph.get_shortest_path_astar(
+            source,
+            target,
+            lambda _, node, __: heuristic(node),
+            weights="weight",
+        )
+
+    def sssp_lengths(self, graph, source):
+        return graph.distances(source=source, weights="weight")
+
+    def apsp(self, graph):
+        return graph.distances(weights="weight")
+
+    def apsp_sources(self, graph, sources):
+        return graph.distances(source=sources, weights="weight")
+
+    def distance_matrix(self, graph):
+        return np.array(graph.distances())
+
+    def load_graphsdb(self, path, directed=False):
+        return graphsdb_parser.parse_unlabeled_graphdb_from_file(
+            path, directed=directed
+        )
+
+    def build_graphsdb(self, edges, directed=False):
+        return graphsdb_parser.build_graph(edges, directed=directed)
+
+    # igraph's VF2 only matches monomorphisms, induced subgraphs are matched
+    # with LAD instead
+    def subgraph_iso(self, graph, subgraph, induced=True):
+        if induced:
+            return graph.subisomorphic_lad(subgraph, induced=True)
+        return graph.subisomorphic_vf2(subgraph)
+
+    def subgraph_embeddings(self, graph, subgraph, induced=True):
+        if induced:
+            return graph.get_subisomorphisms_lad(subgraph, induced=True)
+        return graph.get_subisomorphisms_vf2(subgraph)
+
+    def count_subgraph_embeddings(self, graph, subgraph, induced=True):
+        if induced:
+            # LAD has no counting call
+            return len(graph.get_subisomorphisms_lad(subgraph, induced=True))
+        return graph.count_subisomorphisms_vf2(subgraph)
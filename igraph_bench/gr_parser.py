@@ -6,10 +6,9 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import gzip
-
 import igraph
-import networkx
+
+from bench_common import dimacs
 
 """Parser for graph specification files from the 9th DIMACS challenge
 
@@ -20,46 +19,68 @@ http://users.diag.uniroma1.it/challenge9/format.shtml
 """
 
 
-def parse_gr_from_file(path, directed=True):
-    """Parse a graph specification file and return a retworkx graph object
+def parse_gr_from_file(path, directed=True, cache=False, legacy=False):
+    """Parse a graph specification file and return an igraph graph object
 
     :param str path: A path to the graph specification file to parse
     :param bool directed: Whether the returned graph is directed or not
-        if set to True a DiGraph is returned
+    :param bool cache: If set to True load the edge arrays from the binary
+        cache sidecar (writing it first if it doesn't exist) instead of
+        parsing the text file
+    :param bool legacy: If set to True build an intermediate NetworkX graph
+        and convert it with ``igraph.Graph.from_networkx`` instead of
+        constructing the igraph graph directly. This is only useful to
+        compare against the original benchmark methodology.
 
-    :returns: A retworkx Graph or DiGraph object representing the input gr
-        file
+    :returns: An igraph Graph object representing the input gr file with
+        the arc weights stored in the ``weight`` edge attribute
     """
-    if not directed:
-        return_graph = networkx.Graph()
+    if cache:
+        edges = dimacs.load_gr_arrays(path)
     else:
-        return_graph = networkx.DiGraph()
+        edges = dimacs.parse_gr_arrays(path)
+    if legacy:
+        return build_graph_from_networkx(edges, directed=directed)
+    return build_graph(edges, directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build an igraph graph object from parsed DIMACS edge arrays
+
+    :param GrEdges edges: The edge arrays returned by
+        :func:`bench_common.dimacs.parse_gr_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: An igraph Graph object
+    """
+    return igraph.Graph(
+        n=edges.num_nodes,
+        edges=list(zip(edges.sources.tolist(), edges.targets.tolist())),
+        directed=directed,
+        edge_attrs={"weight": edges.weights.tolist()},
+    )
 
-    nodes_added = False
-    if path.endswith("gz"):
-        open_call = gzip.open
+
+def build_graph_from_networkx(edges, directed=True):
+    """Build an igraph graph object through an intermediate NetworkX graph
+
+    This is the legacy construction path which roughly doubles peak memory
+    usage, it is only kept to compare against :func:`build_graph`.
+
+    :param GrEdges edges: The edge arrays returned by
+        :func:`bench_common.dimacs.parse_gr_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: An igraph Graph object
+    """
+    import networkx
+
+    if not directed:
+        nx_graph = networkx.Graph()
     else:
-        open_call = open
-    with open_call(path, "rt") as fd:
-        for line in fd:
-            if line.startswith("c"):
-                continue
-            if line.startswith("p"):
-                num_nodes = int(line.split(" ")[2])
-                return_graph.add_nodes_from(range(num_nodes))
-                nodes_added = True
-            elif line.startswith("a"):
-                if not nodes_added:
-                    raise Exception(
-                        "Invalid gr file, program line not first non-comment " "line."
-                    )
-                components = line.split(" ")
-                u = int(components[1]) - 1
-                v = int(components[2]) - 1
-                weight = float(components[3])
-                return_graph.add_edge(u, v, weight=weight)
-            else:
-                raise Exception(
-                    "Invalid gr file line: '%s' doesn't start with a valid " "token"
-                )
-    return igraph.Graph.from_networkx(return_graph)
+        nx_graph = networkx.DiGraph()
+    nx_graph.add_nodes_from(range(edges.num_nodes))
+    nx_graph.add_weighted_edges_from(
+        zip(edges.sources.tolist(), edges.targets.tolist(), edges.weights.tolist())
+    )
+    return igraph.Graph.from_networkx(nx_graph)
@@ -6,10 +6,10 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import struct
-
 import igraph
-import networkx
+import numpy as np
+
+from bench_common import graphsdb
 
 """Parser for graph file format from ARG Databse
 
@@ -21,30 +21,28 @@ https://mivia.unisa.it/datasets/graph-database/arg-database/
 
 
 def parse_unlabeled_graphdb_from_file(path, directed=True):
-    """Parse a graph specification file and return a retworkx graph object
+    """Parse a graph specification file and return an igraph graph object
 
     :param str path: A path to the graph specification file to parse
     :param bool directed: Whether the returned graph is directed or not
-        if set to True a PyDAG function is returned (with cycle_check set to
-        False so it's a PyDiGraph) to maximize compatibility with functions
-        that predate the PyDiGraph class
 
-    :returns: A retworkx PyGraph or PyDAG object representing the input gr
-        file
+    :returns: An igraph Graph object representing the input graph file
+    """
+    return build_graph(graphsdb.parse_arg_arrays(path), directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build an igraph graph object from parsed ARG edge arrays
+
+    :param ArgEdges edges: The edge arrays returned by
+        :func:`bench_common.graphsdb.parse_arg_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: An igraph Graph object
     """
+    pairs = np.column_stack((edges.sources, edges.targets))
     if not directed:
-        graph = networkx.Graph()
-    else:
-        graph = networkx.DiGraph()
-
-    with open(path, "rb") as graph_file:
-        data = graph_file.read(2)
-        num_nodes = struct.unpack("<H", data)[0]
-        graph.add_nodes_from(list(range(num_nodes)))
-        for i in range(num_nodes):
-            raw_edge_count = graph_file.read(2)
-            edge_count = struct.unpack_from("<H", raw_edge_count)[0]
-            for j in range(edge_count):
-                edge_target = struct.unpack_from("<H", graph_file.read(2))[0]
-                graph.add_edge(i, edge_target)
-    return igraph.Graph.from_networkx(graph)
+        # An undirected edge may be listed from both endpoints, collapse them
+        # like the NetworkX graph this used to be converted from did
+        pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    return igraph.Graph(n=edges.num_nodes, edges=pairs.tolist(), directed=directed)
@@ -0,0 +1,84 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import networkx
+
+from bench_common import backend
+from networkx_bench import gr_parser
+from networkx_bench import graphsdb_parser
+
+
+@backend.register
+class NetworkxBackend(backend.Backend):
+    name = "networkx"
+    module = "networkx"
+
+    def load_gr(self, path, cache=False, **options):
+        return gr_parser.parse_gr_from_file(path, cache=cache, **options)
+
+    def build_graph(self, edges):
+        return gr_parser.build_graph(edges)
+
+    def num_nodes(self, graph):
+        return graph.number_of_nodes()
+
+    def num_edges(self, graph):
+        return graph.number_of_edges()
+
+    def sssp(self, graph, source, target):
+        return networkx.dijkstra_path_length(graph, source, target)
+
+    def bidirectional_sssp(self, graph, source, target):
+        return networkx.bidirectional_dijkstra(graph, source, target)[0]
+
+    def astar(self, graph, source, target, heuristic):
+        return networkx.astar_path_length(
+            graph, source, target, heuristic=lambda node, _: heuristic(node)
+        )
+
+    def sssp_lengths(self, graph, source):
+        return networkx.single_source_dijkstra_path_length(graph, source)
+
+    def apsp(self, graph):
+        return dict(networkx.all_pairs_dijkstra_path_length(graph))
+
+    def apsp_sources(self, graph, sources):
+        return {
+            source: networkx.single_source_dijkstra_path_length(graph, source)
+            for source in sources
+        }
+
+    def distance_matrix(self, graph):
+        # Unweighted like retworkx's digraph_distance_matrix
+        return networkx.floyd_warshall_numpy(graph, weight=None)
+
+    def load_graphsdb(self, path, directed=False):
+        return graphsdb_parser.parse_unlabeled_graphdb_from_file(
+            path, directed=directed
+        )
+
+    def build_graphsdb(self, edges, directed=False):
+        return graphsdb_parser.build_graph(edges, directed=directed)
+
+    def subgraph_iso(self, graph, subgraph, induced=True):
+        matcher = networkx.algorithms.isomorphism.GraphMatcher(graph, subgraph)
+        if induced:
+            return matcher.subgraph_is_isomorphic()
+        return matcher.subgraph_is_monomorphic()
+
+    def _embeddings_iter(self, graph, subgraph, induced):
+        matcher = networkx.algorithms.isomorphism.GraphMatcher(graph, subgraph)
+        if induced:
+            return matcher.subgraph_isomorphisms_iter()
+        return matcher.subgraph_monomorphisms_iter()
+
+    def subgraph_embeddings(self, graph, subgraph, induced=True):
+        return list(self._embeddings_iter(graph, subgraph, induced))
+
+    def count_subgraph_embeddings(self, graph, subgraph, induced=True):
+        return sum(1 for _ in self._embeddings_iter(graph, subgraph, induced))
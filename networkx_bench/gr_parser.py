@@ -6,10 +6,10 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import gzip
-
 import networkx
 
+from bench_common import dimacs
+
 """Parser for graph specification files from the 9th DIMACS challenge
 
 This module contains tools for parsing the graph specification files from
@@ -19,47 +19,41 @@ http://users.diag.uniroma1.it/challenge9/format.shtml
 """
 
 
-def parse_gr_from_file(path, directed=True):
-    """Parse a graph specification file and return a retworkx graph object
+def parse_gr_from_file(path, directed=True, cache=False):
+    """Parse a graph specification file and return a networkx graph object
 
     :param str path: A path to the graph specification file to parse
     :param bool directed: Whether the returned graph is directed or not
         if set to True a DiGraph is returned
+    :param bool cache: If set to True load the edge arrays from the binary
+        cache sidecar (writing it first if it doesn't exist) instead of
+        parsing the text file
 
-    :returns: A retworkx Graph or DiGraph object representing the input gr
+    :returns: A networkx Graph or DiGraph object representing the input gr
         file
     """
+    if cache:
+        edges = dimacs.load_gr_arrays(path)
+    else:
+        edges = dimacs.parse_gr_arrays(path)
+    return build_graph(edges, directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build a networkx graph object from parsed DIMACS edge arrays
+
+    :param GrEdges edges: The edge arrays returned by
+        :func:`bench_common.dimacs.parse_gr_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: A networkx Graph or DiGraph object
+    """
     if not directed:
         return_graph = networkx.Graph()
     else:
         return_graph = networkx.DiGraph()
-
-    nodes_added = False
-    if path.endswith("gz"):
-        open_call = gzip.open
-    else:
-        open_call = open
-    with open_call(path, "rt") as fd:
-        for line in fd:
-            if line.startswith("c"):
-                continue
-            if line.startswith("p"):
-                num_nodes = int(line.split(" ")[2])
-                return_graph.add_nodes_from(range(num_nodes))
-                nodes_added = True
-            elif line.startswith("a"):
-                if not nodes_added:
-                    raise Exception(
-                        "Invalid gr file, program line not first non-comment " "line."
-                    )
-                components = line.split(" ")
-                u = int(components[1]) - 1
-                v = int(components[2]) - 1
-                weight = float(components[3])
-                return_graph.add_edge(u, v, weight=weight)
-            else:
-                raise Exception(
-                    "Invalid gr file line: '%s' doesn't start with a valid " "token"
-                )
-
+    return_graph.add_nodes_from(range(edges.num_nodes))
+    return_graph.add_weighted_edges_from(
+        zip(edges.sources.tolist(), edges.targets.tolist(), edges.weights.tolist())
+    )
     return return_graph
@@ -6,10 +6,10 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import struct
-
 import networkx
 
+from bench_common import graphsdb
+
 """Parser for graph file format from ARG Databse
 
 This module contains tools for parsing the graph specification files from
@@ -31,19 +31,22 @@ def parse_unlabeled_graphdb_from_file(path, directed=True):
     :returns: A retworkx PyGraph or PyDAG object representing the input gr
         file
     """
+    return build_graph(graphsdb.parse_arg_arrays(path), directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build a NetworkX graph object from parsed ARG edge arrays
+
+    :param ArgEdges edges: The edge arrays returned by
+        :func:`bench_common.graphsdb.parse_arg_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: A NetworkX Graph or DiGraph object
+    """
     if not directed:
         graph = networkx.Graph()
     else:
         graph = networkx.DiGraph()
-
-    with open(path, "rb") as graph_file:
-        data = graph_file.read(2)
-        num_nodes = struct.unpack("<H", data)[0]
-        graph.add_nodes_from(list(range(num_nodes)))
-        for i in range(num_nodes):
-            raw_edge_count = graph_file.read(2)
-            edge_count = struct.unpack_from("<H", raw_edge_count)[0]
-            for j in range(edge_count):
-                edge_target = struct.unpack_from("<H", graph_file.read(2))[0]
-                graph.add_edge(i, edge_target)
+    graph.add_nodes_from(list(range(edges.num_nodes)))
+    graph.add_edges_from(zip(edges.sources.tolist(), edges.targets.tolist()))
     return graph
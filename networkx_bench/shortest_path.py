@@ -6,49 +6,13 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import csv
 import sys
-import time
 
-import networkx
-
-import gr_parser
-
-# 126GB
-MEM_SIZE = 1.26 * 10 ** 11
+from bench_common import driver
 
 
 def main():
-    path = sys.argv[1]
-    creation = []
-    for _ in range(5):
-        start = time.time()
-        graph = gr_parser.parse_gr_from_file(path)
-        stop = time.time()
-        creation.append(stop - start)
-    end_node = len(graph) - 1
-    print("staring single source")
-    single_source_shortest_path = []
-    for _ in range(5):
-        start = time.time()
-        networkx.dijkstra_path_length(graph, 0, end_node)
-        stop = time.time()
-        single_source_shortest_path.append(stop - start)
-    all_pairs = []
-    if len(graph) < 100000:
-        print("all pairs")
-        for i in range(5):
-            start = time.time()
-            dict(networkx.all_pairs_dijkstra_path_length(graph))
-            stop = time.time()
-            all_pairs.append(stop - start)
-    filename = ".".join(path.split("/")[-1].split(".")[0:2])
-    with open(f"networkx_{filename}.csv", "w") as csvfile:
-        csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(["Creation"] + creation)
-        csv_writer.writerow(["Single Source"] + single_source_shortest_path)
-        if all_pairs:
-            csv_writer.writerow(["All Pairs Shortest Path Length"] + all_pairs)
+    driver.main(["networkx", "shortest_path"] + sys.argv[1:])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import retworkx
+
+from bench_common import backend
+from retworkx_bench import gr_parser
+from retworkx_bench import graphsdb_parser
+
+
+@backend.register
+class RetworkxBackend(backend.Backend):
+    name = "retworkx"
+    module = "retworkx"
+    thread_env = "RAYON_NUM_THREADS"
+
+    def load_gr(self, path, cache=False, **options):
+        return gr_parser.parse_gr_from_file(path, cache=cache, **options)
+
+    def build_graph(self, edges):
+        return gr_parser.build_graph(edges)
+
+    def num_nodes(self, graph):
+        return len(graph)
+
+    def num_edges(self, graph):
+        return graph.num_edges()
+
+    def sssp(self, graph, source, target):
+        return retworkx.digraph_dijkstra_shortest_path_lengths(
+            graph, source, goal=target, edge_cost_fn=lambda x: x
+        )
+
+    def astar(self, graph, source, target, heuristic):
+        # The node payloads are the node indices
+        return retworkx.digraph_astar_shortest_path(
+            graph, source, lambda node: node == target, lambda x: x, heuristic
+        )
+
+    def sssp_lengths(self, graph, source):
+        return retworkx.digraph_dijkstra_shortest_path_lengths(
+            graph, source, edge_cost_fn=lambda x: x
+        )
+
+    def apsp(self, graph):
+        return retworkx.digraph_all_pairs_dijkstra_path_lengths(graph, float)
+
+    def distance_matrix(self, graph):
+        return retworkx.digraph_distance_matrix(graph)
+
+    def load_graphsdb(self, path, directed=False):
+        return graphsdb_parser.parse_unlabeled_graphdb_from_file(
+            path, directed=directed
+        )
+
+    def build_graphsdb(self, edges, directed=False):
+        return graphsdb_parser.build_graph(edges, directed=directed)
+
+    def subgraph_iso(self, graph, subgraph, induced=True):
+        return retworkx.graph_is_subgraph_isomorphic(graph, subgraph, induced=induced)
+
+    def subgraph_embeddings(self, graph, subgraph, induced=True):
+        return list(
+            retworkx.graph_vf2_mapping(graph, subgraph, subgraph=True, induced=induced)
+        )
+
+    def count_subgraph_embeddings(self, graph, subgraph, induced=True):
+        mappings = retworkx.graph_vf2_mapping(
+            graph, subgraph, subgraph=True, induced=induced
+        )
+        return sum(1 for _ in mappings)
@@ -6,10 +6,10 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import gzip
-
 import retworkx
 
+from bench_common import dimacs
+
 """Parser for graph specification files from the 9th DIMACS challenge
 
 This module contains tools for parsing the graph specification files from
@@ -19,7 +19,7 @@ http://users.diag.uniroma1.it/challenge9/format.shtml
 """
 
 
-def parse_gr_from_file(path, directed=True):
+def parse_gr_from_file(path, directed=True, cache=False):
     """Parse a graph specification file and return a retworkx graph object
 
     :param str path: A path to the graph specification file to parse
@@ -27,42 +27,37 @@ def parse_gr_from_file(path, directed=True):
         if set to True a PyDAG function is returned (with cycle_check set to
         False so it's a PyDiGraph) to maximize compatibility with functions
         that predate the PyDiGraph class
+    :param bool cache: If set to True load the edge arrays from the binary
+        cache sidecar (writing it first if it doesn't exist) instead of
+        parsing the text file
 
     :returns: A retworkx PyGraph or PyDAG object representing the input gr
         file
     """
+    if cache:
+        edges = dimacs.load_gr_arrays(path)
+    else:
+        edges = dimacs.parse_gr_arrays(path)
+    return build_graph(edges, directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build a retworkx graph object from parsed DIMACS edge arrays
+
+    :param GrEdges edges: The edge arrays returned by
+        :func:`bench_common.dimacs.parse_gr_arrays`
+    :param bool directed: Whether the returned graph is directed or not
+
+    :returns: A retworkx PyGraph or PyDiGraph object
+    """
     if not directed:
         return_graph = retworkx.PyGraph()
     else:
         return_graph = retworkx.PyDiGraph()
-
-    nodes_added = False
-    if path.endswith("gz"):
-        open_call = gzip.open
-    else:
-        open_call = open
-    with open_call(path, "rt") as fd:
-        for line in fd:
-            if line.startswith("c"):
-                continue
-            if line.startswith("p"):
-                num_nodes = int(line.split(" ")[2])
-                for i in range(num_nodes):
-                    return_graph.add_node(i)
-                nodes_added = True
-            elif line.startswith("a"):
-                if not nodes_added:
-                    raise Exception(
-                        "Invalid gr file, program line not first non-comment " "line."
-                    )
-                components = line.split(" ")
-                u = int(components[1]) - 1
-                v = int(components[2]) - 1
-                weight = float(components[3])
-                return_graph.add_edge(u, v, weight)
-            else:
-                raise Exception(
-                    "Invalid gr file line: '%s' doesn't start with a valid " "token"
-                )
-
+    return_graph.add_nodes_from(range(edges.num_nodes))
+    return_graph.extend_from_weighted_edge_list(
+        list(
+            zip(edges.sources.tolist(), edges.targets.tolist(), edges.weights.tolist())
+        )
+    )
     return return_graph
@@ -6,59 +6,13 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-import csv
 import sys
-import time
 
-import retworkx
-
-import gr_parser
-
-# 126GB
-MEM_SIZE = 1.26 * 10 ** 11
+from bench_common import driver
 
 
 def main():
-    path = sys.argv[1]
-    creation = []
-    for _ in range(5):
-        start = time.time()
-        graph = gr_parser.parse_gr_from_file(path)
-        stop = time.time()
-        creation.append(stop - start)
-    end_node = len(graph) - 1
-    print("staring single source")
-    single_source_shortest_path = []
-    for _ in range(5):
-        start = time.time()
-        retworkx.digraph_dijkstra_shortest_path_lengths(
-            graph, 0, goal=end_node, edge_cost_fn=lambda x: x
-        )
-        stop = time.time()
-        single_source_shortest_path.append(stop - start)
-    all_pairs = []
-    if len(graph) < 100000:
-        print("all pairs")
-        for i in range(5):
-            start = time.time()
-            retworkx.digraph_all_pairs_dijkstra_path_lengths(graph, float)
-            stop = time.time()
-            all_pairs.append(stop - start)
-    distance_matrix = []
-    if float(len(graph)) ** 2 * 64 < MEM_SIZE:
-        print("running_distance_matrix")
-        for i in range(5):
-            start = time.time()
-            retworkx.digraph_distance_matrix(graph)
-            stop = time.time()
-            distance_matrix.append(stop - start)
-    filename = ".".join(path.split("/")[-1].split(".")[0:2])
-    with open(f"retworkx_{filename}.csv", "w") as csvfile:
-        csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(["Creation"] + creation)
-        csv_writer.writerow(["Single Source"] + single_source_shortest_path)
-        if all_pairs:
-            csv_writer.writerow(["All Pairs Shortest Path Length"] + all_pairs)
+    driver.main(["retworkx", "shortest_path"] + sys.argv[1:])
 
 
 if __name__ == "__main__":
@@ -1,7 +1,10 @@
 #!/bin/bash
 
+# The per library benchmark scripts share the parsing code in bench_common
+export PYTHONPATH="$(pwd)${PYTHONPATH:+:$PYTHONPATH}"
+
 # Download shortest path data sets from 9th dimacs challenge
-mkdir -p dimacs_9/distance dimacs_9/time
+mkdir -p dimacs_9/distance dimacs_9/time dimacs_9/coordinates
 pushd dimacs_9
 # Challenge benchmark
 wget http://www.dis.uniroma1.it/%7echallenge9/temp/USA-road-1.USA.gr.gz
@@ -14,6 +17,11 @@ pushd time
 wget http://users.diag.uniroma1.it/challenge9/data/USA-road-t/USA-road-t.USA.gr.gz
 wget http://users.diag.uniroma1.it/challenge9/data/USA-road-t/USA-road-t.NY.gr.gz
 popd
+# Node coordinates for the A* heuristic, shared by the distance and time graphs
+pushd coordinates
+wget http://users.diag.uniroma1.it/challenge9/data/USA-road-d/USA-road-d.USA.co.gz
+wget http://users.diag.uniroma1.it/challenge9/data/USA-road-d/USA-road-d.NY.co.gz
+popd
 popd
 mkdir arg_db
 pushd arg_db
@@ -25,42 +33,22 @@ for i in `ls *zip` ; do
 done
 popd
 popd
-# Build venvs
+# Build venvs, isal is optional and speeds up decompressing the .gr.gz files
 virtualenv retworkx_venv
-retworkx_venv/bin/pip install -U retworkx
+retworkx_venv/bin/pip install -U retworkx numpy isal
 virtualenv networkx_venv
-networkx_venv/bin/pip install -U networkx
+networkx_venv/bin/pip install -U networkx numpy isal
 virtualenv igraph_venv
-igraph_venv/bin/pip install -U python-igraph networkx
+igraph_venv/bin/pip install -U python-igraph networkx numpy isal
+virtualenv scipy_venv
+scipy_venv/bin/pip install -U scipy numpy isal
 
-echo "Shortest path benchmarks"
-echo "Running retworkx benchmarks"
-for gr_file in dimacs_9/USA-road-1.USA.gr.gz dimacs_9/distance/USA-road-d.USA.gr.gz dimacs_9/distance/USA-road-d.NY.gr.gz dimacs_9/time/USA-road-t.USA.gr.gz dimacs_9/time/USA-road-t.NY.gr.gz dimacs_9/distance/rome99.gr; do
-    retworkx_venv/bin/python retworkx_bench/shortest_path.py $gr_file
-done
-echo "Running NetworkX benchmarks"
-for gr_file in dimacs_9/USA-road-1.USA.gr.gz dimacs_9/distance/USA-road-d.USA.gr.gz dimacs_9/distance/USA-road-d.NY.gr.gz dimacs_9/time/USA-road-t.USA.gr.gz dimacs_9/time/USA-road-t.NY.gr.gz dimacs_9/distance/rome99.gr; do
-    networkx_venv/bin/python networkx_bench/shortest_path.py $gr_file
-done
-echo "Running igraph benchmarks"
-for gr_file in dimacs_9/USA-road-1.USA.gr.gz dimacs_9/distance/USA-road-d.USA.gr.gz dimacs_9/distance/USA-road-d.NY.gr.gz dimacs_9/time/USA-road-t.USA.gr.gz dimacs_9/time/USA-road-t.NY.gr.gz dimacs_9/distance/rome99.gr; do
-    igraph_venv/bin/python igraph_bench/shortest_path.py $gr_file
-done
-echo "Running graph-tool benchmarks"
-for gr_file in dimacs_9/USA-road-1.USA.gr.gz dimacs_9/distance/USA-road-d.USA.gr.gz dimacs_9/distance/USA-road-d.NY.gr.gz dimacs_9/time/USA-road-t.USA.gr.gz dimacs_9/time/USA-road-t.NY.gr.gz dimacs_9/distance/rome99.gr; do
-    python graph_tool_bench/shortest_path.py $gr_file
-done
-echo "Isomorphism benchmarks"
-echo "Running retworkx benchmarks"
-retworkx_venv/bin/python retworkx_bench/isomorphism.py arg_db/graphsdb
-echo "Running NetworkX benchmarks"
-networkx_venv/bin/python networkx_bench/isomorphism.py arg_db/graphsdb
-echo "Running igraph benchmarks"
-igraph_venv/bin/python igraph_bench/isomorphism.py arg_db/graphsdb
-echo "Running graph-tool benchmarks"
-python graph_tool_bench/isomorphism.py arg_db/graphsdb
+# Run the shortest path and isomorphism benchmarks for every library in
+# parallel, each job still runs with its library's venv interpreter. Jobs whose
+# results in results/ are newer than their inputs are skipped, pass --force to
+# rerun them.
+python -m bench_common.orchestrator --output-dir results "$@"
 
 # Process results
-mv *csv results/
 pushd results
 python ../graph_results.py
@@ -0,0 +1,73 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Plain compressed sparse row reference backend using scipy.sparse.csgraph
+
+There is no graph object here, the graph is a ``scipy.sparse.csr_matrix``
+built straight from the parsed arrays. It's the memory and cache friendly
+reference point for the graph libraries. csgraph has no subgraph
+isomorphism so only the shortest path benchmarks run.
+"""
+
+import numpy as np
+from scipy.sparse import csgraph
+
+from bench_common import backend
+from scipy_bench import gr_parser
+
+
+@backend.register
+class ScipyBackend(backend.Backend):
+    name = "scipy"
+    module = "scipy"
+
+    def load_gr(self, path, cache=False, **options):
+        return gr_parser.parse_gr_from_file(path, cache=cache, **options)
+
+    def build_graph(self, edges):
+        return gr_parser.build_graph(edges)
+
+    def num_nodes(self, graph):
+        return graph.shape[0]
+
+    def num_edges(self, graph):
+        # The arcs in the file, the matrix only keeps the lightest of
+        # parallel arcs
+        return graph.num_arcs
+
+    def sssp(self, graph, source, target):
+        # csgraph's dijkstra has no target to stop at
+        return csgraph.dijkstra(graph, indices=source)[target]
+
+    def sssp_lengths(self, graph, source):
+        return csgraph.dijkstra(graph, indices=source)
+
+    def apsp(self, graph):
+        return csgraph.johnson(graph)
+
+    def apsp_sources(self, graph, sources):
+        return csgraph.dijkstra(graph, indices=np.asarray(sources))
+
+    def distance_matrix(self, graph):
+        return csgraph.shortest_path(graph, method="D", unweighted=True)
+
+    def extra_phases(self, graph):
+        target = graph.shape[0] - 1
+        # Stopping at the target's distance only settles the nodes closer
+        # than it, which is as close as csgraph gets to a targeted search
+        limit = csgraph.dijkstra(graph, indices=0)[target]
+        return [
+            (
+                "Single Source (limited)",
+                lambda: csgraph.dijkstra(graph, indices=0, limit=limit)[target],
+            ),
+            (
+                "All Pairs Shortest Path Length (Floyd-Warshall)",
+                lambda: csgraph.floyd_warshall(graph),
+            ),
+        ]
@@ -0,0 +1,88 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import numpy as np
+import scipy.sparse
+
+from bench_common import dimacs
+
+"""Parser for graph specification files from the 9th DIMACS challenge
+
+This module contains tools for parsing the graph specification files from
+the 9th DIMACS challenge which are documented here:
+
+http://users.diag.uniroma1.it/challenge9/format.shtml
+"""
+
+
+def parse_gr_from_file(path, directed=True, cache=False):
+    """Parse a graph specification file and return a CSR adjacency matrix
+
+    :param str path: A path to the graph specification file to parse
+    :param bool directed: Whether every arc is also added in the reverse
+        direction. The ``scipy.sparse.csgraph`` functions also take a
+        ``directed`` argument, this is only needed to compare against
+        libraries building an undirected graph.
+    :param bool cache: If set to True load the edge arrays from the binary
+        cache sidecar (writing it first if it doesn't exist) instead of
+        parsing the text file
+
+    :returns: A ``scipy.sparse.csr_matrix`` with the arc weights as values
+    """
+    if cache:
+        edges = dimacs.load_gr_arrays(path)
+    else:
+        edges = dimacs.parse_gr_arrays(path)
+    return build_graph(edges, directed=directed)
+
+
+def build_graph(edges, directed=True):
+    """Build a CSR adjacency matrix from parsed DIMACS edge arrays
+
+    The matrix is assembled directly from the arrays instead of going
+    through ``scipy.sparse.coo_matrix`` because converting from COO sums the
+    weights of parallel arcs, here only the lightest one is kept. Zero
+    weight arcs are kept as explicit zeros which ``scipy.sparse.csgraph``
+    treats as edges. The matrix keeps the number of arcs in the file, with
+    the parallel ones, as ``num_arcs`` so its graph size compares with the
+    other libraries'.
+
+    :param GrEdges edges: The edge arrays returned by
+        :func:`bench_common.dimacs.parse_gr_arrays`
+    :param bool directed: Whether the returned matrix is directed or not
+
+    :returns: A ``scipy.sparse.csr_matrix``
+    """
+    sources = edges.sources
+    targets = edges.targets
+    weights = edges.weights
+    if not directed:
+        sources, targets = (
+            np.concatenate((sources, targets)),
+            np.concatenate((targets, sources)),
+        )
+        weights = np.concatenate((weights, weights))
+    # Sort by source then target then weight so the first arc of every
+    # (source, target) run is the lightest
+    order = np.lexsort((weights, targets, sources))
+    sources = sources[order]
+    targets = targets[order]
+    weights = weights[order]
+    keep = np.ones(len(sources), dtype=bool)
+    keep[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+    sources = sources[keep]
+    indptr = np.zeros(edges.num_nodes + 1, dtype=np.int32)
+    np.cumsum(
+        np.bincount(sources, minlength=edges.num_nodes), out=indptr[1:]
+    )
+    matrix = scipy.sparse.csr_matrix(
+        (weights[keep], targets[keep], indptr),
+        shape=(edges.num_nodes, edges.num_nodes),
+    )
+    matrix.num_arcs = len(edges.sources)
+    return matrix
@@ -0,0 +1,19 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+import sys
+
+from bench_common import driver
+
+
+def main():
+    driver.main(["scipy", "shortest_path"] + sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
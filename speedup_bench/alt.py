@@ -0,0 +1,143 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""ALT: A* search with landmarks and the triangle inequality
+
+Preprocessing picks landmarks spread over the graph and stores the shortest
+path lengths from and to every landmark, computed with
+``scipy.sparse.csgraph.dijkstra``. For any landmark ``L`` the triangle
+inequality gives the lower bounds ``d(L, t) - d(L, v)`` and
+``d(v, L) - d(t, L)`` of ``d(v, t)``, a query runs A* with the best of them
+over the landmarks that bound the query's source and target the tightest.
+"""
+
+import array
+import heapq
+import math
+
+import numpy as np
+from scipy.sparse import csgraph
+
+# The number of landmarks whose bounds are used for a query
+ACTIVE_LANDMARKS = 4
+
+
+def _to_array(lengths):
+    # Unreachable nodes get an infinite bound which A* never expands past
+    return array.array("d", lengths.tolist())
+
+
+class AltIndex:
+    """Landmark distances for A* lower bounds
+
+    :param matrix: The graph as a ``scipy.sparse.csr_matrix``
+    :param int num_landmarks: The number of landmarks
+    :param int seed: The node the farthest landmark selection starts from
+    """
+
+    def __init__(self, matrix, num_landmarks, seed=0):
+        num_nodes = matrix.shape[0]
+        transposed = matrix.T.tocsr()
+        self.landmarks = []
+        self.from_landmark = []
+        self.to_landmark = []
+        # Farthest selection: every landmark is the node with the largest
+        # summed length from the landmarks already picked
+        spread = np.zeros(num_nodes)
+        landmark = seed
+        for _ in range(min(num_landmarks, num_nodes)):
+            forward = csgraph.dijkstra(matrix, indices=landmark)
+            backward = csgraph.dijkstra(transposed, indices=landmark)
+            self.landmarks.append(landmark)
+            self.from_landmark.append(_to_array(forward))
+            self.to_landmark.append(_to_array(backward))
+            reachable = np.isfinite(forward)
+            distance = np.where(reachable, forward, 0.0)
+            spread = np.where(reachable, spread + distance, spread)
+            spread[self.landmarks] = -1
+            landmark = int(np.argmax(spread))
+
+    def nbytes(self):
+        """The memory of the landmark distances in bytes"""
+        return sum(
+            lengths.itemsize * len(lengths)
+            for lengths in self.from_landmark + self.to_landmark
+        )
+
+    def heuristic(self, source, target):
+        """Return the landmark lower bound function for a query
+
+        :param int source: The query's source node
+        :param int target: The query's target node
+
+        :returns: A function taking a node and returning a lower bound of
+            its shortest path length to ``target``
+        """
+        bounds = []
+        for from_lengths, to_lengths in zip(self.from_landmark, self.to_landmark):
+            bound = max(
+                from_lengths[target] - from_lengths[source],
+                to_lengths[source] - to_lengths[target],
+            )
+            if math.isnan(bound):
+                # The landmark reaches neither end of the query
+                bound = -math.inf
+            bounds.append((bound, from_lengths, to_lengths))
+        bounds.sort(key=lambda bound: bound[0], reverse=True)
+        active = [
+            (from_lengths, from_lengths[target], to_lengths, to_lengths[target])
+            for _, from_lengths, to_lengths in bounds[:ACTIVE_LANDMARKS]
+        ]
+
+        def _estimate(node):
+            best = 0.0
+            for from_lengths, from_target, to_lengths, to_target in active:
+                bound = from_target - from_lengths[node]
+                if bound > best:
+                    best = bound
+                bound = to_lengths[node] - to_target
+                if bound > best:
+                    best = bound
+            return best
+
+        return _estimate
+
+
+def astar(adjacency, source, target, estimate):
+    """Search the shortest path from source to target with A*
+
+    :param tuple adjacency: The CSR ``(indptr, targets, weights)`` sequences
+    :param int source: The source node
+    :param int target: The target node
+    :param callable estimate: A consistent lower bound of the length to the
+        target
+
+    :returns: A tuple of the shortest path length and the number of nodes
+        settled, including the target
+    """
+    indptr, targets, weights = adjacency
+    distances = {source: 0.0}
+    settled = set()
+    heap = [(estimate(source), source)]
+    while heap:
+        _, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == target:
+            return distances[node], len(settled)
+        distance = distances[node]
+        for i in range(indptr[node], indptr[node + 1]):
+            neighbor = targets[i]
+            new_distance = distance + weights[i]
+            if neighbor not in settled and new_distance < distances.get(
+                neighbor, math.inf
+            ):
+                distances[neighbor] = new_distance
+                heapq.heappush(heap, (new_distance + estimate(neighbor), neighbor))
+    return math.inf, len(settled)
@@ -0,0 +1,116 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Road network query engines with a preprocessed index
+
+Production route planners don't run plain Dijkstra, they trade a one off
+preprocessing step for much faster queries. These engines are built on the
+shared DIMACS edge arrays and written in Python, so their query latencies
+are an upper bound of what a compiled implementation would reach, while the
+settled node savings carry over:
+
+* ``alt``: A* with landmark lower bounds (:mod:`speedup_bench.alt`)
+* ``ch``: contraction hierarchies (:mod:`speedup_bench.ch`)
+
+The driver times :meth:`~bench_common.backend.Backend.preprocess` once and
+records the size of the index next to the query benchmarks.
+"""
+
+import os
+
+from bench_common import backend
+from bench_common import dimacs
+from bench_common import results
+from scipy_bench import gr_parser
+from speedup_bench import alt
+from speedup_bench import ch
+
+NUM_LANDMARKS = int(os.getenv("BENCH_ALT_LANDMARKS", "16"))
+
+
+class RoadGraph:
+    """The graph of an engine, its index is set by preprocessing
+
+    :param GrEdges edges: The parsed edge arrays
+    """
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.matrix = gr_parser.build_graph(edges)
+        self.adjacency = (
+            self.matrix.indptr.tolist(),
+            self.matrix.indices.tolist(),
+            self.matrix.data.tolist(),
+        )
+        self.index = None
+
+
+class _EngineBackend(backend.Backend):
+    module = "speedup_bench"
+
+    def version(self):
+        # The engines are part of this repository
+        return results.environment()["git_sha"]
+
+    def load_gr(self, path, cache=False, **options):
+        if cache:
+            return self.build_graph(dimacs.load_gr_arrays(path))
+        return self.build_graph(dimacs.parse_gr_arrays(path))
+
+    def build_graph(self, edges):
+        return RoadGraph(edges)
+
+    def num_nodes(self, graph):
+        return graph.edges.num_nodes
+
+    def num_edges(self, graph):
+        return graph.matrix.num_arcs
+
+    def index_size(self, graph):
+        return graph.index.nbytes()
+
+
+@backend.register
+class AltBackend(_EngineBackend):
+    name = "alt"
+    preprocess_max_nodes = None
+
+    def preprocess(self, graph):
+        graph.index = alt.AltIndex(graph.matrix, NUM_LANDMARKS)
+
+    def sssp(self, graph, source, target):
+        return alt.astar(
+            graph.adjacency, source, target, graph.index.heuristic(source, target)
+        )[0]
+
+    def count_settled(self, graph, source, target):
+        return alt.astar(
+            graph.adjacency, source, target, graph.index.heuristic(source, target)
+        )[1]
+
+
+@backend.register
+class ChBackend(_EngineBackend):
+    name = "ch"
+    # Contracting the whole USA graph in Python would take days
+    preprocess_max_nodes = 1000000
+
+    def preprocess(self, graph):
+        matrix = graph.matrix.tocoo()
+        graph.index = ch.ContractionHierarchy(
+            graph.edges.num_nodes,
+            matrix.row.tolist(),
+            matrix.col.tolist(),
+            matrix.data.tolist(),
+        )
+
+    def sssp(self, graph, source, target):
+        return graph.index.query(source, target)[0]
+
+    def count_settled(self, graph, source, target):
+        return graph.index.query(source, target)[1]
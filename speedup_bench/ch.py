@@ -0,0 +1,196 @@
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Contraction hierarchies
+
+Preprocessing contracts the nodes one at a time in order of importance. A
+contracted node is removed from the graph and a shortcut arc ``u -> w`` is
+added for every path ``u -> v -> w`` through it which a local witness search
+can't match without it. The importance is the edge difference (shortcuts
+added minus arcs removed) plus the number of contracted neighbors, it's
+updated lazily when a node is popped from the queue.
+
+A query is a bidirectional Dijkstra which only relaxes arcs to nodes
+contracted later: forward from the source on the upward graph and backward
+from the target on the downward graph. Both searches meet at the most
+important node of the shortest path.
+"""
+
+import array
+import heapq
+import math
+
+# Witness searches give up after settling this many nodes, a missed
+# witness only adds an unneeded shortcut
+WITNESS_SETTLED_LIMIT = 50
+
+
+def _witness_lengths(out_arcs, source, excluded, limit):
+    """Shortest path lengths from source up to limit avoiding a node"""
+    distances = {source: 0.0}
+    heap = [(0.0, source)]
+    settled = 0
+    while heap and settled < WITNESS_SETTLED_LIMIT:
+        distance, node = heapq.heappop(heap)
+        if distance > distances[node]:
+            continue
+        if distance > limit:
+            break
+        settled += 1
+        for neighbor, weight in out_arcs[node].items():
+            if neighbor == excluded:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, math.inf):
+                distances[neighbor] = new_distance
+                heapq.heappush(heap, (new_distance, neighbor))
+    return distances
+
+
+def _shortcuts(out_arcs, in_arcs, node):
+    """Return the shortcuts needed to contract a node"""
+    shortcuts = []
+    outgoing = out_arcs[node]
+    if not outgoing:
+        return shortcuts
+    max_out = max(outgoing.values())
+    for source, in_weight in in_arcs[node].items():
+        lengths = _witness_lengths(out_arcs, source, node, in_weight + max_out)
+        for target, out_weight in outgoing.items():
+            if target == source:
+                continue
+            length = in_weight + out_weight
+            if lengths.get(target, math.inf) > length:
+                shortcuts.append((source, target, length))
+    return shortcuts
+
+
+def _add_arc(out_arcs, in_arcs, source, target, weight):
+    if weight < out_arcs[source].get(target, math.inf):
+        out_arcs[source][target] = weight
+        in_arcs[target][source] = weight
+
+
+class ContractionHierarchy:
+    """A contraction hierarchy of a weighted directed graph
+
+    :param int num_nodes: The number of nodes
+    :param sources: The arc sources
+    :param targets: The arc targets
+    :param weights: The arc weights
+    """
+
+    def __init__(self, num_nodes, sources, targets, weights):
+        out_arcs = [{} for _ in range(num_nodes)]
+        in_arcs = [{} for _ in range(num_nodes)]
+        for source, target, weight in zip(sources, targets, weights):
+            if source != target:
+                _add_arc(out_arcs, in_arcs, source, target, weight)
+        # Every arc which ever existed, the query graphs are built from it
+        all_arcs = [dict(arcs) for arcs in out_arcs]
+        contracted_neighbors = [0] * num_nodes
+        rank = [0] * num_nodes
+
+        def _priority(node):
+            removed = len(out_arcs[node]) + len(in_arcs[node])
+            added = len(_shortcuts(out_arcs, in_arcs, node))
+            return added - removed + contracted_neighbors[node]
+
+        queue = [(_priority(node), node) for node in range(num_nodes)]
+        heapq.heapify(queue)
+        self.num_shortcuts = 0
+        order = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            # Lazy update: contract the node only if it's still the least
+            # important after recomputing its priority
+            priority = _priority(node)
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, node))
+                continue
+            for source, target, length in _shortcuts(out_arcs, in_arcs, node):
+                _add_arc(out_arcs, in_arcs, source, target, length)
+                if length < all_arcs[source].get(target, math.inf):
+                    all_arcs[source][target] = length
+                self.num_shortcuts += 1
+            for neighbor in set(out_arcs[node]) | set(in_arcs[node]):
+                contracted_neighbors[neighbor] += 1
+            for target in out_arcs[node]:
+                del in_arcs[target][node]
+            for source in in_arcs[node]:
+                del out_arcs[source][node]
+            out_arcs[node] = {}
+            in_arcs[node] = {}
+            rank[node] = order
+            order += 1
+        self.rank = rank
+        up = [[] for _ in range(num_nodes)]
+        down = [[] for _ in range(num_nodes)]
+        for source, arcs in enumerate(all_arcs):
+            for target, weight in arcs.items():
+                if rank[target] > rank[source]:
+                    up[source].append((target, weight))
+                else:
+                    down[target].append((source, weight))
+        self.up = self._csr(up)
+        self.down = self._csr(down)
+
+    @staticmethod
+    def _csr(adjacency):
+        indptr = array.array("q", [0])
+        targets = array.array("i")
+        weights = array.array("d")
+        for arcs in adjacency:
+            for target, weight in arcs:
+                targets.append(target)
+                weights.append(weight)
+            indptr.append(len(targets))
+        return indptr, targets, weights
+
+    def nbytes(self):
+        """The memory of the upward and downward graphs in bytes"""
+        return sum(
+            values.itemsize * len(values) for values in self.up + self.down
+        ) + 8 * len(self.rank)
+
+    def query(self, source, target):
+        """Search the shortest path from source to target
+
+        :returns: A tuple of the shortest path length and the number of
+            nodes settled in both directions
+        """
+        graphs = (self.up, self.down)
+        distances = ({source: 0.0}, {target: 0.0})
+        settled = (set(), set())
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best = math.inf
+        while heaps[0] or heaps[1]:
+            # Advance the direction with the smaller tentative distance
+            if not heaps[1] or (heaps[0] and heaps[0][0][0] <= heaps[1][0][0]):
+                direction = 0
+            else:
+                direction = 1
+            distance, node = heapq.heappop(heaps[direction])
+            if distance >= best:
+                # Everything left in this direction is at least as far
+                heaps[direction].clear()
+                continue
+            if node in settled[direction]:
+                continue
+            settled[direction].add(node)
+            other = distances[1 - direction].get(node)
+            if other is not None and distance + other < best:
+                best = distance + other
+            indptr, targets, weights = graphs[direction]
+            for i in range(indptr[node], indptr[node + 1]):
+                neighbor = targets[i]
+                new_distance = distance + weights[i]
+                if new_distance < distances[direction].get(neighbor, math.inf):
+                    distances[direction][neighbor] = new_distance
+                    heapq.heappush(heaps[direction], (new_distance, neighbor))
+        return best, len(settled[0]) + len(settled[1])